@@ -0,0 +1,290 @@
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import metrics
+
+from rich import print as rprint
+
+
+class _AdaptiveNode:
+    """
+    Узел адаптивного дерева. В отличие от `data_structures.Node`,
+    хранит ЦЕЛЫЙ вес (счетчик появлений), ссылку на родителя и свой
+    номер в общем порядке узлов (нужен для "скольжения" по Виттеру).
+    """
+    __slots__ = ("weight", "symbol", "parent", "left_child", "right_child", "index")
+
+    def __init__(self, symbol: Optional[str] = None, parent: Optional['_AdaptiveNode'] = None, index: int = 0):
+        self.weight = 0
+        self.symbol = symbol
+        self.parent = parent
+        self.left_child: Optional['_AdaptiveNode'] = None
+        self.right_child: Optional['_AdaptiveNode'] = None
+        self.index = index
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.left_child is None
+
+
+class AdaptiveHuffmanCoder:
+    """
+    Адаптивный код Хаффмана (алгоритм Виттера, "Λ").
+
+    Дерево перестраивается после КАЖДОГО символа, поэтому кодирование
+    и декодирование идут за один проход, без предварительного подсчета
+    вероятностей. Память ограничена: не больше 2 * len(alphabet) узлов.
+
+    Новый (еще не встречавшийся) символ кодируется как код узла NYT
+    ("not yet transmitted") + номер символа в алфавите фиксированной длины.
+
+    Кодер и декодер - это два РАЗНЫХ объекта с одинаковым алфавитом:
+    они синхронно строят одно и то же дерево.
+
+    Порядок узлов (`self._nodes`): индекс 0 - корень, дальше веса
+    не возрастают; при равном весе внутренние узлы идут раньше листьев
+    (инвариант Виттера, "номер" узла по статье = -index).
+    """
+
+    def __init__(self, alphabet: List[str]):
+        if not alphabet:
+            raise ValueError("Алфавит не может быть пустым")
+        self.alphabet = list(alphabet)
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.alphabet)}
+        self._raw_width = max(1, math.ceil(math.log2(len(self.alphabet))))
+
+        self._nyt = _AdaptiveNode()
+        self._root = self._nyt
+        self._nodes: List[_AdaptiveNode] = [self._nyt]
+        self._leaves: Dict[str, _AdaptiveNode] = {}
+
+        self.symbols_processed = 0
+        self.bits_processed = 0
+
+    @property
+    def average_length(self) -> float:
+        """Текущая ("бегущая") средняя длина L_avg, бит/символ."""
+        return self.bits_processed / self.symbols_processed if self.symbols_processed else 0.0
+
+    # --- Кодирование / декодирование ---
+
+    def encode_symbol(self, symbol: str) -> str:
+        """Возвращает кодовое слово для `symbol` и обновляет дерево."""
+        leaf = self._leaves.get(symbol)
+        if leaf is not None:
+            code = self._code_of(leaf)
+        else:
+            index = self._symbol_index.get(symbol)
+            if index is None:
+                raise ValueError(f"Символ {symbol!r} не входит в алфавит")
+            code = self._code_of(self._nyt) + format(index, f"0{self._raw_width}b")
+
+        self._update(symbol)
+        self.symbols_processed += 1
+        self.bits_processed += len(code)
+        return code
+
+    def encode(self, symbols: Iterable[str]) -> Iterator[str]:
+        """Потоковое кодирование: по одному кодовому слову на символ."""
+        for symbol in symbols:
+            yield self.encode_symbol(symbol)
+
+    def decode(self, bits: Iterable[str]) -> Iterator[str]:
+        """
+        Потоковое декодирование: читает биты ('0'/'1') по одному
+        и отдает символы по мере их распознавания.
+        """
+        bit_iter = iter(bits)
+        node = self._root
+        consumed = 0
+        while True:
+            if node.is_leaf:
+                if node is self._nyt:
+                    raw = "".join(next(bit_iter, "") for _ in range(self._raw_width))
+                    if not raw and not consumed:
+                        return  # поток закончился ровно на границе символа
+                    if len(raw) < self._raw_width:
+                        raise ValueError("Поток битов оборвался посреди номера нового символа")
+                    consumed += self._raw_width
+                    index = int(raw, 2)
+                    if index >= len(self.alphabet):
+                        raise ValueError(f"Неверный номер символа в потоке: {index}")
+                    symbol = self.alphabet[index]
+                else:
+                    symbol = node.symbol
+
+                self._update(symbol)
+                self.symbols_processed += 1
+                self.bits_processed += consumed
+                consumed = 0
+                yield symbol
+                node = self._root
+                continue
+
+            bit = next(bit_iter, None)
+            if bit is None:
+                if node is not self._root:
+                    raise ValueError("Поток битов оборвался посреди кодового слова")
+                return
+            consumed += 1
+            node = node.left_child if bit == "0" else node.right_child
+
+    def _code_of(self, node: _AdaptiveNode) -> str:
+        """Код узла: путь от корня ('0' - левая ветка, '1' - правая)."""
+        bits: List[str] = []
+        while node.parent is not None:
+            bits.append("1" if node.parent.right_child is node else "0")
+            node = node.parent
+        return "".join(reversed(bits))
+
+    # --- Обновление дерева (Виттер) ---
+
+    def _swap(self, a: _AdaptiveNode, b: _AdaptiveNode):
+        """Меняет местами два узла (вместе с поддеревьями) и их номера."""
+        if a is b:
+            return
+        ia, ib = a.index, b.index
+        self._nodes[ia], self._nodes[ib] = b, a
+        a.index, b.index = ib, ia
+
+        pa, pb = a.parent, b.parent
+        if pa is pb:
+            pa.left_child, pa.right_child = pa.right_child, pa.left_child
+            return
+        if pa.left_child is a:
+            pa.left_child = b
+        else:
+            pa.right_child = b
+        if pb.left_child is b:
+            pb.left_child = a
+        else:
+            pb.right_child = a
+        a.parent, b.parent = pb, pa
+
+    def _block_leader(self, node: _AdaptiveNode) -> _AdaptiveNode:
+        """Старший узел блока (тот же вес и тот же тип - лист/внутренний)."""
+        k = node.index
+        while (k > 0 and self._nodes[k - 1].weight == node.weight
+               and self._nodes[k - 1].is_leaf == node.is_leaf):
+            k -= 1
+        return self._nodes[k]
+
+    def _slide_and_increment(self, node: _AdaptiveNode) -> Optional[_AdaptiveNode]:
+        """
+        Сдвигает узел "вперед" через следующий блок и увеличивает его вес.
+
+        Returns:
+            Node | None: Следующий узел, вес которого нужно увеличить.
+        """
+        weight = node.weight
+        former_parent = node.parent
+        is_leaf = node.is_leaf
+
+        k = node.index - 1
+        while k >= 0:
+            other = self._nodes[k]
+            if is_leaf:
+                in_next_block = (not other.is_leaf) and other.weight == weight
+            else:
+                in_next_block = other.is_leaf and other.weight == weight + 1
+            if not in_next_block:
+                break
+            self._swap(node, other)
+            k -= 1
+
+        node.weight += 1
+        return node.parent if is_leaf else former_parent
+
+    def _update(self, symbol: str):
+        leaf_to_increment: Optional[_AdaptiveNode] = None
+        node = self._leaves.get(symbol)
+
+        if node is None:
+            # NYT превращается во внутренний узел с двумя детьми:
+            # новый NYT (левый, '0') и лист нового символа (правый, '1')
+            old_nyt = self._nyt
+            new_leaf = _AdaptiveNode(symbol=symbol, parent=old_nyt, index=len(self._nodes))
+            new_nyt = _AdaptiveNode(parent=old_nyt, index=len(self._nodes) + 1)
+            self._nodes.extend((new_leaf, new_nyt))
+            old_nyt.left_child, old_nyt.right_child = new_nyt, new_leaf
+            self._leaves[symbol] = new_leaf
+            self._nyt = new_nyt
+
+            node = old_nyt
+            leaf_to_increment = new_leaf
+        else:
+            self._swap(node, self._block_leader(node))
+            if node.parent is self._nyt.parent:
+                # Брат NYT: сначала родитель, потом сам лист
+                leaf_to_increment = node
+                node = node.parent
+
+        while node is not None:
+            node = self._slide_and_increment(node)
+
+        if leaf_to_increment is not None:
+            self._slide_and_increment(leaf_to_increment)
+
+
+def compare_with_static(symbols: List[str], alphabet: List[str],
+                        report_every: int = 0) -> Tuple[List[Tuple[int, float]], float, float]:
+    """
+    Сравнивает адаптивный однопроходный код со статическим Хаффманом,
+    построенным по ФАКТИЧЕСКИМ частотам того же потока.
+
+    Args:
+        symbols (list): Поток символов (имена вида 'z1', 'z2', ...).
+        alphabet (list): Полный алфавит источника.
+        report_every (int): Шаг снятия "бегущей" L_avg (0 - только в конце).
+
+    Returns:
+        tuple: ([(t, L_avg адаптивного после t символов), ...],
+                L_avg адаптивного итоговая, L_avg статического Хаффмана).
+    """
+    coder = AdaptiveHuffmanCoder(alphabet)
+    history: List[Tuple[int, float]] = []
+    counts: Dict[str, int] = {}
+    for t, symbol in enumerate(symbols, start=1):
+        coder.encode_symbol(symbol)
+        counts[symbol] = counts.get(symbol, 0) + 1
+        if report_every and t % report_every == 0:
+            history.append((t, coder.average_length))
+
+    total = sum(counts.values())
+    probabilities = {symbol: count / total for symbol, count in counts.items()}
+    static_codes = algorithms.generate_codes_from_tree(algorithms.build_huffman_tree(probabilities))
+    static_length = metrics.calculate_average_length(probabilities, static_codes)[0]
+
+    return history, coder.average_length, static_length
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from random_probs import generate_probabilities
+
+    n_symbols = 64
+    stream_length = 200_000
+    probabilities = generate_probabilities(n_symbols, method='exponential', decimals=6, min_prob=1e-6)
+    alphabet = list(probabilities)
+    stream = random.choices(alphabet, weights=list(probabilities.values()), k=stream_length)
+
+    start_time = time.perf_counter()
+    bits = "".join(AdaptiveHuffmanCoder(alphabet).encode(stream))
+    encode_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    decoded = list(AdaptiveHuffmanCoder(alphabet).decode(bits))
+    decode_time = time.perf_counter() - start_time
+
+    rprint(f"[bold]Адаптивный Хаффман (Виттер): N={n_symbols}, поток={stream_length:,} символов[/bold]")
+    rprint(f"  Декодирование совпало: {'[green]да[/green]' if decoded == stream else '[red]НЕТ[/red]'}")
+    rprint(f"  Кодирование: {encode_time:.3f} с, декодирование: {decode_time:.3f} с")
+
+    history, adaptive_length, static_length = compare_with_static(stream, alphabet, report_every=stream_length // 10)
+    for t, running_length in history:
+        rprint(f"  t={t:>8,}: L_avg (адаптивный) = {running_length:.4f}")
+    rprint(f"  [bold green]L_avg статического Хаффмана:[/bold green] {static_length:.4f} бит/символ")
+    rprint(f"  [bold cyan]Цена одного прохода:[/bold cyan] {adaptive_length - static_length:+.4f} бит/символ")
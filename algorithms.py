@@ -1,9 +1,12 @@
 import heapq
 from data_structures import Node, create_node
+import shannon_codes
+import grouped_huffman
+from alphabetic_codes import build_alphabetic_tree
 from typing import Dict, List, Optional, Tuple
 from rich import print as rprint
 
-def build_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
+def build_huffman_tree(probabilities: Dict[str, float], min_variance: bool = False) -> Optional[Node]:
     """
     Строит дерево Хаффмана по "донному" (bottom-up) алгоритму.
 
@@ -12,6 +15,11 @@ def build_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
 
     Args:
         probabilities (dict): Словарь {'z1': p1, 'z2': p2, ...}.
+        min_variance (bool): Хаффман с минимальной дисперсией длин:
+            при равных вероятностях первым берется узел МЕНЬШЕЙ высоты
+            (листья раньше объединенных узлов). L_avg тот же, а максимальная
+            длина кода и разброс длин - не больше, чем при разборе ничьих
+            по порядку создания узлов (priority_tiebreaker).
 
     Returns:
         Node | None: Корневой узел (Node) построенного дерева или None,
@@ -20,7 +28,10 @@ def build_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
     
     # priority_queue (min-heap) будет хранить узлы,
     # автоматически сортируя их по наименьшей вероятности.
-    priority_queue: List[Node] = []
+    # Элемент очереди: (вероятность, высота поддерева, узел). Высота
+    # учитывается только при min_variance, иначе она всегда 0 и ничьи
+    # разбирает сам Node (по priority_tiebreaker).
+    priority_queue: List[Tuple[float, int, Node]] = []
     
     if not probabilities:
         return None
@@ -28,14 +39,14 @@ def build_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
     for symbol, prob in probabilities.items():
         # Создаем "лист", имя узла = имя символа
         leaf_node = create_node(probability=prob, symbol=symbol, combined_name=symbol)
-        heapq.heappush(priority_queue, leaf_node)
+        heapq.heappush(priority_queue, (prob, 0, leaf_node))
         
     # Шаг "Редукция": повторяем, пока в очереди не останется 1 узел (корень)
     while len(priority_queue) > 1:
         
         # Достаем ДВА узла с наименьшими вероятностями
-        node_1 = heapq.heappop(priority_queue)
-        node_2 = heapq.heappop(priority_queue)
+        _, height_1, node_1 = heapq.heappop(priority_queue)
+        _, height_2, node_2 = heapq.heappop(priority_queue)
         
         # Применяем правило "Больше P -> 0"
         if node_1.probability >= node_2.probability:
@@ -45,23 +56,26 @@ def build_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
             higher_prob_node = node_2
             lower_prob_node = node_1
             
-        # Имя левой ветки (0) + Имя правой ветки (1)
-        left_name = higher_prob_node.combined_name
-        right_name = lower_prob_node.combined_name
-            
         combined_prob = higher_prob_node.probability + lower_prob_node.probability
         
+        # Имя узла (имя левой ветки (0) + имя правой ветки (1))
+        # собирает create_node - так его можно и не хранить (CompactNode)
         parent_node = create_node(
             probability=combined_prob,
             left=higher_prob_node,  # Ветка '0'
             right=lower_prob_node, # Ветка '1'
-            combined_name=f"{left_name}{right_name}"
         )
         
-        heapq.heappush(priority_queue, parent_node)
+        parent_height = 1 + max(height_1, height_2) if min_variance else 0
+        heapq.heappush(priority_queue, (combined_prob, parent_height, parent_node))
         
     # Последний узел в очереди - это корень
-    return heapq.heappop(priority_queue) if priority_queue else None
+    return heapq.heappop(priority_queue)[2] if priority_queue else None
+
+
+def build_min_variance_huffman_tree(probabilities: Dict[str, float]) -> Optional[Node]:
+    """Хаффман с минимальной дисперсией длин кодов (см. build_huffman_tree)."""
+    return build_huffman_tree(probabilities, min_variance=True)
 
 
 def _find_shannon_fano_split_index(sorted_probs: List[Tuple[str, float]]) -> int:
@@ -148,24 +162,84 @@ def build_shannon_fano_tree(probabilities: Dict[str, float]) -> Optional[Node]:
         # Создаем ВНУТРЕННИЙ узел
         combined_prob = (left_child.probability if left_child else 0) + (right_child.probability if right_child else 0)
         
-        left_name = left_child.combined_name if left_child else ""
-        right_name = right_child.combined_name if right_child else ""
-        
         return create_node(
             probability=combined_prob, 
             left=left_child, 
             right=right_child, 
-            combined_name=f"{left_name}{right_name}"
         )
 
     # Начинаем рекурсию со всем списком
     return _build_recursive(sorted_probs)
 
 
+def generate_int_codes_from_tree(tree_root: Optional[Node],
+                                 n_symbols: Optional[int] = None) -> Tuple[List[str], List[int], List[int]]:
+    """
+    Обходит ЛЮБОЕ дерево (Node) на явном стеке (без рекурсии, поэтому
+    глубина дерева не ограничена лимитом Python) и генерирует коды
+    в ЦЕЛОЧИСЛЕННОЙ форме: код '0101' = (значение 0b0101 = 5, длина 4).
+
+    Никаких строк по ходу обхода не создается - строки можно получить
+    при необходимости через `int_code_to_str`.
+
+    Args:
+        tree_root (Node, optional): Корневой узел дерева.
+        n_symbols (int, optional): Число листьев, если известно заранее -
+                                   тогда массивы выделяются один раз.
+
+    Returns:
+        tuple: Параллельные массивы (symbols, code_values, code_lengths).
+    """
+    if n_symbols is not None:
+        symbols: List[str] = [""] * n_symbols
+        code_values: List[int] = [0] * n_symbols
+        code_lengths: List[int] = [0] * n_symbols
+    else:
+        symbols, code_values, code_lengths = [], [], []
+    count = 0
+
+    if tree_root is None:
+        return [], [], []
+
+    # Стек: (узел, значение кода, длина кода)
+    stack: List[Tuple[Node, int, int]] = [(tree_root, 0, 0)]
+    while stack:
+        node, value, length = stack.pop()
+
+        # Дошли до "листа"
+        if node.symbol is not None:
+            # Если в дереве всего 1 узел, его код будет "0"
+            if length == 0:
+                length = 1
+            if count < len(symbols):
+                symbols[count], code_values[count], code_lengths[count] = node.symbol, value, length
+            else:
+                symbols.append(node.symbol)
+                code_values.append(value)
+                code_lengths.append(length)
+            count += 1
+            continue
+
+        # Правую ветку (1) кладем первой, чтобы левая (0) обошлась раньше
+        if node.right_child is not None:
+            stack.append((node.right_child, (value << 1) | 1, length + 1))
+        if node.left_child is not None:
+            stack.append((node.left_child, value << 1, length + 1))
+
+    # Подсказка n_symbols могла оказаться больше реального числа листьев
+    del symbols[count:], code_values[count:], code_lengths[count:]
+    return symbols, code_values, code_lengths
+
+
+def int_code_to_str(value: int, length: int) -> str:
+    """Строковая форма кода для вывода/JSON: (5, 4) -> '0101'."""
+    return format(value, f"0{length}b")
+
+
 def generate_codes_from_tree(tree_root: Optional[Node]) -> Dict[str, str]:
     """
-    Рекурсивно обходит ЛЮБОЕ дерево (Node) и генерирует коды
-    для каждого символа.
+    Обходит ЛЮБОЕ дерево (Node) и генерирует коды для каждого символа
+    в строковой форме (обертка над `generate_int_codes_from_tree`).
 
     Args:
         tree_root (Node, optional): Корневой узел дерева.
@@ -173,24 +247,41 @@ def generate_codes_from_tree(tree_root: Optional[Node]) -> Dict[str, str]:
     Returns:
         dict: Словарь кодов {'z1': '01', 'z2': '110', ...}.
     """
-    codes_dictionary: Dict[str, str] = {}
-    
-    def traverse_tree(current_node: Optional[Node], current_code: str):
-        """Вложенная рекурсивная функция обхода."""
-        if current_node is None:
-            return
-            
-        # Базовый случай: дошли до "листа"
-        if current_node.symbol is not None:
-            # Если в дереве всего 1 узел, его код будет "0"
-            codes_dictionary[current_node.symbol] = current_code if current_code else "0"
-            return
+    symbols, code_values, code_lengths = generate_int_codes_from_tree(tree_root)
+    return {
+        symbol: int_code_to_str(value, length)
+        for symbol, value, length in zip(symbols, code_values, code_lengths)
+    }
 
-        # Рекурсивный шаг: идем налево (0) и направо (1)
-        traverse_tree(current_node.left_child, current_code + "0")
-        traverse_tree(current_node.right_child, current_code + "1")
 
-    # Начинаем обход с корня и пустого кода
-    traverse_tree(tree_root, "")
-    
-    return codes_dictionary
\ No newline at end of file
+# Реестр "деревянных" алгоритмов: имя (как в меню main.py) -> функция построения.
+# Используется всеми местами, где алгоритм выбирается по имени.
+TREE_BUILDERS = {
+    "Хаффман": build_huffman_tree,
+    "Шеннон-Фано": build_shannon_fano_tree,
+    "Хаффман (мин. дисперсия)": build_min_variance_huffman_tree,
+    "Алфавитный (Гарсиа-Уокс)": build_alphabetic_tree,
+}
+
+# Реестр алгоритмов БЕЗ дерева: имя -> функция, сразу выдающая коды
+# в целочисленной форме (symbols, code_values, code_lengths).
+CODE_ENGINES = {
+    "Шеннон": shannon_codes.generate_shannon_int_codes,
+    "Шеннон-Фано-Элиас": shannon_codes.generate_shannon_fano_elias_int_codes,
+    "Хаффман (группы весов)": grouped_huffman.generate_grouped_huffman_int_codes,
+}
+
+ALL_ALGORITHMS = list(TREE_BUILDERS) + list(CODE_ENGINES)
+
+
+def generate_int_codes(algo_name: str, probabilities: Dict[str, float]) -> Tuple[List[str], List[int], List[int]]:
+    """
+    Коды любым зарегистрированным алгоритмом (с деревом или без).
+
+    Returns:
+        tuple: (symbols, code_values, code_lengths) - как у `generate_int_codes_from_tree`.
+    """
+    if algo_name in CODE_ENGINES:
+        return CODE_ENGINES[algo_name](probabilities)
+    tree_root = TREE_BUILDERS[algo_name](probabilities)
+    return generate_int_codes_from_tree(tree_root, len(probabilities))
@@ -0,0 +1,345 @@
+from typing import Dict, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+from data_structures import Node, create_node
+
+# Рабочая последовательность Гарсиа-Уокса - B-дерево по позициям.
+# Листья - короткие списки (вставка в них - memmove на C), внутренние
+# узлы хранят размеры и максимальные веса поддеревьев.
+_LEAF_CAPACITY = 64
+_NODE_CAPACITY = 32
+
+
+class _Leaf:
+    __slots__ = ("weights", "ids")
+
+    def __init__(self, weights: List[float], ids: List[int]):
+        self.weights = weights
+        self.ids = ids
+
+
+class _Inner:
+    __slots__ = ("children", "sizes", "maxes")
+
+    def __init__(self, children: list, sizes: List[int], maxes: List[float]):
+        self.children = children
+        self.sizes = sizes
+        self.maxes = maxes
+
+
+class _WeightSequence:
+    """
+    Последовательность (вес, номер узла) с доступом, вставкой и удалением
+    по позиции за O(log N). По максимумам поддеревьев за O(log N) же
+    ищется ближайший слева элемент с весом >= x.
+
+    Опустевшие узлы удаляются, недозаполненные не сливаются: высота
+    дерева ограничена логарифмом числа всех вставок (<= 2N), т.е. O(log N).
+    """
+
+    def __init__(self):
+        self._root = _Leaf([], [])
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _locate(self, pos: int) -> Tuple[List[Tuple[_Inner, int]], _Leaf, int]:
+        """
+        (путь [(узел, номер ребенка), ...], лист, позиция в листе); pos == len - конец.
+        Размеры детей перебираются с ближнего к pos края узла: обращения
+        у конца последовательности (самые частые) проходят почти без перебора.
+        """
+        path = []
+        node = self._root
+        total = self._size
+        while type(node) is _Inner:
+            sizes = node.sizes
+            if pos < total - pos:
+                i = 0
+                while pos >= sizes[i]:
+                    pos -= sizes[i]
+                    i += 1
+            else:
+                # Считаем от конца: rest - сколько элементов узла правее pos (включая его)
+                i = len(sizes) - 1
+                rest = total - pos
+                while rest > sizes[i]:
+                    rest -= sizes[i]
+                    i -= 1
+                pos = sizes[i] - rest  # pos == len: rest = 0, конец последнего ребенка
+            total = sizes[i]
+            path.append((node, i))
+            node = node.children[i]
+        return path, node, pos
+
+    def weight(self, pos: int) -> float:
+        _, leaf, offset = self._locate(pos)
+        return leaf.weights[offset]
+
+    def node_id(self, pos: int) -> int:
+        _, leaf, offset = self._locate(pos)
+        return leaf.ids[offset]
+
+    def insert(self, pos: int, weight: float, node_id: int):
+        path, leaf, offset = self._locate(pos)
+        leaf.weights.insert(offset, weight)
+        leaf.ids.insert(offset, node_id)
+        self._size += 1
+        for node, i in path:
+            node.sizes[i] += 1
+            if weight > node.maxes[i]:
+                node.maxes[i] = weight
+        if len(leaf.weights) > _LEAF_CAPACITY:
+            self._split(path, leaf)
+
+    def _split(self, path: List[Tuple[_Inner, int]], node):
+        """Делит переполненный узел пополам; переполнение родителя - дальше вверх."""
+        while True:
+            if type(node) is _Leaf:
+                half = len(node.weights) // 2
+                sibling = _Leaf(node.weights[half:], node.ids[half:])
+                del node.weights[half:], node.ids[half:]
+                sizes = [len(node.weights), len(sibling.weights)]
+                maxes = [max(node.weights), max(sibling.weights)]
+            else:
+                half = len(node.children) // 2
+                sibling = _Inner(node.children[half:], node.sizes[half:], node.maxes[half:])
+                del node.children[half:], node.sizes[half:], node.maxes[half:]
+                sizes = [sum(node.sizes), sum(sibling.sizes)]
+                maxes = [max(node.maxes), max(sibling.maxes)]
+            if not path:
+                self._root = _Inner([node, sibling], sizes, maxes)
+                return
+            parent, i = path.pop()
+            parent.children.insert(i + 1, sibling)
+            parent.sizes[i:i + 1] = sizes
+            parent.maxes[i:i + 1] = maxes
+            if len(parent.children) <= _NODE_CAPACITY:
+                return
+            node = parent
+
+    def pop(self, pos: int) -> Tuple[float, int]:
+        """Удаляет элемент; размеры и максимумы на пути пересчитываются снизу вверх."""
+        path, leaf, offset = self._locate(pos)
+        weight = leaf.weights.pop(offset)
+        node_id = leaf.ids.pop(offset)
+        self._size -= 1
+        empty = not leaf.weights
+        child = leaf
+        for parent, i in reversed(path):
+            parent.sizes[i] -= 1
+            if empty:
+                del parent.children[i], parent.sizes[i], parent.maxes[i]
+                empty = not parent.children
+            elif parent.maxes[i] == weight:
+                parent.maxes[i] = max(child.weights) if type(child) is _Leaf else max(child.maxes)
+            child = parent
+        if empty:
+            self._root = _Leaf([], [])
+        return weight, node_id
+
+    def rightmost_at_least(self, stop: int, x: float) -> int:
+        """
+        Позиция ближайшего к `stop` слева (среди [0, stop)) элемента
+        с весом >= x или -1. Спуск идет только в поддеревья с максимумом
+        >= x; неудачным может быть лишь спуск в поддерево, которое
+        пересекает границу stop, поэтому всего O(log N) узлов.
+        """
+        return self._search(self._root, self._size, stop, x)
+
+    def _search(self, node, end: int, stop: int, x: float) -> int:
+        """Поиск в поддереве, которое заканчивается перед позицией `end`."""
+        if type(node) is _Leaf:
+            weights = node.weights
+            base = end - len(weights)
+            for offset in range(min(len(weights), stop - base) - 1, -1, -1):
+                if weights[offset] >= x:
+                    return base + offset
+            return -1
+        sizes = node.sizes
+        maxes = node.maxes
+        for i in range(len(sizes) - 1, -1, -1):
+            start = end - sizes[i]
+            if start < stop and maxes[i] >= x:
+                found = self._search(node.children[i], end, stop, x)
+                if found >= 0:
+                    return found
+            end = start
+        return -1
+
+
+def _merge_and_insert(sequence: _WeightSequence, k: int,
+                      children: List[Tuple[int, int]], n_leaves: int) -> int:
+    """
+    Шаг Гарсиа-Уокса: склеивает соседей k-1 и k в узел x и сдвигает x
+    влево - сразу за ближайший слева элемент с весом >= x (или в начало).
+    Все операции - O(log N) (`_WeightSequence`).
+
+    Returns:
+        int: Позиция, на которую встал x.
+    """
+    left_weight, left_id = sequence.pop(k - 1)
+    right_weight, right_id = sequence.pop(k - 1)
+    x = left_weight + right_weight
+    children.append((left_id, right_id))
+
+    j = sequence.rightmost_at_least(k - 1, x) + 1
+    sequence.insert(j, x, n_leaves + len(children) - 1)
+    return j
+
+
+def _combine(sequence: _WeightSequence, k: int, children: List[Tuple[int, int]], n_leaves: int):
+    """
+    Склейка на позиции k и все склейки, которые она вызвала: после сдвига
+    узла x левее пара (j-2, j-1) могла стать "локально минимальной"
+    (w[j-2] <= w[j]). Вложенные склейки - на явном стеке; позиция
+    отложенной проверки хранится как расстояние до конца последовательности.
+    """
+    pending: List[int] = []
+    j = _merge_and_insert(sequence, k, children, n_leaves)
+    while True:
+        if j >= 2 and sequence.weight(j) >= sequence.weight(j - 2):
+            pending.append(len(sequence) - j)
+            j = _merge_and_insert(sequence, j - 1, children, n_leaves)
+            continue
+        if not pending:
+            return
+        j = len(sequence) - pending.pop()
+
+
+def garsia_wachs_depths(weights: List[float]) -> List[int]:
+    """
+    Глубины листьев оптимального АЛФАВИТНОГО дерева (алгоритм Гарсиа-Уокса).
+
+    Фаза 1: слева направо склеиваем первую пару (k-1, k) с w[k-1] <= w[k+1],
+    новый узел сдвигаем влево за все более легкие элементы. Получается
+    НЕ алфавитное дерево, но глубины его листьев - те же, что у
+    оптимального алфавитного (теорема Гарсиа-Уокса). Фаза 2 - эти глубины.
+
+    Каждая склейка - O(1) операций над `_WeightSequence` по O(log N),
+    всего O(N log N) и на монотонных весах.
+
+    Args:
+        weights (list): Веса листьев в алфавитном порядке.
+
+    Returns:
+        list: Глубина каждого листа (для одного листа - 0).
+    """
+    n_leaves = len(weights)
+    children: List[Tuple[int, int]] = []
+    sequence = _WeightSequence()
+    for leaf_id, weight in enumerate(weights):
+        sequence.insert(len(sequence), weight, leaf_id)
+        # Последний элемент - только что добавленный лист: склейки идут левее
+        while len(sequence) >= 3 and sequence.weight(len(sequence) - 3) <= weight:
+            _combine(sequence, len(sequence) - 2, children, n_leaves)
+    while len(sequence) > 1:
+        _combine(sequence, len(sequence) - 1, children, n_leaves)
+
+    depths = [0] * n_leaves
+    if not children:
+        return depths
+    # Обход дерева склеек от корня на явном стеке
+    stack = [(sequence.node_id(0), 0)]
+    while stack:
+        node_id, depth = stack.pop()
+        if node_id < n_leaves:
+            depths[node_id] = depth
+            continue
+        left_id, right_id = children[node_id - n_leaves]
+        stack.append((left_id, depth + 1))
+        stack.append((right_id, depth + 1))
+    return depths
+
+
+def build_alphabetic_tree(probabilities: Dict[str, float]) -> Optional[Node]:
+    """
+    Строит оптимальное алфавитное дерево: коды сохраняют порядок символов
+    (код z1 < код z2 < ... лексикографически), поэтому сжатые ключи можно
+    сравнивать и сканировать по диапазону без декодирования.
+
+    Фаза 3 Гарсиа-Уокса: по глубинам из `garsia_wachs_depths` дерево
+    собирается заново слева направо, со стеком (два соседа одной
+    глубины -> родитель на уровень выше). Левая ветка ('0') - всегда
+    алфавитно меньшая, правило "Больше P -> 0" здесь не действует.
+
+    Args:
+        probabilities (dict): Словарь {'z1': p1, 'z2': p2, ...}; порядок - по номеру символа.
+
+    Returns:
+        Node | None: Корень дерева или None, если входные данные пусты.
+    """
+    if not probabilities:
+        return None
+    symbols = sorted(probabilities, key=lambda z: int(z[1:]))
+    depths = garsia_wachs_depths([probabilities[symbol] for symbol in symbols])
+
+    stack: List[Tuple[Node, int]] = []
+    for symbol, depth in zip(symbols, depths):
+        stack.append((create_node(probability=probabilities[symbol], symbol=symbol, combined_name=symbol), depth))
+        while len(stack) >= 2 and stack[-1][1] == stack[-2][1]:
+            right, depth = stack.pop()
+            left, _ = stack.pop()
+            parent = create_node(probability=left.probability + right.probability, left=left, right=right)
+            stack.append((parent, depth - 1))
+    if len(stack) != 1:
+        raise RuntimeError("Глубины листьев не образуют полного дерева")
+    return stack[0][0]
+
+
+def alphabetic_penalty(probabilities: Dict[str, float]) -> Dict[str, float]:
+    """
+    Цена сохранения порядка: L_avg алфавитного кода против Хаффмана.
+    Для оптимального алфавитного кода L_avg < H + 2.
+
+    Returns:
+        dict: {'H', 'L_alphabetic', 'L_huffman', 'penalty', 'order_preserved'}.
+    """
+    import algorithms
+    import metrics
+
+    symbols, code_values, code_lengths = algorithms.generate_int_codes_from_tree(
+        build_alphabetic_tree(probabilities), len(probabilities))
+    alphabetic = metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths)))
+    symbols_h, _, code_lengths_h = algorithms.generate_int_codes("Хаффман", probabilities)
+    huffman = metrics.calculate_length_metrics(probabilities, dict(zip(symbols_h, code_lengths_h)))
+
+    # Коды в порядке символов должны идти по возрастанию (как строки бит)
+    codes = {symbol: algorithms.int_code_to_str(value, length)
+             for symbol, value, length in zip(symbols, code_values, code_lengths)}
+    ordered = [codes[symbol] for symbol in sorted(codes, key=lambda z: int(z[1:]))]
+    return {
+        "H": alphabetic["H"],
+        "L_alphabetic": alphabetic["L_avg"],
+        "L_huffman": huffman["L_avg"],
+        "penalty": alphabetic["L_avg"] - huffman["L_avg"],
+        "order_preserved": all(a < b for a, b in zip(ordered, ordered[1:])),
+    }
+
+
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    from random_probs import generate_probabilities
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="[bold]Алфавитный код (Гарсиа-Уокс) против Хаффмана[/bold]")
+    for column in ("N", "Распределение", "H", "L_avg (алф.)", "L_avg (Хаффман)", "Потеря, бит", "Порядок", "Время, с"):
+        table.add_column(column, justify="left" if column == "Распределение" else "right")
+
+    np.random.seed(0)
+    for n_symbols in (1_000, 100_000):
+        for method in ("uniform", "loguniform", "dirichlet"):
+            probabilities = generate_probabilities(n_symbols, method=method, decimals=12,
+                                                   min_prob=min(1e-10, 0.1 / n_symbols))
+            start_time = time.perf_counter()
+            build_alphabetic_tree(probabilities)
+            build_time = time.perf_counter() - start_time
+            row = alphabetic_penalty(probabilities)
+            table.add_row(f"{n_symbols:,}", method, f"{row['H']:.4f}", f"{row['L_alphabetic']:.4f}",
+                          f"{row['L_huffman']:.4f}", f"{row['penalty']:+.4f}",
+                          "да" if row["order_preserved"] else "[red]НЕТ[/red]", f"{build_time:.2f}")
+    Console().print(table)
@@ -0,0 +1,118 @@
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+# Сколько бит копить в аккумуляторе перед сбросом в буфер байтов.
+# Большие целые в Python дорожают с размером, поэтому сбрасываем часто.
+_FLUSH_BITS = 256
+
+
+class BitWriter:
+    """
+    Упаковка кодов в целочисленной форме (значение, длина) в байты,
+    старшие биты - первыми. Строки '0101' не создаются.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._accumulator = 0
+        self._pending_bits = 0
+        self.bit_length = 0
+
+    def write(self, value: int, length: int):
+        self._accumulator = (self._accumulator << length) | value
+        self._pending_bits += length
+        self.bit_length += length
+        if self._pending_bits >= _FLUSH_BITS:
+            self._flush_full_bytes()
+
+    def _flush_full_bytes(self):
+        n_bytes, rest = divmod(self._pending_bits, 8)
+        self._buffer += (self._accumulator >> rest).to_bytes(n_bytes, "big")
+        self._accumulator &= (1 << rest) - 1
+        self._pending_bits = rest
+
+    def getvalue(self) -> bytes:
+        """Все записанное; последний байт дополняется нулями."""
+        self._flush_full_bytes()
+        tail = b""
+        if self._pending_bits:
+            tail = bytes([self._accumulator << (8 - self._pending_bits)])
+        return bytes(self._buffer) + tail
+
+
+def encode_symbols(stream: Iterable[str], codebook: Dict[str, Tuple[int, int]]) -> Tuple[bytes, int]:
+    """
+    Кодирует поток символов кодами в целочисленной форме.
+
+    Args:
+        stream: Символы ('z1', 'z2', ...).
+        codebook (dict): {'z1': (значение кода, длина кода), ...}.
+
+    Returns:
+        tuple: (байты, точное число значимых бит).
+    """
+    writer = BitWriter()
+    write = writer.write
+    for symbol in stream:
+        value, length = codebook[symbol]
+        write(value, length)
+    return writer.getvalue(), writer.bit_length
+
+
+def canonical_codebook(code_lengths: Dict[Hashable, int]) -> Dict[Hashable, Tuple[int, int]]:
+    """
+    Канонические коды по одним только длинам: символы по (длина, символ),
+    каждый следующий код = предыдущий + 1 (со сдвигом при росте длины).
+
+    Длины берутся у любого алгоритма (дерево или без дерева) - средняя
+    длина та же, а передавать нужно только длины, без самих кодов.
+    Код префиксный, если длины удовлетворяют неравенству Крафта.
+
+    Args:
+        code_lengths (dict): {символ: длина кода}; символы должны сравниваться.
+
+    Returns:
+        dict: {символ: (значение кода, длина)}.
+    """
+    codebook: Dict[Hashable, Tuple[int, int]] = {}
+    value = 0
+    previous_length = 0
+    for symbol, length in sorted(code_lengths.items(), key=lambda item: (item[1], item[0])):
+        value <<= length - previous_length
+        if value >> length:
+            raise ValueError("Длины кодов не удовлетворяют неравенству Крафта")
+        codebook[symbol] = (value, length)
+        value += 1
+        previous_length = length
+    return codebook
+
+
+def build_decode_table(codebook: Dict[str, Tuple[int, int]]) -> Dict[int, str]:
+    """
+    Таблица декодирования: ключ = (1 << длина) | значение. "Сторожевая"
+    единица делает ключ уникальным для кодов разной длины ('01' != '1').
+    """
+    return {(1 << length) | value: symbol for symbol, (value, length) in codebook.items()}
+
+
+def decode_symbols(data: bytes, n_symbols: int, decode_table: Dict[int, str]) -> List[str]:
+    """
+    Декодирует `n_symbols` символов префиксного кода из байтов,
+    накапливая биты в целочисленный ключ (без строк).
+    """
+    result: List[str] = []
+    if n_symbols <= 0:
+        return result
+    append = result.append
+    key = 1
+    for byte in data:
+        for shift in (7, 6, 5, 4, 3, 2, 1, 0):
+            key = (key << 1) | ((byte >> shift) & 1)
+            symbol = decode_table.get(key)
+            if symbol is not None:
+                append(symbol)
+                if len(result) == n_symbols:
+                    return result
+                key = 1
+    if len(result) < n_symbols:
+        raise ValueError("Поток битов закончился раньше, чем было декодировано n_symbols символов")
+    return result
@@ -0,0 +1,296 @@
+import io
+import os
+import struct
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import bitstream
+
+# Формат файла (все числа little-endian):
+#   заголовок: MAGIC | версия u8 | флаги u8 | длина имени алгоритма u8 | имя (utf-8)
+#              [| общий словарь: 256 длин кодов u8, если FLAG_SHARED_CODEBOOK]
+#   блоки:     [256 длин кодов u8, если словарь у каждого блока свой] | поток битов
+#   индекс:    на каждый блок _ENTRY (смещение в файле, смещение в исходных
+#              данных, размер в файле, исходный размер, число значимых бит)
+#   хвост:     _FOOTER (смещение индекса, число блоков, MAGIC)
+# Смещения отсчитываются от начала контейнера, а не файла: контейнер может
+# идти после других данных, но должен заканчиваться вместе с файлом.
+# Читатель начинает с хвоста: индекс + заголовок, а из блоков - только нужные.
+MAGIC = b"HSBC"
+FORMAT_VERSION = 1
+FLAG_SHARED_CODEBOOK = 1
+
+# Меньше блок - дешевле произвольный доступ, но больше словарей в файле
+DEFAULT_BLOCK_SIZE = 1 << 18
+# Словарь блока - длины кодов всех 256 байтов (0 - байта в блоке нет).
+# Коды восстанавливаются каноническими (bitstream.canonical_codebook).
+CODEBOOK_SIZE = 256
+
+_HEADER = struct.Struct("<4sBBB")
+_ENTRY = struct.Struct("<QQIIQ")
+_FOOTER = struct.Struct("<QI4s")
+
+
+@dataclass
+class BlockEntry:
+    """
+    Запись индекса: где лежит блок и какой участок исходных данных он хранит.
+
+    Атрибуты:
+        offset (int): Смещение блока от начала контейнера.
+        raw_offset (int): Смещение первого байта блока в исходных данных.
+        stored_size (int): Размер блока в файле (словарь + поток битов).
+        raw_size (int): Число исходных байтов в блоке.
+        bit_length (int): Число значимых бит потока (без дополнения).
+    """
+    offset: int
+    raw_offset: int
+    stored_size: int
+    raw_size: int
+    bit_length: int
+
+
+def block_code_lengths(data: bytes, algo_name: str = "Хаффман") -> bytes:
+    """
+    Длины кодов байтов блока, построенные алгоритмом `algo_name`
+    по частотам байтов в `data` (0 - байт не встречается).
+    """
+    counts = Counter(data)
+    total = len(data)
+    # Имена вида 'zN' - этого ждут функции из metrics и алгоритмы
+    probabilities = {f"z{byte + 1}": count / total for byte, count in sorted(counts.items())}
+    symbols, _, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+    lengths = bytearray(CODEBOOK_SIZE)
+    for symbol, length in zip(symbols, code_lengths):
+        if length > 255:
+            raise ValueError(f"Длина кода {length} не помещается в словарь блока")
+        lengths[int(symbol[1:]) - 1] = length
+    return bytes(lengths)
+
+
+def _codebook_from_lengths(lengths: bytes) -> Dict[int, Tuple[int, int]]:
+    return bitstream.canonical_codebook({byte: length for byte, length in enumerate(lengths) if length})
+
+
+def _encode_block(data: bytes, algo_name: str, shared_lengths: Optional[bytes]) -> Tuple[bytes, int]:
+    """Точка входа воркера: словарь блока (если нужен) + поток битов."""
+    lengths = shared_lengths if shared_lengths is not None else block_code_lengths(data, algo_name)
+    payload, bit_length = bitstream.encode_symbols(data, _codebook_from_lengths(lengths))
+    if shared_lengths is None:
+        payload = lengths + payload
+    return payload, bit_length
+
+
+def _decode_block(block: bytes, raw_size: int, shared_lengths: Optional[bytes]) -> bytes:
+    """Точка входа воркера: исходные байты одного блока."""
+    if shared_lengths is None:
+        lengths, payload = block[:CODEBOOK_SIZE], block[CODEBOOK_SIZE:]
+    else:
+        lengths, payload = shared_lengths, block
+    decode_table = bitstream.build_decode_table(_codebook_from_lengths(lengths))
+    return bytes(bitstream.decode_symbols(payload, raw_size, decode_table))
+
+
+def _map_blocks(func, args: List[tuple], max_workers: Optional[int]) -> list:
+    """Блоки независимы: при нескольких блоках - пул процессов, порядок сохраняется."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if len(args) < 2 or max_workers < 2:
+        return [func(*arg) for arg in args]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(args))) as pool:
+        return list(pool.map(func, *zip(*args)))
+
+
+def write_container(data: bytes, f: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE,
+                    algo_name: str = "Хаффман", shared_codebook: bool = False,
+                    max_workers: Optional[int] = None) -> List[BlockEntry]:
+    """
+    Сжимает `data` в контейнер из независимых блоков и пишет его в `f`.
+
+    Args:
+        data (bytes): Исходные данные.
+        f: Файл, открытый на запись в двоичном режиме.
+        block_size (int): Исходных байтов в блоке (последний может быть короче).
+        algo_name (str): Алгоритм из algorithms.ALL_ALGORITHMS для длин кодов.
+        shared_codebook (bool): Один словарь на весь файл (по частотам всех
+            данных) вместо своего словаря в каждом блоке.
+        max_workers (int, optional): Процессов для кодирования (по умолчанию - число ядер).
+
+    Returns:
+        list: Записи индекса (BlockEntry) - то же, что попало в файл.
+    """
+    if block_size < 1:
+        raise ValueError("block_size должен быть >= 1")
+    if algo_name not in algorithms.ALL_ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм '{algo_name}'")
+
+    name_bytes = algo_name.encode("utf-8")
+    shared_lengths = block_code_lengths(data, algo_name) if shared_codebook and data else None
+    flags = FLAG_SHARED_CODEBOOK if shared_lengths is not None else 0
+
+    start = f.tell()
+    f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(name_bytes)) + name_bytes)
+    if shared_lengths is not None:
+        f.write(shared_lengths)
+
+    raw_offsets = range(0, len(data), block_size)
+    encoded = _map_blocks(
+        _encode_block,
+        [(data[raw_offset:raw_offset + block_size], algo_name, shared_lengths) for raw_offset in raw_offsets],
+        max_workers,
+    )
+
+    entries: List[BlockEntry] = []
+    for raw_offset, (block, bit_length) in zip(raw_offsets, encoded):
+        raw_size = min(block_size, len(data) - raw_offset)
+        entries.append(BlockEntry(f.tell() - start, raw_offset, len(block), raw_size, bit_length))
+        f.write(block)
+
+    index_offset = f.tell() - start
+    f.write(b"".join(_ENTRY.pack(e.offset, e.raw_offset, e.stored_size, e.raw_size, e.bit_length)
+                     for e in entries))
+    f.write(_FOOTER.pack(index_offset, len(entries), MAGIC))
+    return entries
+
+
+class ContainerReader:
+    """
+    Чтение контейнера с произвольным доступом. При открытии читаются
+    только хвост, индекс и заголовок; блоки - по запросу.
+
+    Атрибуты:
+        algo_name (str): Алгоритм, которым строились длины кодов.
+        blocks (list): Индекс (BlockEntry) в порядке исходных данных.
+        raw_size (int): Размер исходных данных.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._file = f
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if file_size < _HEADER.size + _FOOTER.size:
+            raise ValueError("Файл слишком короткий для контейнера")
+
+        f.seek(file_size - _FOOTER.size)
+        index_offset, n_blocks, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        # Индекс лежит прямо перед хвостом - по нему находится начало контейнера
+        index_position = file_size - _FOOTER.size - n_blocks * _ENTRY.size
+        self._start = index_position - index_offset
+        if magic != MAGIC or self._start < 0:
+            raise ValueError("Поврежден хвост контейнера (неверная сигнатура или смещение индекса)")
+        f.seek(index_position)
+        index = f.read(n_blocks * _ENTRY.size)
+        self.blocks = [BlockEntry(*entry) for entry in _ENTRY.iter_unpack(index)]
+
+        f.seek(self._start)
+        magic, version, flags, name_length = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Это не контейнер (неверная сигнатура)")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата: {version}")
+        self.algo_name = f.read(name_length).decode("utf-8")
+        self._shared_lengths = f.read(CODEBOOK_SIZE) if flags & FLAG_SHARED_CODEBOOK else None
+
+        self.raw_size = self.blocks[-1].raw_offset + self.blocks[-1].raw_size if self.blocks else 0
+        self._raw_offsets = [entry.raw_offset for entry in self.blocks]
+
+    def _read_blocks(self, entries: List[BlockEntry], max_workers: Optional[int]) -> bytes:
+        args = []
+        for entry in entries:
+            self._file.seek(self._start + entry.offset)
+            args.append((self._file.read(entry.stored_size), entry.raw_size, self._shared_lengths))
+        return b"".join(_map_blocks(_decode_block, args, max_workers))
+
+    def read_range(self, start: int, stop: int, max_workers: Optional[int] = 1) -> bytes:
+        """
+        Исходные байты [start, stop): декодируются только блоки, которые
+        пересекают диапазон (поиск по индексу - бинарный).
+        """
+        start, stop = max(0, start), min(stop, self.raw_size)
+        if start >= stop:
+            return b""
+        first = bisect_right(self._raw_offsets, start) - 1
+        last = bisect_right(self._raw_offsets, stop - 1)
+        entries = self.blocks[first:last]
+        data = self._read_blocks(entries, max_workers)
+        skip = start - entries[0].raw_offset
+        return data[skip:skip + stop - start]
+
+    def read_all(self, max_workers: Optional[int] = None) -> bytes:
+        """Все исходные данные; блоки декодируются параллельно."""
+        return self._read_blocks(self.blocks, max_workers)
+
+
+def compress(data: bytes, **kwargs) -> bytes:
+    """`write_container` в память (аргументы те же)."""
+    buffer = io.BytesIO()
+    write_container(data, buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def decompress(container: bytes, max_workers: Optional[int] = None) -> bytes:
+    return ContainerReader(io.BytesIO(container)).read_all(max_workers)
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+    import numpy as np
+    from random_probs import generate_probabilities
+
+    from rich.console import Console
+    from rich.table import Table
+    from rich import print as rprint
+
+    # Данные: байты с "перекошенным" распределением, которое меняется
+    # по ходу файла - свой словарь у каждого блока здесь выгоден
+    np.random.seed(0)
+    n_bytes, n_parts = 4_000_000, 4
+    parts = []
+    for _ in range(n_parts):
+        probabilities = generate_probabilities(256, method='loguniform', decimals=12, min_prob=1e-9)
+        weights = np.fromiter(probabilities.values(), dtype=np.float64)
+        parts.append(np.random.choice(256, size=n_bytes // n_parts, p=weights / weights.sum()).astype(np.uint8))
+    data = np.concatenate(parts).tobytes()
+
+    table = Table(title=f"[bold]Блочный контейнер, {n_bytes / 1e6:.0f} МБ, блок {DEFAULT_BLOCK_SIZE >> 10} КБ[/bold]")
+    for column in ("Словарь", "Процессов", "Сжатие, с", "Распаковка, с", "Бит/байт"):
+        table.add_column(column, justify="left" if column == "Словарь" else "right")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for shared in (False, True):
+            for workers in (1, 4):
+                path = os.path.join(tmp_dir, "data.hsbc")
+                start_time = time.perf_counter()
+                with open(path, "wb") as f:
+                    write_container(data, f, shared_codebook=shared, max_workers=workers)
+                encode_time = time.perf_counter() - start_time
+                with open(path, "rb") as f:
+                    start_time = time.perf_counter()
+                    restored = ContainerReader(f).read_all(max_workers=workers)
+                    decode_time = time.perf_counter() - start_time
+                if restored != data:
+                    raise RuntimeError("Распакованные данные не совпали с исходными")
+                table.add_row("общий" if shared else "свой у блока", str(workers), f"{encode_time:.2f}",
+                              f"{decode_time:.2f}", f"{8 * os.path.getsize(path) / n_bytes:.4f}")
+
+        # Произвольный доступ: короткие диапазоны из случайных мест файла
+        with open(path, "rb") as f:
+            reader = ContainerReader(f)
+            random.seed(0)
+            start_time = time.perf_counter()
+            for _ in range(20):
+                start = random.randrange(n_bytes - 4096)
+                if reader.read_range(start, start + 4096) != data[start:start + 4096]:
+                    raise RuntimeError("read_range вернул не те байты")
+            range_time = (time.perf_counter() - start_time) / 20
+
+    Console().print(table)
+    rprint(f"[bold]read_range (4 КБ):[/bold] {range_time * 1000:.0f} мс на запрос "
+           f"(декодируется 1-2 блока из {len(reader.blocks)})")
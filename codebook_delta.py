@@ -0,0 +1,304 @@
+import hashlib
+import json
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Hashable, List, Tuple
+
+# --- Импорты наших модулей ---
+import bitstream
+import verification
+
+FORMAT_NAME = "codebook-delta"
+FORMAT_VERSION = 1
+_MASK64 = (1 << 64) - 1
+
+# Перемещение символа между длинами: (символ, старая длина, новая длина).
+# Длина 0 - символа нет (старая 0 - символ добавлен, новая 0 - удален).
+Move = Tuple[Hashable, int, int]
+
+
+def _entry_hash(symbol: Hashable, length: int) -> int:
+    digest = hashlib.blake2b(repr((symbol, length)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def lengths_fingerprint(code_lengths: Dict[Hashable, int]) -> int:
+    """
+    Отпечаток словаря: сумма хешей пар (символ, длина) по модулю 2^64.
+    От порядка не зависит и пересчитывается за O(1) на каждое перемещение,
+    поэтому декодер сверяет базу и результат дельты без прохода по N символам.
+    """
+    return sum(_entry_hash(symbol, length) for symbol, length in code_lengths.items() if length) & _MASK64
+
+
+@dataclass
+class CodebookDelta:
+    """
+    Разница двух канонических словарей.
+
+    Канонический код задается длинами: символы идут по (длина, символ)
+    (как в bitstream.canonical_codebook). Поэтому перестановка символов
+    в каноническом порядке полностью описывается перемещениями символов
+    между корзинами длин. Символы, у которых длина не менялась, остаются
+    на местах относительно друг друга, хотя их коды могут сдвинуться.
+
+    Атрибуты:
+        base (int): Отпечаток словаря, к которому применяется дельта.
+        target (int): Отпечаток словаря после применения.
+        moves (list): [(символ, старая длина, новая длина), ...] - только измененные символы.
+    """
+    base: int
+    target: int
+    moves: List[Move]
+
+    @property
+    def n_changed(self) -> int:
+        return len(self.moves)
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "base": f"{self.base:016x}",
+            "target": f"{self.target:016x}",
+            "moves": [list(move) for move in self.moves],
+        }
+
+    @classmethod
+    def from_json(cls, payload: Dict[str, object]) -> "CodebookDelta":
+        if payload.get("format") != FORMAT_NAME or payload.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемый формат дельты: {payload.get('format')} v{payload.get('version')}")
+        return cls(int(payload["base"], 16), int(payload["target"], 16),
+                   [(symbol, old, new) for symbol, old, new in payload["moves"]])
+
+
+def diff_codebooks(old_lengths: Dict[Hashable, int], new_lengths: Dict[Hashable, int]) -> CodebookDelta:
+    """
+    Строит дельту между словарями, заданными длинами кодов.
+    Проход по обоим словарям (O(N)) делается один раз, на стороне кодера.
+    """
+    moves: List[Move] = []
+    for symbol, old in old_lengths.items():
+        new = new_lengths.get(symbol, 0)
+        if new != old:
+            moves.append((symbol, old, new))
+    for symbol, new in new_lengths.items():
+        if new and symbol not in old_lengths:
+            moves.append((symbol, 0, new))
+    return CodebookDelta(lengths_fingerprint(old_lengths), lengths_fingerprint(new_lengths), moves)
+
+
+class CanonicalCodebook:
+    """
+    Канонический словарь в форме, удобной для правки на месте.
+
+    Вместо таблицы {код: символ} (ее пришлось бы строить заново: смена
+    одной длины сдвигает коды всех символов после нее) хранятся корзины
+    символов каждой длины, отсортированные по символу, и первый код
+    каждой длины. Код символа = первый код его длины + позиция в корзине.
+    Перемещение символа - удаление и вставка в две корзины (bisect);
+    первые коды пересчитываются за O(число разных длин).
+    """
+
+    def __init__(self, code_lengths: Dict[Hashable, int]):
+        self.lengths: Dict[Hashable, int] = {}
+        self.buckets: Dict[int, List[Hashable]] = {}
+        for symbol, length in sorted(code_lengths.items(), key=lambda item: (item[1], item[0])):
+            if length:
+                self.lengths[symbol] = length
+                self.buckets.setdefault(length, []).append(symbol)
+        self.fingerprint = lengths_fingerprint(self.lengths)
+        self._rebuild_levels()
+
+    @staticmethod
+    def _first_codes(counts: Dict[int, int]) -> Dict[int, int]:
+        """Первые коды каждой длины; ValueError, если длины нарушают неравенство Крафта."""
+        first_codes: Dict[int, int] = {}
+        code = 0
+        previous_length = 0
+        for length in sorted(counts):
+            code <<= length - previous_length
+            first_codes[length] = code
+            code += counts[length]
+            if code > (1 << length):
+                raise ValueError("Длины кодов не удовлетворяют неравенству Крафта")
+            previous_length = length
+        return first_codes
+
+    def _rebuild_levels(self):
+        self.first_codes = self._first_codes({length: len(bucket) for length, bucket in self.buckets.items()})
+        # Уровни декодера по длине: (первый код, корзина). Корзины - те же списки,
+        # поэтому правка корзины сразу видна декодеру
+        self._levels: List = [None] * (max(self.buckets, default=0) + 1)
+        for length, bucket in self.buckets.items():
+            self._levels[length] = (self.first_codes[length], bucket)
+
+    def code(self, symbol: Hashable) -> Tuple[int, int]:
+        """(значение кода, длина) одного символа - без построения всего словаря."""
+        length = self.lengths[symbol]
+        return self.first_codes[length] + bisect_left(self.buckets[length], symbol), length
+
+    def codebook(self) -> Dict[Hashable, Tuple[int, int]]:
+        """Весь словарь {символ: (значение, длина)}, как у bitstream.canonical_codebook."""
+        return {symbol: (self.first_codes[length] + offset, length)
+                for length, bucket in self.buckets.items()
+                for offset, symbol in enumerate(bucket)}
+
+    def decode(self, data: bytes, n_symbols: int) -> List[Hashable]:
+        """Декодирует `n_symbols` символов: на каждой длине код сравнивается с диапазоном ее корзины."""
+        result: List[Hashable] = []
+        if n_symbols <= 0:
+            return result
+        levels = self._levels
+        max_length = len(levels) - 1
+        append = result.append
+        code = 0
+        length = 0
+        for byte in data:
+            for shift in (7, 6, 5, 4, 3, 2, 1, 0):
+                code = (code << 1) | ((byte >> shift) & 1)
+                length += 1
+                if length > max_length:
+                    raise ValueError("В потоке битов нет кода такой длины")
+                level = levels[length]
+                if level is not None and 0 <= code - level[0] < len(level[1]):
+                    append(level[1][code - level[0]])
+                    if len(result) == n_symbols:
+                        return result
+                    code = 0
+                    length = 0
+        raise ValueError("Поток битов закончился раньше, чем было декодировано n_symbols символов")
+
+    def apply(self, delta: CodebookDelta):
+        """
+        Применяет дельту на месте за O(k log N) для k перемещений
+        (плюс сдвиг элементов внутри корзин - memmove на C).
+
+        Все проверки (база, старые длины, неравенство Крафта, итоговый
+        отпечаток) делаются до изменений: при ошибке словарь не меняется.
+        """
+        if delta.base != self.fingerprint:
+            raise ValueError("Дельта построена для другого словаря (не совпал отпечаток базы)")
+        counts = {length: len(bucket) for length, bucket in self.buckets.items()}
+        fingerprint = self.fingerprint
+        for symbol, old, new in delta.moves:
+            if self.lengths.get(symbol, 0) != old:
+                raise ValueError(f"Длина символа {symbol!r} в словаре не совпадает с базой дельты")
+            if old:
+                counts[old] -= 1
+                fingerprint -= _entry_hash(symbol, old)
+            if new:
+                counts[new] = counts.get(new, 0) + 1
+                fingerprint += _entry_hash(symbol, new)
+        fingerprint &= _MASK64
+        if fingerprint != delta.target:
+            raise ValueError("Отпечаток словаря после дельты не совпал с ожидаемым")
+        self._first_codes({length: count for length, count in counts.items() if count})
+
+        for symbol, old, new in delta.moves:
+            if old:
+                bucket = self.buckets[old]
+                del bucket[bisect_left(bucket, symbol)]
+                if not bucket:
+                    del self.buckets[old]
+                del self.lengths[symbol]
+            if new:
+                insort(self.buckets.setdefault(new, []), symbol)
+                self.lengths[symbol] = new
+        self.fingerprint = fingerprint
+        self._rebuild_levels()
+
+
+def check_delta_round_trip(base_lengths: Dict[Hashable, int], delta: CodebookDelta,
+                           codes: Dict[Hashable, str]) -> bool:
+    """
+    Проверка перед рассылкой: каждый символ кодируется ПОЛНЫМ словарем
+    кодера ({символ: '0101'}), а декодируется словарем, который получит
+    декодер - базовым с примененной дельтой. Совпасть должны все символы.
+    """
+    codebook = CanonicalCodebook(base_lengths)
+    codebook.apply(delta)
+    symbols = list(codes)
+    writer = bitstream.BitWriter()
+    for symbol in symbols:
+        writer.write(int(codes[symbol], 2), len(codes[symbol]))
+    return codebook.decode(writer.getvalue(), len(symbols)) == symbols
+
+
+def lengths_from_codes_file(path: Path) -> Dict[str, int]:
+    """
+    Длины кодов из файла `*_codes.json`, который пишет main.py ({символ: '0101'}).
+    Файл проверяется (verification.load_verified_codes): дельта от испорченного
+    или непрефиксного словаря не строится.
+    """
+    return {symbol: len(code) for symbol, code in verification.load_verified_codes(path).items()}
+
+
+def save_delta(delta: CodebookDelta, path: Path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(delta.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_delta(path: Path) -> CodebookDelta:
+    with open(path, 'r', encoding='utf-8') as f:
+        return CodebookDelta.from_json(json.load(f))
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from random_probs import generate_probabilities
+
+    import algorithms
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="[bold]Дельта словаря против полного словаря[/bold]")
+    for column in ("N", "Сдвиг", "Изменено", "Дельта, байт", "Словарь, байт",
+                   "Применение, мс", "Пересборка, мс", "Совпадает"):
+        table.add_column(column, justify="right")
+
+    random.seed(0)
+    for n_symbols in (10_000, 100_000):
+        probabilities = generate_probabilities(n_symbols, method='uniform', decimals=8, min_prob=1e-8)
+        symbols, code_values, code_lengths = algorithms.generate_int_codes("Хаффман (группы весов)", probabilities)
+        old_lengths = dict(zip(symbols, code_lengths))
+        full_size = len(json.dumps({symbol: algorithms.int_code_to_str(value, length)
+                                    for symbol, value, length in zip(symbols, code_values, code_lengths)}, indent=4))
+
+        for shifted_share in (0.001, 0.01):
+            # Сдвиг распределения: часть символов меняет вероятность в 2-4 раза
+            shifted = dict(probabilities)
+            for symbol in random.sample(sorted(shifted), int(n_symbols * shifted_share)):
+                shifted[symbol] *= random.choice((0.25, 0.5, 2.0, 4.0))
+            total = sum(shifted.values())
+            shifted = {symbol: prob / total for symbol, prob in shifted.items()}
+            symbols, _, code_lengths = algorithms.generate_int_codes("Хаффман (группы весов)", shifted)
+            new_lengths = dict(zip(symbols, code_lengths))
+
+            delta = diff_codebooks(old_lengths, new_lengths)
+            delta_size = len(json.dumps(delta.to_json(), separators=(",", ":")))
+
+            codebook = CanonicalCodebook(old_lengths)
+            start_time = time.perf_counter()
+            codebook.apply(delta)
+            apply_time = time.perf_counter() - start_time
+
+            # Как без дельты: канонические коды и таблица декодера с нуля
+            start_time = time.perf_counter()
+            expected = bitstream.canonical_codebook(new_lengths)
+            bitstream.build_decode_table(expected)
+            rebuild_time = time.perf_counter() - start_time
+
+            sample = random.choices(symbols, k=10_000)
+            data, _ = bitstream.encode_symbols(sample, expected)
+            matches = (codebook.codebook() == expected and codebook.decode(data, len(sample)) == sample
+                       and check_delta_round_trip(old_lengths, delta, {
+                           symbol: algorithms.int_code_to_str(value, length)
+                           for symbol, (value, length) in expected.items()}))
+            table.add_row(f"{n_symbols:,}", f"{shifted_share:.1%}", f"{delta.n_changed:,}", f"{delta_size:,}",
+                          f"{full_size:,}", f"{apply_time * 1000:.1f}", f"{rebuild_time * 1000:.1f}",
+                          "да" if matches else "[red]НЕТ[/red]")
+    Console().print(table)
@@ -0,0 +1,104 @@
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+# --- Импорты наших модулей ---
+import algorithms
+import metrics
+
+# Начиная с этого N каждый алгоритм считается в отдельном процессе.
+# На малых N запуск процессов дороже самого расчета.
+PARALLEL_THRESHOLD = 5000
+
+
+def _default_symbols(n: int) -> List[str]:
+    return [f"z{i + 1}" for i in range(n)]
+
+
+def _evaluate(algo_name: str, probabilities: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Строит коды одним алгоритмом и возвращает строку сравнения
+    (только числа - сами коды обратно не передаются).
+    """
+    row: Dict[str, Any] = {"algorithm": algo_name}
+    start_time = time.perf_counter()
+    try:
+        symbols, _, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+    except RecursionError:
+        row["error"] = "превышена глубина рекурсии"
+        return row
+    except ValueError as e:
+        # Коды без дерева не строятся, например, при нулевых вероятностях
+        row["error"] = str(e)
+        return row
+    row["build_time"] = time.perf_counter() - start_time
+    row.update(metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths))))
+    return row
+
+
+def evaluate_shared(algo_name: str, shm_name: str, n: int,
+                     symbols: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Точка входа процесса-воркера: читает вероятности из общей памяти
+    (без pickle всего словаря) и считает один алгоритм.
+
+    Args:
+        symbols (list, optional): Имена символов. None - стандартные 'z1'..'zN'
+                                  (их дешевле сгенерировать, чем передавать).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast("d")
+        values = view[:n].tolist()
+        view.release()
+    finally:
+        shm.close()
+
+    names = symbols if symbols is not None else _default_symbols(n)
+    return _evaluate(algo_name, dict(zip(names, values)))
+
+
+def compare_all(probabilities: Dict[str, float],
+                algo_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Строит коды ВСЕМИ зарегистрированными алгоритмами для одного распределения.
+
+    При N >= PARALLEL_THRESHOLD алгоритмы считаются одновременно в разных
+    процессах, а массив вероятностей передается через общую память.
+    Общее время ~ время самого медленного алгоритма, а не сумма.
+
+    Args:
+        probabilities (dict): Словарь {'z1': p1, 'z2': p2, ...}.
+        algo_names (list, optional): Какие алгоритмы сравнивать
+                                     (по умолчанию - все из ALL_ALGORITHMS).
+
+    Returns:
+        list: Строки сравнения {'algorithm', 'H', 'L_avg', 'r', 'K',
+              'max_length', 'length_variance', 'build_time'} (или {'algorithm', 'error'}).
+    """
+    if algo_names is None:
+        algo_names = list(algorithms.ALL_ALGORITHMS)
+
+    n = len(probabilities)
+    if n < PARALLEL_THRESHOLD or len(algo_names) < 2:
+        return [_evaluate(name, probabilities) for name in algo_names]
+
+    symbols: Optional[List[str]] = list(probabilities)
+    if symbols == _default_symbols(n):
+        symbols = None
+
+    values = array("d", probabilities.values())
+    shm = shared_memory.SharedMemory(create=True, size=values.itemsize * n)
+    try:
+        view = shm.buf.cast("d")
+        view[:n] = values
+        view.release()
+
+        with ProcessPoolExecutor(max_workers=len(algo_names)) as pool:
+            futures = [pool.submit(evaluate_shared, name, shm.name, n, symbols) for name in algo_names]
+            return [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
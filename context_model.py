@@ -0,0 +1,243 @@
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import bitstream
+import metrics
+
+# Начиная с этого числа контекстов словари строятся в пуле процессов.
+# На малых алфавитах запуск процессов дороже самих деревьев.
+PARALLEL_THRESHOLD = 64
+# Длины кодов хранятся по байту (array 'B')
+MAX_CODE_LENGTH = 255
+
+
+def count_transitions(stream: Sequence[Hashable]) -> Tuple[List[Hashable], List[Dict[int, int]]]:
+    """
+    Счетчики переходов "предыдущий символ -> следующий" по индексам алфавита.
+
+    Returns:
+        tuple: (алфавит (отсортирован), строки счетчиков). Строка i - контекст
+               "предыдущий символ = alphabet[i]", последняя строка (индекс N) -
+               стартовый контекст для первого символа потока.
+    """
+    alphabet = sorted(set(stream))
+    index = {symbol: i for i, symbol in enumerate(alphabet)}
+    pair_counts = Counter(zip(stream, stream[1:]))
+    rows: List[Dict[int, int]] = [{} for _ in range(len(alphabet) + 1)]
+    for (previous, current), count in pair_counts.items():
+        rows[index[previous]][index[current]] = count
+    if stream:
+        rows[len(alphabet)][index[stream[0]]] = 1
+    return alphabet, rows
+
+
+def _context_code_lengths(row: Dict[int, int], algo_name: str) -> Dict[int, int]:
+    """Точка входа воркера: длины кодов одного контекста {индекс символа: длина}."""
+    total = sum(row.values())
+    # Имена вида 'zN' - этого ждут алгоритмы и функции из metrics
+    probabilities = {f"z{i + 1}": count / total for i, count in row.items()}
+    symbols, _, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+    return {int(symbol[1:]) - 1: length for symbol, length in zip(symbols, code_lengths)}
+
+
+@dataclass
+class ContextModel:
+    """
+    Код порядка 1: свой префиксный код для каждого предыдущего символа.
+
+    Словари хранятся только для встреченных переходов (разреженные строки,
+    как CSR): переходы контекста c - позиции offsets[c] .. offsets[c + 1]
+    в параллельных массивах symbols (индекс следующего символа) и lengths.
+    Память растет с числом разных переходов, а не как N^2.
+    Сами коды канонические (bitstream.canonical_codebook) и
+    восстанавливаются из длин при первом кодировании/декодировании.
+
+    Атрибуты:
+        alphabet (list): Символы; индекс символа = номер в symbols.
+        algo_name (str): Алгоритм, которым строились длины.
+        offsets (array): Начала строк, N + 2 чисел (N + 1 контекстов;
+                         последний контекст - стартовый).
+        symbols (array): Индексы следующих символов, по строкам.
+        lengths (array): Длины кодов, параллельно symbols.
+    """
+    alphabet: List[Hashable]
+    algo_name: str
+    offsets: array
+    symbols: array
+    lengths: array
+    _codebooks: Optional[List[Dict[int, Tuple[int, int]]]] = field(default=None, repr=False)
+
+    @property
+    def n_contexts(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def table_bytes(self) -> int:
+        """Сколько занимают все словари в компактной форме."""
+        return sum(len(part) * part.itemsize for part in (self.offsets, self.symbols, self.lengths))
+
+    def context_lengths(self, context: int) -> Dict[int, int]:
+        start, stop = self.offsets[context], self.offsets[context + 1]
+        return dict(zip(self.symbols[start:stop], self.lengths[start:stop]))
+
+    def codebooks(self) -> List[Dict[int, Tuple[int, int]]]:
+        if self._codebooks is None:
+            self._codebooks = [bitstream.canonical_codebook(self.context_lengths(context))
+                               for context in range(self.n_contexts)]
+        return self._codebooks
+
+    def encode(self, stream: Iterable[Hashable]) -> Tuple[bytes, int]:
+        """
+        Кодирует поток, переключая словарь по предыдущему символу.
+        Переход, которого не было при построении модели, - ValueError.
+
+        Returns:
+            tuple: (байты, точное число значимых бит).
+        """
+        index = {symbol: i for i, symbol in enumerate(self.alphabet)}
+        codebooks = self.codebooks()
+        writer = bitstream.BitWriter()
+        write = writer.write
+        context = len(self.alphabet)
+        for symbol in stream:
+            current = index.get(symbol)
+            code = codebooks[context].get(current)
+            if code is None:
+                raise ValueError(f"Переход в {symbol!r} не встречался при построении модели")
+            write(*code)
+            context = current
+        return writer.getvalue(), writer.bit_length
+
+    def decode(self, data: bytes, n_symbols: int) -> List[Hashable]:
+        """Декодирует `n_symbols` символов: таблица декодирования - по предыдущему символу."""
+        result: List[Hashable] = []
+        if n_symbols <= 0:
+            return result
+        alphabet = self.alphabet
+        decode_tables = [bitstream.build_decode_table(codebook) for codebook in self.codebooks()]
+        table = decode_tables[len(alphabet)]
+        append = result.append
+        key = 1
+        for byte in data:
+            for shift in (7, 6, 5, 4, 3, 2, 1, 0):
+                key = (key << 1) | ((byte >> shift) & 1)
+                current = table.get(key)
+                if current is not None:
+                    append(alphabet[current])
+                    if len(result) == n_symbols:
+                        return result
+                    table = decode_tables[current]
+                    key = 1
+        raise ValueError("Поток битов закончился раньше, чем было декодировано n_symbols символов")
+
+
+def build_context_model(stream: Sequence[Hashable], algo_name: str = "Хаффман",
+                        max_workers: Optional[int] = None) -> ContextModel:
+    """
+    Строит модель порядка 1 по потоку: счетчики переходов, затем по
+    одному коду на контекст. Деревья контекстов независимы и при
+    большом алфавите строятся в пуле процессов.
+
+    Args:
+        stream: Поток символов (любые сравнимые значения).
+        algo_name (str): Алгоритм из algorithms.ALL_ALGORITHMS.
+        max_workers (int, optional): Процессов (по умолчанию - число ядер).
+    """
+    if algo_name not in algorithms.ALL_ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм '{algo_name}'")
+    alphabet, rows = count_transitions(stream)
+    non_empty = [(context, row) for context, row in enumerate(rows) if row]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if len(non_empty) < PARALLEL_THRESHOLD or max_workers < 2:
+        context_lengths = [_context_code_lengths(row, algo_name) for _, row in non_empty]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            context_lengths = list(pool.map(
+                _context_code_lengths, [row for _, row in non_empty], [algo_name] * len(non_empty),
+                chunksize=max(1, len(non_empty) // (4 * max_workers)),
+            ))
+
+    by_context = dict(zip((context for context, _ in non_empty), context_lengths))
+    offsets = array("Q", [0])
+    symbols = array("I")
+    lengths = array("B")
+    for context in range(len(rows)):
+        for i, length in sorted(by_context.get(context, {}).items()):
+            if length > MAX_CODE_LENGTH:
+                raise ValueError(f"Длина кода {length} > {MAX_CODE_LENGTH}")
+            symbols.append(i)
+            lengths.append(length)
+        offsets.append(len(symbols))
+    return ContextModel(alphabet, algo_name, offsets, symbols, lengths)
+
+
+def context_report(stream: Sequence[Hashable], algo_names: Iterable[str] = ("Хаффман", "Шеннон-Фано"),
+                   max_workers: Optional[int] = None) -> Dict[str, object]:
+    """
+    Порядок 0 против порядка 1 на одном потоке.
+
+    Returns:
+        dict: {'H' (энтропия порядка 0), 'H_conditional' (H(Z|Z₋₁)),
+               'rows': [{'algorithm', 'L_order0', 'L_order1', 'table_bytes'}, ...]}.
+    """
+    n = len(stream)
+    alphabet, rows = count_transitions(stream)
+    counts = Counter(stream)
+    names = {symbol: f"z{i + 1}" for i, symbol in enumerate(alphabet)}
+    probabilities = {names[symbol]: count / n for symbol, count in counts.items()}
+
+    report: Dict[str, object] = {
+        "H": metrics.calculate_entropy(probabilities)[0],
+        "H_conditional": metrics.calculate_conditional_entropy({context: row for context, row in enumerate(rows)}),
+        "rows": [],
+    }
+    for algo_name in algo_names:
+        symbols, _, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+        l_order0 = metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths)))["L_avg"]
+
+        model = build_context_model(stream, algo_name, max_workers)
+        data, bit_length = model.encode(stream)
+        if model.decode(data, n) != list(stream):
+            raise RuntimeError(f"{algo_name}: декодирование не совпало с исходным потоком")
+        report["rows"].append({
+            "algorithm": algo_name,
+            "L_order0": l_order0,
+            "L_order1": bit_length / n,
+            "table_bytes": model.table_bytes,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import glob
+    import time
+    from rich.console import Console
+    from rich.table import Table
+    from rich import print as rprint
+
+    # Текст: README и исходники проекта, поток символов
+    text = "".join(open(path, encoding="utf-8").read() for path in sorted(glob.glob("*.py")) + ["README.md"])
+    stream = list(text)
+
+    start_time = time.perf_counter()
+    report = context_report(stream)
+    rprint(f"[dim]Отчет за {time.perf_counter() - start_time:.1f} с[/dim]")
+
+    table = Table(title=f"[bold]Контекст порядка 1: {len(stream):,} символов, "
+                        f"алфавит {len(set(stream))}[/bold]")
+    for column in ("Алгоритм", "L_avg (порядок 0)", "Бит/символ (порядок 1)", "Словари, байт"):
+        table.add_column(column, justify="left" if column == "Алгоритм" else "right")
+    for row in report["rows"]:
+        table.add_row(row["algorithm"], f"{row['L_order0']:.4f}", f"{row['L_order1']:.4f}",
+                      f"{row['table_bytes']:,}")
+    Console().print(table)
+    rprint(f"  [bold yellow]H(Z):[/bold yellow] {report['H']:.4f} бит   "
+           f"[bold yellow]H(Z|Z₋₁):[/bold yellow] {report['H_conditional']:.4f} бит")
@@ -0,0 +1,218 @@
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+from data_structures import DaryNode
+import metrics
+
+from rich import print as rprint
+
+MAX_BASE = 256
+_DIGIT_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# D-ичный код - это последовательность цифр 0..D-1.
+# Для D > 36 одним символом цифру уже не записать, поэтому код - кортеж int.
+DaryCode = Tuple[int, ...]
+
+
+def _check_base(base: int):
+    if not (2 <= base <= MAX_BASE):
+        raise ValueError(f"Основание кода D должно быть в диапазоне [2, {MAX_BASE}], получено {base}")
+
+
+def _dummy_leaves_count(n: int, base: int) -> int:
+    """
+    Сколько фиктивных листьев с нулевой вероятностью нужно добавить,
+    чтобы каждое слияние брало РОВНО D узлов: (N + z - 1) % (D - 1) == 0.
+    """
+    return (base - 1 - (n - 1) % (base - 1)) % (base - 1)
+
+
+def build_dary_huffman_tree(probabilities: Dict[str, float], base: int) -> Optional[DaryNode]:
+    """
+    Строит D-ичное дерево Хаффмана.
+
+    Листья один раз сортируются, дальше слияния идут на двух очередях
+    (отсортированные листья + FIFO уже слитых узлов, веса которых растут
+    сами собой), без heapq: O(N log N) на сортировку + O(N) на слияния.
+
+    Правило ветвления как в двоичном варианте: чем больше P,
+    тем меньше цифра ветки (самый вероятный ребенок - '0').
+
+    Args:
+        probabilities (dict): Словарь {'z1': p1, 'z2': p2, ...}.
+        base (int): Основание кода D (2..256).
+
+    Returns:
+        DaryNode | None: Корень дерева или None, если входные данные пусты.
+    """
+    _check_base(base)
+    if not probabilities:
+        return None
+
+    leaves = [DaryNode(probability=0.0) for _ in range(_dummy_leaves_count(len(probabilities), base))]
+    leaves += sorted(
+        (DaryNode(probability=prob, symbol=symbol) for symbol, prob in probabilities.items()),
+        key=lambda node: node.probability
+    )
+    if len(leaves) == 1:
+        return leaves[0]
+
+    merged: List[DaryNode] = []
+    leaf_pos = 0
+    merged_pos = 0
+
+    # Шаг "Редукция": пока не останется 1 узел (корень)
+    while (len(leaves) - leaf_pos) + (len(merged) - merged_pos) > 1:
+        children: List[DaryNode] = []
+        for _ in range(base):
+            take_leaf = (
+                leaf_pos < len(leaves)
+                and (merged_pos >= len(merged) or leaves[leaf_pos].probability <= merged[merged_pos].probability)
+            )
+            if take_leaf:
+                children.append(leaves[leaf_pos])
+                leaf_pos += 1
+            else:
+                children.append(merged[merged_pos])
+                merged_pos += 1
+
+        # Достали по возрастанию P - разворачиваем, чтобы цифра 0 была у самого вероятного
+        children.reverse()
+        merged.append(DaryNode(probability=sum(child.probability for child in children), children=children))
+
+    return merged[-1]
+
+
+def _split_points(prefix_sums: List[float], lo: int, hi: int, base: int) -> List[int]:
+    """
+    Делит отсортированный отрезок [lo, hi) на `base` непустых групп
+    с максимально близкими суммами вероятностей (поиск по префиксным суммам).
+    """
+    total = prefix_sums[hi] - prefix_sums[lo]
+    cuts = [lo]
+    for k in range(1, base):
+        target = prefix_sums[lo] + total * k / base
+        idx = bisect_left(prefix_sums, target, lo + 1, hi)
+        # Берем ближайшую к цели границу
+        if idx > lo + 1 and target - prefix_sums[idx - 1] <= prefix_sums[idx] - target:
+            idx -= 1
+        # Каждая группа должна быть непустой
+        idx = max(idx, cuts[-1] + 1)
+        idx = min(idx, hi - (base - k))
+        cuts.append(idx)
+    cuts.append(hi)
+    return cuts
+
+
+def build_dary_shannon_fano_tree(probabilities: Dict[str, float], base: int) -> Optional[DaryNode]:
+    """
+    Строит D-ичное дерево Шеннона-Фано (сверху вниз): каждая группа
+    делится на D подгрупп с примерно равными суммами.
+
+    Обход - на явном стеке, поэтому глубина дерева не упирается
+    в лимит рекурсии Python.
+
+    Args:
+        probabilities (dict): Словарь {'z1': p1, 'z2': p2, ...}.
+        base (int): Основание кода D (2..256).
+
+    Returns:
+        DaryNode | None: Корень дерева или None, если входные данные пусты.
+    """
+    _check_base(base)
+    if not probabilities:
+        return None
+
+    # 1. Сортируем символы по УБЫВАНИЮ вероятности
+    sorted_probs = sorted(probabilities.items(), key=lambda item: item[1], reverse=True)
+    prefix_sums = [0.0] + list(accumulate(prob for _, prob in sorted_probs))
+
+    def _make_node(lo: int, hi: int) -> DaryNode:
+        if hi - lo == 1:
+            symbol, prob = sorted_probs[lo]
+            return DaryNode(probability=prob, symbol=symbol)
+        return DaryNode(probability=prefix_sums[hi] - prefix_sums[lo])
+
+    root = _make_node(0, len(sorted_probs))
+    stack = [(root, 0, len(sorted_probs))]
+    while stack:
+        node, lo, hi = stack.pop()
+        if node.symbol is not None:
+            continue
+        if hi - lo <= base:
+            cuts = list(range(lo, hi + 1))
+        else:
+            cuts = _split_points(prefix_sums, lo, hi, base)
+        for start, end in zip(cuts, cuts[1:]):
+            child = _make_node(start, end)
+            node.children.append(child)
+            stack.append((child, start, end))
+
+    return root
+
+
+def generate_dary_codes_from_tree(tree_root: Optional[DaryNode]) -> Dict[str, DaryCode]:
+    """
+    Обходит D-ичное дерево (на явном стеке) и генерирует коды.
+    Фиктивные листья (symbol=None) в словарь не попадают.
+
+    Returns:
+        dict: Словарь кодов {'z1': (0, 2), 'z2': (1,), ...}.
+    """
+    codes_dictionary: Dict[str, DaryCode] = {}
+    if tree_root is None:
+        return codes_dictionary
+
+    stack: List[Tuple[DaryNode, DaryCode]] = [(tree_root, ())]
+    while stack:
+        node, code = stack.pop()
+        if not node.children:
+            if node.symbol is not None:
+                # Если в дереве всего 1 узел, его код будет "0"
+                codes_dictionary[node.symbol] = code if code else (0,)
+            continue
+        for digit, child in enumerate(node.children):
+            stack.append((child, code + (digit,)))
+
+    return codes_dictionary
+
+
+def format_dary_code(code: DaryCode, base: int) -> str:
+    """
+    Строка для вывода/JSON: при D <= 36 - по символу на цифру ('0'-'9', 'a'-'z'),
+    иначе цифры через точку ('17.255.3').
+    """
+    if base <= len(_DIGIT_CHARS):
+        return "".join(_DIGIT_CHARS[digit] for digit in code)
+    return ".".join(str(digit) for digit in code)
+
+
+# Реестр D-ичных алгоритмов по аналогии с algorithms.TREE_BUILDERS
+DARY_TREE_BUILDERS = {
+    "Хаффман": build_dary_huffman_tree,
+    "Шеннон-Фано": build_dary_shannon_fano_tree,
+}
+
+
+if __name__ == "__main__":
+    import time
+    from random_probs import generate_probabilities
+
+    n_symbols = 100_000
+    probabilities = generate_probabilities(n_symbols, method='dirichlet', decimals=9, min_prob=1e-10)
+    probabilities = {symbol: float(prob) for symbol, prob in probabilities.items()}
+
+    rprint(f"[bold]D-ичные коды, N={n_symbols:,}[/bold]")
+    for base in (2, 3, 4, 16, 256):
+        for algo_name, builder in DARY_TREE_BUILDERS.items():
+            start_time = time.perf_counter()
+            codes = generate_dary_codes_from_tree(builder(probabilities, base))
+            build_time = time.perf_counter() - start_time
+            summary = metrics.calculate_summary(probabilities, codes, base)
+            rprint(
+                f"  D={base:>3} {algo_name:<12} H={summary['H']:.4f} L_avg={summary['L_avg']:.4f} "
+                f"r={summary['r']:.4f} K={summary['K']:.6f} max L={summary['max_length']} "
+                f"[dim]({build_time:.3f} с)[/dim]"
+            )
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional
 
 @dataclass(order=True)
 class Node:
@@ -34,8 +34,101 @@ class Node:
     priority_tiebreaker: int = field(default=0)
 
 
+class CompactNode:
+    """
+    Компактный узел - замена `Node` для больших N (тот же интерфейс).
+
+    * `__slots__` вместо `__dict__` у каждого экземпляра;
+    * `combined_name` НЕ хранится, а собирается из листьев по запросу
+      (у `Node` на каждом уровне дерева хранится своя склейка имен -
+      суммарно O(N * глубина) символов).
+
+    Порядок (для heapq) и равенство - как у `Node`:
+    по (probability, priority_tiebreaker).
+    """
+    __slots__ = ("probability", "symbol", "left_child", "right_child", "priority_tiebreaker")
+
+    def __init__(self, probability: float, symbol: Optional[str] = None,
+                 left_child: Optional['CompactNode'] = None, right_child: Optional['CompactNode'] = None,
+                 priority_tiebreaker: int = 0):
+        self.probability = probability
+        self.symbol = symbol
+        self.left_child = left_child
+        self.right_child = right_child
+        self.priority_tiebreaker = priority_tiebreaker
+
+    @property
+    def combined_name(self) -> str:
+        """Имена листьев поддерева слева направо (напр. 'z1z5z4')."""
+        parts: List[str] = []
+        stack: List['CompactNode'] = [self]
+        while stack:
+            node = stack.pop()
+            if node.symbol is not None:
+                parts.append(node.symbol)
+                continue
+            if node.right_child is not None:
+                stack.append(node.right_child)
+            if node.left_child is not None:
+                stack.append(node.left_child)
+        return "".join(parts)
+
+    def _key(self):
+        return (self.probability, self.priority_tiebreaker)
+
+    def __lt__(self, other: 'CompactNode') -> bool:
+        return self._key() < other._key()
+
+    def __le__(self, other: 'CompactNode') -> bool:
+        return self._key() <= other._key()
+
+    def __gt__(self, other: 'CompactNode') -> bool:
+        return self._key() > other._key()
+
+    def __ge__(self, other: 'CompactNode') -> bool:
+        return self._key() >= other._key()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactNode):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"CompactNode(probability={self.probability!r}, symbol={self.symbol!r}, "
+                f"priority_tiebreaker={self.priority_tiebreaker!r})")
+
+
+# Какие классы узлов умеет создавать create_node
+NODE_CLASSES = {
+    "dataclass": Node,
+    "compact": CompactNode,
+}
+
 # Глобальный счетчик для 'priority_tiebreaker'
 _node_counter = 0
+# Класс узлов, которые сейчас создает create_node
+_node_class_name = "dataclass"
+
+
+def set_node_class(name: str) -> str:
+    """
+    Переключает класс узлов, создаваемых `create_node` (и значит,
+    всеми построителями деревьев).
+
+    Args:
+        name (str): 'dataclass' (Node, по умолчанию) или 'compact' (CompactNode).
+
+    Returns:
+        str: Предыдущее значение - чтобы его можно было вернуть.
+    """
+    global _node_class_name
+    if name not in NODE_CLASSES:
+        raise ValueError(f"Неизвестный класс узлов {name!r}. Доступны: {list(NODE_CLASSES)}")
+    previous, _node_class_name = _node_class_name, name
+    return previous
+
 
 def create_node(probability: float, symbol: Optional[str] = None, 
                 left: Optional['Node'] = None, right: Optional['Node'] = None,
@@ -52,17 +145,25 @@ def create_node(probability: float, symbol: Optional[str] = None,
         left (Node, optional): Левый дочерний узел (ветка '0').
         right (Node, optional): Правый дочерний узел (ветка '1').
         combined_name (str, optional): Имя для внутреннего узла.
-            Если не задано, используется 'symbol'.
+            Если не задано, используется 'symbol', а для внутреннего
+            узла - склейка имен детей (левый + правый).
 
     Returns:
-        Node: Новый экземпляр класса Node.
+        Node: Новый экземпляр класса Node (или CompactNode,
+              см. `set_node_class`).
     """
     global _node_counter
     _node_counter += 1
+
+    if _node_class_name == "compact":
+        # Имя не храним - CompactNode соберет его из листьев сам
+        return CompactNode(probability, symbol, left, right, _node_counter)
     
     # Если 'combined_name' не предоставлено,
     # по умолчанию используется 'symbol' (если он есть).
     final_name = combined_name if combined_name else (symbol if symbol else "")
+    if not final_name and (left is not None or right is not None):
+        final_name = (left.combined_name if left else "") + (right.combined_name if right else "")
     
     return Node(
         probability=probability,
@@ -71,4 +172,25 @@ def create_node(probability: float, symbol: Optional[str] = None,
         left_child=left,
         right_child=right,
         priority_tiebreaker=_node_counter
-    )
\ No newline at end of file
+    )
+
+
+@dataclass
+class DaryNode:
+    """
+    Узел D-ичного дерева кодирования (D >= 2).
+
+    Вместо пары left_child/right_child хранит список детей:
+    i-й ребенок соответствует цифре кода i (0 - самая вероятная ветка).
+    Сортировка не нужна - D-ичный Хаффман строится на очередях, а не на heapq.
+
+    Атрибуты:
+        probability (float): Вероятность узла.
+        symbol (str, optional): Имя символа, если это "лист".
+                                У фиктивных (дополняющих) листьев - None.
+        children (list): Потомки, по одному на цифру 0..D-1.
+    """
+
+    probability: float
+    symbol: Optional[str] = None
+    children: List['DaryNode'] = field(default_factory=list)
@@ -0,0 +1,258 @@
+import csv
+import itertools
+import json
+import os
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# --- Импорты наших модулей ---
+import algorithms
+import comparison
+from random_probs import generate_probabilities
+
+from rich.console import Console
+from rich.table import Table
+from rich import print as rprint
+
+console = Console()
+
+# Параметры распределения (одна "точка" сетки) и колонки результата
+POINT_FIELDS = ("n", "method", "min_prob", "decimals", "seed")
+RESULT_FIELDS = POINT_FIELDS + ("algorithm", "H", "L_avg", "r", "K", "max_length", "length_variance",
+                                "build_time", "error")
+
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "n": [100, 1000, 10000],
+    "method": ["uniform", "exponential", "dirichlet", "loguniform"],
+    "min_prob": [1e-7],
+    "decimals": [9],
+    "seed": [0, 1, 2],
+    "algorithm": list(algorithms.ALL_ALGORITHMS),
+}
+
+PointKey = Tuple[int, str, float, int, int]
+
+
+def _point_key(values: Dict[str, Any]) -> PointKey:
+    """Нормализованный ключ точки (значения из CSV приходят строками)."""
+    return (int(values["n"]), str(values["method"]), float(values["min_prob"]),
+            int(values["decimals"]), int(values["seed"]))
+
+
+def expand_grid(spec: Dict[str, List[Any]]) -> Tuple[List[PointKey], List[str]]:
+    """
+    Раскрывает спецификацию сетки в декартово произведение точек.
+
+    Args:
+        spec (dict): {'n': [...], 'method': [...], 'min_prob': [...],
+                      'decimals': [...], 'seed': [...], 'algorithm': [...]}.
+                     Пропущенные ключи берутся из DEFAULT_GRID.
+
+    Returns:
+        tuple: (список точек (n, method, min_prob, decimals, seed), список алгоритмов).
+    """
+    unknown = set(spec) - set(DEFAULT_GRID)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры сетки: {sorted(unknown)}")
+    grid = {**DEFAULT_GRID, **spec}
+
+    algo_names = list(grid["algorithm"])
+    for name in algo_names:
+        if name not in algorithms.ALL_ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм {name!r}. Доступны: {algorithms.ALL_ALGORITHMS}")
+
+    points = [
+        _point_key(dict(zip(POINT_FIELDS, combo)))
+        for combo in itertools.product(*(grid[field] for field in POINT_FIELDS))
+    ]
+    return points, algo_names
+
+
+def _load_completed(output_path: Path) -> Set[Tuple[PointKey, str]]:
+    """
+    Читает уже посчитанные пары (точка, алгоритм) для продолжения серии.
+    Недописанная последняя строка (серия прервана на записи) отрезается.
+    """
+    completed: Set[Tuple[PointKey, str]] = set()
+    if not output_path.exists() or output_path.stat().st_size == 0:
+        return completed
+
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    with open(output_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None or tuple(reader.fieldnames) != RESULT_FIELDS:
+            raise ValueError(f"{output_path}: колонки не совпадают с форматом серии экспериментов")
+        for row in reader:
+            completed.add((_point_key(row), row["algorithm"]))
+    return completed
+
+
+def _generate_to_shared(point: PointKey) -> Tuple[shared_memory.SharedMemory, int]:
+    """
+    Генерирует распределение ОДИН раз и кладет массив вероятностей
+    в общую память - все алгоритмы этой точки читают его оттуда.
+    """
+    n, method, min_prob, decimals, seed = point
+    np.random.seed(seed)
+    probabilities = generate_probabilities(n, method=method, decimals=decimals, min_prob=min_prob)
+
+    values = array("d", probabilities.values())
+    shm = shared_memory.SharedMemory(create=True, size=values.itemsize * n)
+    view = shm.buf.cast("d")
+    view[:n] = values
+    view.release()
+    return shm, n
+
+
+def _error_rows(algo_names: List[str], message: str) -> List[Dict[str, Any]]:
+    return [{"algorithm": name, "error": message} for name in algo_names]
+
+
+def run_sweep(spec: Dict[str, List[Any]], output_path: Path,
+              max_workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Прогоняет сетку экспериментов и дописывает строки в CSV по мере готовности.
+
+    * Распределение каждой точки генерируется один раз (в главном процессе)
+      и передается воркерам через общую память (comparison.evaluate_shared).
+    * Пока пул считает одни точки, главный процесс генерирует следующие;
+      одновременно в памяти живет не больше `max_workers` распределений.
+    * Уже посчитанные пары (точка, алгоритм) из `output_path` пропускаются,
+      поэтому прерванную серию достаточно запустить повторно.
+
+    Returns:
+        dict: {'total', 'skipped', 'written'} - число пар (точка, алгоритм).
+    """
+    points, algo_names = expand_grid(spec)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    completed = _load_completed(output_path)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    stats = {"total": len(points) * len(algo_names), "skipped": 0, "written": 0}
+    is_new_file = not output_path.exists() or output_path.stat().st_size == 0
+
+    with open(output_path, 'a', encoding='utf-8', newline='') as f, \
+            ProcessPoolExecutor(max_workers=max_workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if is_new_file:
+            writer.writeheader()
+
+        def _write(point: PointKey, rows: List[Dict[str, Any]]):
+            base = dict(zip(POINT_FIELDS, point))
+            for row in rows:
+                writer.writerow({**base, **row})
+            f.flush()
+            stats["written"] += len(rows)
+
+        pending: Deque[Tuple[PointKey, shared_memory.SharedMemory, List[Future]]] = deque()
+
+        def _drain_oldest():
+            point, shm, futures = pending.popleft()
+            try:
+                _write(point, [future.result() for future in futures])
+            finally:
+                shm.close()
+                shm.unlink()
+
+        try:
+            for point in points:
+                todo = [name for name in algo_names if (point, name) not in completed]
+                stats["skipped"] += len(algo_names) - len(todo)
+                if not todo:
+                    continue
+
+                try:
+                    shm, n = _generate_to_shared(point)
+                except ValueError as e:
+                    # Невозможная комбинация (например, n * min_prob >= 1)
+                    _write(point, _error_rows(todo, str(e)))
+                    continue
+
+                futures = [pool.submit(comparison.evaluate_shared, name, shm.name, n, None) for name in todo]
+                pending.append((point, shm, futures))
+                while len(pending) > max_workers:
+                    _drain_oldest()
+
+            while pending:
+                _drain_oldest()
+        finally:
+            # Прерывание (Ctrl+C): не оставляем сегменты общей памяти в системе
+            for _, shm, futures in pending:
+                for future in futures:
+                    future.cancel()
+                shm.close()
+                shm.unlink()
+
+    return stats
+
+
+def summarize(output_path: Path) -> Table:
+    """
+    Сводная таблица по CSV серии экспериментов: средние r и max L по сидам
+    для каждой комбинации (N, метод, алгоритм).
+    """
+    groups: Dict[Tuple[int, str, str], List[Tuple[float, int]]] = {}
+    errors: Dict[Tuple[int, str, str], int] = {}
+    with open(output_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            key = (int(row["n"]), row["method"], row["algorithm"])
+            if row["error"]:
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            groups.setdefault(key, []).append((float(row["r"]), int(row["max_length"])))
+
+    table = Table(title=f"[bold]Серия экспериментов: {output_path}[/bold]")
+    table.add_column("N", justify="right")
+    table.add_column("Метод", style="cyan")
+    table.add_column("Алгоритм", style="cyan")
+    table.add_column("Прогонов", justify="right")
+    table.add_column("r (среднее)", style="cyan", justify="right")
+    table.add_column("r (макс)", style="cyan", justify="right")
+    table.add_column("max L (среднее)", justify="right")
+    table.add_column("Ошибок", style="red", justify="right")
+    for key in sorted(set(groups) | set(errors)):
+        values = groups.get(key, [])
+        r_values = [r for r, _ in values]
+        lengths = [length for _, length in values]
+        table.add_row(
+            str(key[0]), key[1], key[2], str(len(values)),
+            f"{sum(r_values) / len(r_values):.6f}" if values else "—",
+            f"{max(r_values):.6f}" if values else "—",
+            f"{sum(lengths) / len(lengths):.1f}" if values else "—",
+            str(errors.get(key, 0)),
+        )
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Серия экспериментов: r = L_avg - H и max L по сетке параметров")
+    parser.add_argument("--grid", type=Path, help="JSON со спецификацией сетки (по умолчанию DEFAULT_GRID)")
+    parser.add_argument("--output", type=Path, default=Path("results") / "sweep.csv",
+                        help="CSV с результатами (дописывается, серия продолжается с места остановки)")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов пула")
+    args = parser.parse_args()
+
+    spec: Dict[str, List[Any]] = {}
+    if args.grid is not None:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+
+    start_time = time.perf_counter()
+    stats = run_sweep(spec, args.output, args.workers)
+    rprint(f"[bold green]Готово за {time.perf_counter() - start_time:.2f} с:[/bold green] "
+           f"пар (точка, алгоритм): {stats['total']}, уже были: {stats['skipped']}, записано: {stats['written']}")
+    console.print(summarize(args.output))
@@ -0,0 +1,236 @@
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import metrics
+
+from rich import print as rprint
+
+# Блоки с вероятностью ниже порога не получают своего кода,
+# а уходят в "escape"-корзину (escape-код + k символов фиксированной длины).
+DEFAULT_MIN_BLOCK_PROB = 1e-7
+# Жесткий предел числа блоков в кодовой книге - ограничивает память.
+DEFAULT_MAX_BLOCKS = 1 << 16
+
+Block = Tuple[str, ...]
+
+
+def iter_blocks_by_probability(probabilities: Dict[str, float], k: int) -> Iterator[Tuple[Block, float]]:
+    """
+    ЛЕНИВО перечисляет блоки k-го расширения источника (N^k исходов)
+    в порядке УБЫВАНИЯ вероятности p(b) = p(b1) * ... * p(bk).
+
+    Best-first обход по куче: у каждого набора индексов ровно один "родитель"
+    (уменьшаем последнюю ненулевую координату), поэтому повторов нет,
+    а куча растет не больше чем на k элементов за каждый выданный блок.
+
+    Yields:
+        tuple: (('z1', 'z3', ...), вероятность блока).
+    """
+    if k < 1:
+        raise ValueError("Длина блока k должна быть >= 1")
+    sorted_items = sorted(probabilities.items(), key=lambda item: item[1], reverse=True)
+    if not sorted_items:
+        return
+    symbols = [symbol for symbol, _ in sorted_items]
+    probs = [prob for _, prob in sorted_items]
+    n = len(symbols)
+
+    start = (0,) * k
+    # heapq - min-heap, поэтому храним -p
+    heap: List[Tuple[float, Tuple[int, ...], int]] = [(-probs[0] ** k, start, 0)]
+    while heap:
+        neg_prob, indices, last_pos = heapq.heappop(heap)
+        yield tuple(symbols[i] for i in indices), -neg_prob
+
+        for pos in range(last_pos, k):
+            if indices[pos] + 1 >= n:
+                continue
+            child = indices[:pos] + (indices[pos] + 1,) + indices[pos + 1:]
+            child_prob = math.prod(probs[i] for i in child)
+            heapq.heappush(heap, (-child_prob, child, pos))
+
+
+@dataclass
+class ExtensionCode:
+    """
+    Кодовая книга k-го расширения источника.
+
+    Атрибуты:
+        k (int): Длина блока.
+        codes (dict): Коды "частых" блоков {('z1', 'z2'): '010', ...}.
+        escape_code (str): Код escape-корзины ('' только при k = 1 без отброшенных блоков).
+        escape_probability (float): Суммарная вероятность отброшенных блоков.
+        symbols (list): Алфавит источника (для escape: номер символа).
+        raw_width (int): Длина номера символа после escape, бит.
+    """
+    k: int
+    codes: Dict[Block, str]
+    escape_code: str
+    escape_probability: float
+    symbols: List[str]
+    raw_width: int
+    _decode_table: Dict[str, Optional[Block]] = field(default_factory=dict, repr=False)
+
+    def encode(self, stream: Iterable[str]) -> Iterator[str]:
+        """
+        Потоковое кодирование по блокам из k символов.
+        Хвост короче k (и любые редкие блоки) идут через escape.
+        """
+        index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        block: List[str] = []
+        for symbol in stream:
+            block.append(symbol)
+            if len(block) == self.k:
+                yield self._encode_block(tuple(block), index)
+                block = []
+        if block:
+            yield self._encode_block(tuple(block), index, force_escape=True)
+
+    def _encode_block(self, block: Block, index: Dict[str, int], force_escape: bool = False) -> str:
+        code = None if force_escape else self.codes.get(block)
+        if code is not None:
+            return code
+        if not self.escape_code and self.codes:
+            raise ValueError("Блок не найден в кодовой книге, а escape-кода нет")
+        raw = "".join(format(index[symbol], f"0{self.raw_width}b") for symbol in block)
+        return self.escape_code + raw
+
+    def decode(self, bits: str, n_symbols: int) -> List[str]:
+        """Декодирует `n_symbols` символов из строки битов."""
+        if not self._decode_table:
+            self._decode_table = {code: block for block, code in self.codes.items()}
+            if self.escape_code:
+                self._decode_table[self.escape_code] = None
+
+        result: List[str] = []
+        pos = 0
+        while len(result) < n_symbols:
+            remaining = n_symbols - len(result)
+            if remaining < self.k:
+                # Хвост: всегда escape
+                pos += len(self.escape_code)
+                block_len = remaining
+            else:
+                end = pos + 1
+                while bits[pos:end] not in self._decode_table:
+                    if end > len(bits):
+                        raise ValueError("Поток битов оборвался посреди кодового слова")
+                    end += 1
+                block = self._decode_table[bits[pos:end]]
+                pos = end
+                if block is not None:
+                    result.extend(block)
+                    continue
+                block_len = self.k
+
+            for _ in range(block_len):
+                result.append(self.symbols[int(bits[pos:pos + self.raw_width], 2)])
+                pos += self.raw_width
+        return result
+
+
+def build_extension_code(probabilities: Dict[str, float], k: int,
+                         algo_name: str = "Хаффман",
+                         min_block_prob: float = DEFAULT_MIN_BLOCK_PROB,
+                         max_blocks: int = DEFAULT_MAX_BLOCKS) -> Tuple[ExtensionCode, Dict[str, float]]:
+    """
+    Строит код для k-го расширения, не материализуя все N^k блоков:
+    блоки берутся лениво по убыванию вероятности, пока p(b) >= min_block_prob
+    и их меньше max_blocks. Остаток вероятности - одна escape-корзина.
+
+    Returns:
+        tuple: (ExtensionCode, метрики {'L_block', 'L_avg', 'H', 'r',
+                'blocks', 'escape_probability'}), где L_avg и r -
+                на ОДИН исходный символ.
+    """
+    kept_blocks: List[Block] = []
+    block_probs: Dict[str, float] = {}
+    kept_mass = 0.0
+    all_blocks_kept = True
+    for block, prob in iter_blocks_by_probability(probabilities, k):
+        if prob < min_block_prob or len(kept_blocks) >= max_blocks:
+            all_blocks_kept = False
+            break
+        kept_blocks.append(block)
+        kept_mass += prob
+        # Имена вида 'zN' - этого ждут функции из metrics
+        block_probs[f"z{len(kept_blocks)}"] = prob
+
+    escape_probability = 0.0
+    escape_name = None
+    # Escape-лист нужен и без отброшенных блоков: хвост потока короче k
+    # (при k > 1) кодируется только через escape
+    if not all_blocks_kept or k > 1:
+        # Полная масса блоков - (Σ p)^k: вход может быть не нормирован
+        total_mass = sum(probabilities.values()) ** k
+        escape_probability = max(0.0, total_mass - kept_mass) if not all_blocks_kept else 0.0
+        escape_name = f"z{len(kept_blocks) + 1}"
+        block_probs[escape_name] = escape_probability
+
+    tree_root = algorithms.TREE_BUILDERS[algo_name](block_probs)
+    named_codes = algorithms.generate_codes_from_tree(tree_root)
+
+    symbols = list(probabilities)
+    raw_width = max(1, math.ceil(math.log2(len(symbols))))
+    code = ExtensionCode(
+        k=k,
+        codes={block: named_codes[f"z{i + 1}"] for i, block in enumerate(kept_blocks)},
+        escape_code=named_codes[escape_name] if escape_name else "",
+        escape_probability=escape_probability,
+        symbols=symbols,
+        raw_width=raw_width,
+    )
+
+    # Средняя длина на блок: коды из дерева + "сырые" биты после escape
+    l_block = metrics.calculate_average_length(block_probs, named_codes)[0]
+    l_block += escape_probability * k * raw_width
+    entropy = metrics.calculate_entropy(probabilities)[0]
+    l_avg = l_block / k
+    redundancy = metrics.calculate_redundancy(l_avg, entropy)[0]
+
+    return code, {
+        "k": k,
+        "blocks": len(kept_blocks),
+        "escape_probability": escape_probability,
+        "L_block": l_block,
+        "L_avg": l_avg,
+        "H": entropy,
+        "r": redundancy,
+    }
+
+
+def extension_report(probabilities: Dict[str, float], max_k: int, **kwargs) -> List[Dict[str, float]]:
+    """Метрики расширений k = 1..max_k (L_avg и r - на исходный символ)."""
+    return [build_extension_code(probabilities, k, **kwargs)[1] for k in range(1, max_k + 1)]
+
+
+if __name__ == "__main__":
+    import random
+    from rich.console import Console
+    from rich.table import Table
+
+    # Сильно "перекошенный" источник - здесь расширение выигрывает больше всего
+    probabilities = {"z1": 0.8, "z2": 0.1, "z3": 0.06, "z4": 0.04}
+
+    table = Table(title="[bold]Кодирование расширений источника (Хаффман)[/bold]")
+    for column in ("k", "блоков", "P(escape)", "L_avg, бит/символ", "r, бит/символ"):
+        table.add_column(column, justify="right")
+    for row in extension_report(probabilities, max_k=8, min_block_prob=1e-6):
+        table.add_row(str(row["k"]), f"{row['blocks']:,}", f"{row['escape_probability']:.2e}",
+                      f"{row['L_avg']:.5f}", f"{row['r']:.5f}")
+    Console().print(table)
+
+    # Длины потоков не кратны k - хвост идет через escape, в том числе
+    # когда в книге есть все блоки (min_block_prob=0)
+    for k, min_block_prob in ((4, 1e-4), (2, 0.0), (3, 0.0)):
+        code, _ = build_extension_code(probabilities, k=k, min_block_prob=min_block_prob)
+        for n_stream in (k + 1, 59, 10_003):
+            stream = random.choices(list(probabilities), weights=list(probabilities.values()), k=n_stream)
+            bits = "".join(code.encode(stream))
+            ok = code.decode(bits, len(stream)) == stream
+            rprint(f"Проверка encode/decode (k={k}, {n_stream:,} символов): "
+                   f"{'[green]OK[/green]' if ok else '[red]ОШИБКА[/red]'}, {len(bits) / len(stream):.4f} бит/символ")
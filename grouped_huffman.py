@@ -0,0 +1,211 @@
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Группа весов: (вес, сколько символов с этим весом)
+WeightGroup = Tuple[float, int]
+
+
+def group_weights(probabilities: Dict[str, float]) -> List[WeightGroup]:
+    """Одинаковые вероятности -> пары (вес, кратность), по возрастанию веса."""
+    return sorted(Counter(probabilities.values()).items())
+
+
+def grouped_huffman_lengths(groups: List[WeightGroup]) -> Tuple[List[Dict[int, int]], int]:
+    """
+    Хаффман на парах (вес, кратность): длины кодов по группам, без
+    узла на каждый символ. Стоимость зависит от числа РАЗНЫХ весов, а не от N.
+
+    Куча хранит группы одинаковых поддеревьев (вес, номер группы, сколько).
+    Из самой легкой группы с c узлами Хаффман подряд склеил бы c // 2 пар
+    (оставшиеся узлы группы все еще самые легкие) - склеиваем их разом
+    в новую группу веса 2w. Если c нечетно, последний узел склеивается
+    с одним узлом следующей по весу группы.
+
+    Затем обратным проходом по склейкам (от корня) считается, сколько
+    узлов каждой группы оказалось на каждой глубине.
+
+    Args:
+        groups (list): [(вес, кратность), ...]; вес > 0, кратность >= 1.
+
+    Returns:
+        tuple: ([{длина кода: число символов} для каждой входной группы],
+                число склеек групп).
+    """
+    n_groups = len(groups)
+    if n_groups == 0:
+        return [], 0
+    if any(count < 1 for _, count in groups):
+        raise ValueError("Кратность группы должна быть >= 1")
+
+    heap = [(weight, group_id, count) for group_id, (weight, count) in enumerate(groups)]
+    heapq.heapify(heap)
+    # merges[i] - из чего собран каждый узел группы n_groups + i:
+    # ((группа, сколько узлов берется), ...)
+    merges: List[Tuple[Tuple[int, int], ...]] = []
+    while True:
+        weight, group_id, count = heapq.heappop(heap)
+        if count == 1 and not heap:
+            root_id = group_id
+            break
+        pairs, leftover = divmod(count, 2)
+        if pairs:
+            heapq.heappush(heap, (weight + weight, n_groups + len(merges), pairs))
+            merges.append(((group_id, 2),))
+        if leftover:
+            next_weight, next_id, next_count = heapq.heappop(heap)
+            if next_count > 1:
+                heapq.heappush(heap, (next_weight, next_id, next_count - 1))
+            heapq.heappush(heap, (weight + next_weight, n_groups + len(merges), 1))
+            merges.append(((group_id, 1), (next_id, 1)))
+
+    # Глубины: склейка использует узлы групп, созданных раньше, поэтому
+    # к моменту обработки группы (в обратном порядке) все ее потребители учтены
+    depths: List[Dict[int, int]] = [{} for _ in range(n_groups + len(merges))]
+    depths[root_id][0] = 1
+    for merge_index in range(len(merges) - 1, -1, -1):
+        parent_depths = depths[n_groups + merge_index]
+        for child_id, per_node in merges[merge_index]:
+            child_depths = depths[child_id]
+            for depth, count in parent_depths.items():
+                child_depths[depth + 1] = child_depths.get(depth + 1, 0) + count * per_node
+
+    lengths = depths[:n_groups]
+    if not merges:
+        # Единственный символ: код "0", как в generate_int_codes_from_tree
+        lengths[root_id] = {1: 1}
+    return lengths, len(merges)
+
+
+@dataclass
+class GroupedHuffmanCode:
+    """
+    Код Хаффмана в сжатой форме: длины кодов по группам весов.
+    Коды отдельных символов строятся только по запросу (`int_codes`).
+
+    Атрибуты:
+        groups (list): [(вес, кратность), ...] по возрастанию веса.
+        length_counts (list): Для каждой группы {длина кода: число символов}.
+        n_merges (int): Сколько склеек групп понадобилось.
+    """
+    groups: List[WeightGroup]
+    length_counts: List[Dict[int, int]]
+    n_merges: int
+
+    @property
+    def n_symbols(self) -> int:
+        return sum(count for _, count in self.groups)
+
+    @property
+    def max_length(self) -> int:
+        return max((length for counts in self.length_counts for length in counts), default=0)
+
+    def expected_length(self) -> float:
+        """L_avg = Σ w * L / Σ w по всем символам - без раскрытия групп."""
+        total = sum(weight * count for weight, count in self.groups)
+        weighted = sum(weight * length * n
+                       for (weight, _), counts in zip(self.groups, self.length_counts)
+                       for length, n in counts.items())
+        return weighted / total
+
+    def int_codes(self, probabilities: Dict[str, float]) -> Tuple[List[str], List[int], List[int]]:
+        """
+        Канонические коды символов (в форме `algorithms.generate_int_codes`).
+        Внутри группы короткие коды достаются символам, идущим в словаре раньше.
+
+        Returns:
+            tuple: (symbols, code_values, code_lengths) - символы по возрастанию длины кода.
+        """
+        group_index = {weight: i for i, (weight, _) in enumerate(self.groups)}
+        members: List[List[str]] = [[] for _ in self.groups]
+        for symbol, prob in probabilities.items():
+            members[group_index[prob]].append(symbol)
+
+        by_length: Dict[int, List[str]] = {}
+        for group_symbols, counts in zip(members, self.length_counts):
+            if len(group_symbols) != sum(counts.values()):
+                raise ValueError("Вероятности не совпадают с группами, по которым строился код")
+            start = 0
+            for length in sorted(counts):
+                by_length.setdefault(length, []).extend(group_symbols[start:start + counts[length]])
+                start += counts[length]
+
+        symbols: List[str] = []
+        code_values: List[int] = []
+        code_lengths: List[int] = []
+        code = 0
+        previous_length = 0
+        for length in sorted(by_length):
+            bucket = by_length[length]
+            code <<= length - previous_length
+            symbols.extend(bucket)
+            code_values.extend(range(code, code + len(bucket)))
+            code_lengths.extend([length] * len(bucket))
+            code += len(bucket)
+            previous_length = length
+        return symbols, code_values, code_lengths
+
+
+def build_grouped_huffman(probabilities: Dict[str, float]) -> GroupedHuffmanCode:
+    """Группирует одинаковые вероятности и строит длины кодов по группам."""
+    if not probabilities:
+        raise ValueError("Словарь вероятностей пуст")
+    groups = group_weights(probabilities)
+    length_counts, n_merges = grouped_huffman_lengths(groups)
+    return GroupedHuffmanCode(groups, length_counts, n_merges)
+
+
+def generate_grouped_huffman_int_codes(probabilities: Dict[str, float]) -> Tuple[List[str], List[int], List[int]]:
+    """Коды Хаффмана по группам весов в форме `algorithms.generate_int_codes_from_tree`."""
+    return build_grouped_huffman(probabilities).int_codes(probabilities)
+
+
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    from random_probs import generate_probabilities
+
+    import algorithms
+    import metrics
+
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="[bold]Хаффман по группам весов[/bold]")
+    for column in ("Данные", "N", "Разных весов", "Склеек", "Группировка, мс", "Длины, мс", "Коды, с",
+                   "L_avg", "L_avg (Хаффман)", "Хаффман, с"):
+        table.add_column(column, justify="left" if column == "Данные" else "right")
+
+    np.random.seed(0)
+    cases = []
+    for n_symbols, decimals in ((100_000, 6), (1_000_000, 8)):
+        cases.append((f"uniform, decimals={decimals}", generate_probabilities(
+            n_symbols, method='uniform', decimals=decimals, min_prob=10 ** -decimals)))
+    # Частоты "как в жизни": закон Ципфа, длинные хвосты одинаковых счетчиков
+    counts = np.random.zipf(1.5, size=1_000_000)
+    total = int(counts.sum())
+    cases.append(("Ципф, счетчики", {f"z{i + 1}": int(count) / total for i, count in enumerate(counts)}))
+
+    for name, probabilities in cases:
+        n_symbols = len(probabilities)
+        start_time = time.perf_counter()
+        groups = group_weights(probabilities)
+        grouping_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        code = GroupedHuffmanCode(groups, *grouped_huffman_lengths(groups))
+        lengths_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        symbols, _, code_lengths = code.int_codes(probabilities)
+        codes_time = time.perf_counter() - start_time
+
+        l_huffman, huffman_time = "—", "—"
+        if n_symbols <= 100_000:
+            start_time = time.perf_counter()
+            symbols_h, _, code_lengths_h = algorithms.generate_int_codes("Хаффман", probabilities)
+            huffman_time = f"{time.perf_counter() - start_time:.2f}"
+            l_huffman = f"{metrics.calculate_length_metrics(probabilities, dict(zip(symbols_h, code_lengths_h)))['L_avg']:.6f}"
+        table.add_row(name, f"{n_symbols:,}", f"{len(code.groups):,}", f"{code.n_merges:,}",
+                      f"{grouping_time * 1000:.0f}", f"{lengths_time * 1000:.1f}", f"{codes_time:.2f}", f"{code.expected_length():.6f}",
+                      l_huffman, huffman_time)
+    Console().print(table)
@@ -0,0 +1,275 @@
+from typing import Dict, List, Optional
+
+from rich import print as rprint
+
+
+class _IncrementalNode:
+    """
+    Узел дерева для инкрементальных обновлений.
+    `pos` - место узла в упорядоченном списке (см. IncrementalHuffman).
+    """
+    __slots__ = ("weight", "symbol", "parent", "left_child", "right_child", "pos")
+
+    def __init__(self, weight: float, symbol: Optional[str] = None,
+                 left: Optional['_IncrementalNode'] = None, right: Optional['_IncrementalNode'] = None):
+        self.weight = weight
+        self.symbol = symbol
+        self.parent: Optional['_IncrementalNode'] = None
+        self.left_child = left
+        self.right_child = right
+        self.pos = 0
+
+
+class _BudgetExceeded(Exception):
+    """Локальный ремонт дерева оказался дороже полной перестройки."""
+
+
+class IncrementalHuffman:
+    """
+    Кодовая книга Хаффмана, которую можно дешево обновлять, когда
+    меняются вероятности НЕСКОЛЬКИХ символов.
+
+    Хранит дерево вместе со списком всех узлов по возрастанию веса,
+    в котором братья стоят рядом (свойство братства Галлагера: дерево
+    оптимально тогда и только тогда, когда такой список существует).
+
+    При изменении веса листа веса его предков меняются вместе с ним,
+    а как только узел на этом пути "догоняет" соседа по списку, они
+    меняются местами вместе с поддеревьями (при РАВНЫХ весах это не
+    портит оптимальность). Поэтому:
+        * коды меняются только у листьев переставленных поддеревьев;
+        * стоимость ~ (число "обгонов") * глубина, а не N.
+    Если обгонов слишком много, выгоднее полная перестройка - она
+    выполняется автоматически (за O(N log N) на плоских списках).
+    """
+
+    def __init__(self, probabilities: Dict[str, float]):
+        self.codes: Dict[str, str] = {}
+        self.last_events = 0
+        self.last_rebuilt = False
+        self._leaves: Dict[str, _IncrementalNode] = {}
+        self._order: List[_IncrementalNode] = []
+        self._build(probabilities)
+
+    # --- Построение ---
+
+    def _build(self, probabilities: Dict[str, float]):
+        """
+        Полная перестройка: Хаффман на двух очередях. Порядок, в котором
+        узлы ИЗВЛЕКАЮТСЯ из очередей, сразу дает нужный список
+        (веса не убывают, братья извлекаются парой).
+        """
+        if not probabilities:
+            raise ValueError("Словарь вероятностей пуст")
+        for symbol, prob in probabilities.items():
+            if not prob > 0:
+                raise ValueError(f"Вероятность символа {symbol} должна быть > 0")
+
+        leaves = [_IncrementalNode(prob, symbol) for symbol, prob in probabilities.items()]
+        self._leaves = {leaf.symbol: leaf for leaf in leaves}
+        leaves.sort(key=lambda node: node.weight)
+
+        order: List[_IncrementalNode] = []
+        merged: List[_IncrementalNode] = []
+        leaf_pos = merged_pos = 0
+
+        def _pop_smallest() -> _IncrementalNode:
+            nonlocal leaf_pos, merged_pos
+            if leaf_pos < len(leaves) and (merged_pos >= len(merged)
+                                           or leaves[leaf_pos].weight <= merged[merged_pos].weight):
+                leaf_pos += 1
+                return leaves[leaf_pos - 1]
+            merged_pos += 1
+            return merged[merged_pos - 1]
+
+        while (len(leaves) - leaf_pos) + (len(merged) - merged_pos) > 1:
+            lighter = _pop_smallest()
+            heavier = _pop_smallest()
+            order.extend((lighter, heavier))
+            # Правило "Больше P -> 0": тяжелый узел - левая ветка
+            parent = _IncrementalNode(lighter.weight + heavier.weight, left=heavier, right=lighter)
+            lighter.parent = heavier.parent = parent
+            merged.append(parent)
+
+        order.append(_pop_smallest())  # корень
+        for pos, node in enumerate(order):
+            node.pos = pos
+        self._order = order
+        self.codes = {symbol: self._code_of(leaf) for symbol, leaf in self._leaves.items()}
+
+    @staticmethod
+    def _code_of(node: _IncrementalNode) -> str:
+        bits: List[str] = []
+        while node.parent is not None:
+            bits.append("0" if node.parent.left_child is node else "1")
+            node = node.parent
+        # Если в дереве всего 1 узел, его код будет "0"
+        return "".join(reversed(bits)) if bits else "0"
+
+    # --- Обновление ---
+
+    def apply_updates(self, updates: Dict[str, float], max_events: Optional[int] = None) -> Dict[str, str]:
+        """
+        Применяет новые вероятности к нескольким символам.
+
+        Args:
+            updates (dict): {'z17': новая_p, ...}.
+            max_events (int, optional): Сколько перестановок допустимо
+                до перехода к полной перестройке (по умолчанию ~ N / глубина).
+
+        Returns:
+            dict: НОВЫЕ коды только тех символов, чей код изменился.
+        """
+        for symbol, prob in updates.items():
+            if symbol not in self._leaves:
+                raise ValueError(f"Символ {symbol!r} отсутствует в кодовой книге")
+            if not prob > 0:
+                raise ValueError(f"Вероятность символа {symbol} должна быть > 0")
+
+        if max_events is None:
+            max_events = max(64, len(self._order) // 32)
+        self.last_events = 0
+        self.last_rebuilt = False
+
+        swapped: List[_IncrementalNode] = []
+        try:
+            for symbol, prob in updates.items():
+                leaf = self._leaves[symbol]
+                self._move_leaf(leaf, prob - leaf.weight, swapped, max_events)
+                leaf.weight = prob  # убираем накопленную ошибку округления
+        except _BudgetExceeded:
+            return self._rebuild_with(updates)
+
+        # Пересчитываем коды только у листьев переставленных поддеревьев
+        affected: Dict[str, _IncrementalNode] = {}
+        for node in swapped:
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                if current.symbol is not None:
+                    affected[current.symbol] = current
+                else:
+                    stack.extend((current.left_child, current.right_child))
+
+        changed: Dict[str, str] = {}
+        for symbol, leaf in affected.items():
+            code = self._code_of(leaf)
+            if code != self.codes[symbol]:
+                changed[symbol] = code
+                self.codes[symbol] = code
+        return changed
+
+    def _rebuild_with(self, updates: Dict[str, float]) -> Dict[str, str]:
+        old_codes = self.codes
+        probabilities = {symbol: leaf.weight for symbol, leaf in self._leaves.items()}
+        probabilities.update(updates)
+        self._build(probabilities)
+        self.last_rebuilt = True
+        return {symbol: code for symbol, code in self.codes.items() if old_codes[symbol] != code}
+
+    def _move_leaf(self, leaf: _IncrementalNode, delta: float,
+                   swapped: List[_IncrementalNode], max_events: int):
+        """Меняет вес листа на `delta`, поддерживая свойство братства."""
+        order = self._order
+        remaining = delta
+        while remaining != 0:
+            path: List[_IncrementalNode] = []
+            node = leaf
+            while node is not None:
+                path.append(node)
+                node = node.parent
+            on_path = set(path)
+
+            # Ищем ближайший "обгон" среди узлов пути (корень всегда последний)
+            best_gap, best_node, best_other = float("inf"), None, None
+            for p in path[:-1]:
+                if remaining > 0:
+                    other = order[p.pos + 1]
+                    gap = other.weight - p.weight
+                else:
+                    if p.pos == 0:
+                        continue
+                    other = order[p.pos - 1]
+                    if other.parent is p:
+                        continue
+                    gap = p.weight - other.weight
+                if other not in on_path and gap < best_gap:
+                    best_gap, best_node, best_other = gap, p, other
+
+            if best_node is None or best_gap >= abs(remaining):
+                for p in path:
+                    p.weight += remaining
+                return
+
+            step = max(best_gap, 0.0) if remaining > 0 else -max(best_gap, 0.0)
+            for p in path:
+                p.weight += step
+            remaining -= step
+            self._swap(best_node, best_other)
+            swapped.append(best_node)
+            swapped.append(best_other)
+
+            self.last_events += 1
+            if self.last_events > max_events:
+                raise _BudgetExceeded()
+
+    def _swap(self, a: _IncrementalNode, b: _IncrementalNode):
+        """Меняет местами два узла равного веса вместе с поддеревьями."""
+        order = self._order
+        order[a.pos], order[b.pos] = b, a
+        a.pos, b.pos = b.pos, a.pos
+
+        pa, pb = a.parent, b.parent
+        if pa is pb:
+            pa.left_child, pa.right_child = pa.right_child, pa.left_child
+            return
+        if pa.left_child is a:
+            pa.left_child = b
+        else:
+            pa.right_child = b
+        if pb.left_child is b:
+            pb.left_child = a
+        else:
+            pb.right_child = a
+        a.parent, b.parent = pb, pa
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from random_probs import generate_probabilities
+
+    import algorithms
+    import metrics
+
+    n_symbols = 1_000_000
+    n_updates = 100
+    probabilities = {symbol: float(prob) for symbol, prob in generate_probabilities(
+        n_symbols, method='dirichlet', decimals=12, min_prob=1e-12).items()}
+
+    start_time = time.perf_counter()
+    book = IncrementalHuffman(probabilities)
+    prepare_time = time.perf_counter() - start_time
+
+    # Небольшой дрейф: 100 случайных символов меняют вероятность на ±0.1%
+    updates = {symbol: probabilities[symbol] * random.uniform(0.999, 1.001)
+               for symbol in random.sample(list(probabilities), n_updates)}
+
+    start_time = time.perf_counter()
+    changed = book.apply_updates(updates)
+    update_time = time.perf_counter() - start_time
+
+    probabilities.update(updates)
+    start_time = time.perf_counter()
+    full_codes = algorithms.generate_codes_from_tree(algorithms.build_huffman_tree(probabilities))
+    rebuild_time = time.perf_counter() - start_time
+
+    l_incremental = metrics.calculate_summary(probabilities, book.codes)["L_avg"]
+    l_full = metrics.calculate_summary(probabilities, full_codes)["L_avg"]
+
+    rprint(f"[bold]Инкрементальное обновление: N={n_symbols:,}, обновлений={n_updates}[/bold]")
+    rprint(f"  Подготовка состояния: {prepare_time:.3f} с")
+    rprint(f"  Обновление: {update_time:.4f} с (перестановок: {book.last_events}, "
+           f"полная перестройка: {'да' if book.last_rebuilt else 'нет'}), изменилось кодов: {len(changed)}")
+    rprint(f"  Полная перестройка build_huffman_tree + generate_codes_from_tree: {rebuild_time:.3f} с")
+    rprint(f"  L_avg: инкрементально {l_incremental:.9f}, заново {l_full:.9f}")
@@ -1,13 +1,20 @@
 import math
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 import json  
 import os    
+import time
 
 # --- Импорты наших модулей ---
 import input_handler
 import algorithms
+import bitstream
+import codebook_delta
+import comparison
+import data_structures
 import metrics
+import run_manifest
+import verification
 import visualizer
 from metrics import ROUND_DIGITS
 
@@ -23,6 +30,9 @@ ALGORITHMS = {
     "1": "Хаффман",
     "2": "Шеннон-Фано",
 }
+COMPARE_ALL = "Сравнить все"
+# Варианты Хаффмана рисуются одинаково (схема + классическое дерево)
+HUFFMAN_VARIANTS = ("Хаффман", "Хаффман (мин. дисперсия)")
 LARGE_INPUT_THRESHOLD = 980
 RECURSION_LIMIT_THRESHOLD = 999
 
@@ -61,6 +71,13 @@ def select_algorithm(previous_algo_name: str = None) -> str | None:
         console.print(f" [1] {ALGORITHMS['1']}")
         console.print(f" [2] {ALGORITHMS['2']}")
         options = {"1": ALGORITHMS['1'], "2": ALGORITHMS['2'], "0": None}
+    console.print(f" [3] {COMPARE_ALL} (одновременно, сводная таблица)")
+    options["3"] = COMPARE_ALL
+    extra_algorithms = [name for name in algorithms.ALL_ALGORITHMS if name not in ALGORITHMS.values()]
+    for key, extra_name in enumerate(extra_algorithms, start=4):
+        note = " (без дерева)" if extra_name in algorithms.CODE_ENGINES else ""
+        console.print(f" [{key}] {extra_name}{note}")
+        options[str(key)] = extra_name
     console.print(f" [0] Выход из программы")
     while True:
         choice = console.input(f"Введите (0-{len(options)-1}): ")
@@ -68,24 +85,89 @@ def select_algorithm(previous_algo_name: str = None) -> str | None:
         else: rprint("[red]Неверный ввод, попробуйте снова.[/red]")
 
 
-def _save_codes_to_file(codes: Dict[str, str], output_path: Path, algo_name: str):
-    """Сохраняет словарь кодов в .json файл."""
+def _save_codes_to_file(symbols: List[str], code_values: List[int], code_lengths: List[int],
+                        output_path: Path, algo_name: str) -> Optional[Path]:
+    """
+    Сохраняет коды в .json файл. Коды приходят в целочисленной форме,
+    строки '0101' создаются только здесь, для записи в JSON.
+    Возвращает путь к файлу (или None, если сохранить не удалось).
+    """
     filename = f"{algo_name.replace(' ', '_')}_codes.json"
     full_path = output_path / filename
     
     try:
+        codes = {
+            symbol: algorithms.int_code_to_str(value, length)
+            for symbol, value, length in zip(symbols, code_values, code_lengths)
+        }
         with open(full_path, 'w', encoding='utf-8') as f:
             json.dump(codes, f, indent=4)
         rprint(f"[bold green]...Словарь кодов (N={len(codes)}) сохранен в: [cyan]{full_path}[/cyan][/bold green]")
+        return full_path
     except Exception as e:
         rprint(f"[bold red]Не удалось сохранить файл кодов: {e}[/bold red]")
+        return None
         
 
-def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output_path: Path):
+def _find_previous_codes_file(output_path: Path, algo_name: str) -> Optional[str]:
+    """
+    Словарь кодов прошлого запуска этого алгоритма (по манифесту запусков):
+    путь относительно results/ или None, если алгоритм еще не запускался.
+    """
+    filename = f"{algo_name.replace(' ', '_')}_codes.json"
+    for record in reversed(run_manifest.RunManifest(str(output_path.parent)).find(algorithm=algo_name)):
+        previous = next((artifact for artifact in record.get("artifacts", []) if Path(artifact).name == filename), None)
+        if previous is not None:
+            return previous
+    return None
+
+
+def _save_codebook_delta(code_lengths: Dict[str, int], codes_path: Path, previous: str,
+                         output_path: Path, algo_name: str) -> Optional[Path]:
+    """
+    Сохраняет рядом с полным словарем дельту к словарю прошлого запуска.
+    Декодеру, у которого уже есть прошлый словарь, достаточно ее (codebook_delta).
+    Дельта пишется, только если декодер с ней читает поток, закодированный
+    сохраненным `codes_path`. Возвращает путь к файлу дельты (или None).
+    """
+    full_path = output_path / f"{algo_name.replace(' ', '_')}_codes.delta.json"
+    try:
+        base_lengths = codebook_delta.lengths_from_codes_file(output_path.parent / previous)
+        delta = codebook_delta.diff_codebooks(base_lengths, code_lengths)
+        if not codebook_delta.check_delta_round_trip(base_lengths, delta, verification.load_verified_codes(codes_path)):
+            rprint("[bold red]Дельта словаря не сохранена: декодер с ней не читает коды из файла словаря[/bold red]")
+            return None
+        codebook_delta.save_delta(delta, full_path)
+        rprint(f"[bold green]...Дельта к словарю [cyan]{previous}[/cyan] (изменено символов: {delta.n_changed}) "
+               f"сохранена в: [cyan]{full_path}[/cyan][/bold green]")
+        return full_path
+    except Exception as e:
+        rprint(f"[bold red]Не удалось сохранить дельту словаря: {e}[/bold red]")
+        return None
+
+
+def _print_prefix_check(result: verification.PrefixCheckResult):
+    """Вывод точной проверки префиксности и полноты (K == 1 в целых числах)."""
+    completeness = "полный (K = 1)" if result.is_complete else "НЕ полный (K < 1)"
+    if result.is_valid:
+        rprint(f"  [bold magenta]Префиксность:[/bold magenta] [green]OK[/green], код {completeness}")
+    else:
+        rprint(f"  [bold magenta]Префиксность:[/bold magenta] [red]ERROR[/red] "
+               f"(конфликтов: {result.conflict_count}, например {result.conflicts[:3]})")
+
+
+def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output_path: Path) -> Optional[Dict[str, Any]]:
     """
     Запускает полный цикл расчета для выбранного алгоритма.
     Автоматически переключается в "тихий" режим, если N > 100.
+
+    Returns:
+        dict | None: Запись для манифеста запусков (метрики, время этапов,
+                     файлы) или None, если расчет прервался.
     """
+    timings: Dict[str, float] = {}
+    artifacts: List[str] = []
+    length_summary: Dict[str, float] = {}
     
     N = len(probabilities)
     is_large_input = (N > LARGE_INPUT_THRESHOLD)
@@ -108,41 +190,70 @@ def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output
         
         return
     
-    # Шаг 2: Построение дерева
-    rprint(f"\n[bold blue]Шаг 2 ({algo_name}): Построение дерева...[/bold blue]")
+    # Шаг 2: Построение дерева (у кодов Шеннона и Шеннона-Фано-Элиаса его нет)
     tree_root = None
-    try:
-        if algo_name == "Хаффман":
-            tree_root = algorithms.build_huffman_tree(probabilities)
-        elif algo_name == "Шеннон-Фано":
-            tree_root = algorithms.build_shannon_fano_tree(probabilities)
+    is_tree_algorithm = algo_name in algorithms.TREE_BUILDERS
+    if is_tree_algorithm:
+        rprint(f"\n[bold blue]Шаг 2 ({algo_name}): Построение дерева...[/bold blue]")
+        # Картинки (и склейки имен узлов для них) нужны только на малых N
+        data_structures.set_node_class("compact" if is_large_input else "dataclass")
+        try:
+            start_time = time.perf_counter()
+            tree_root = algorithms.TREE_BUILDERS[algo_name](probabilities)
+            timings["tree"] = time.perf_counter() - start_time
+
+            if tree_root is None:
+                 rprint("[bold red]Ошибка: Не удалось построить дерево.[/bold red]")
+                 return
+            rprint("[green]...Дерево успешно построено.[/green]")
             
-        if tree_root is None:
-             rprint("[bold red]Ошибка: Не удалось построить дерево.[/bold red]")
-             return
-        rprint("[green]...Дерево успешно построено.[/green]")
-        
-    except Exception as e:
-        rprint(f"[bold red]Критическая ошибка при построении дерева ({algo_name}): {e}[/bold red]")
-        return
+        except Exception as e:
+            rprint(f"[bold red]Критическая ошибка при построении дерева ({algo_name}): {e}[/bold red]")
+            return
+    else:
+        rprint(f"\n[bold blue]Шаг 2 ({algo_name}): Дерево не нужно - коды строятся без узлов на каждый символ.[/bold blue]")
 
     # Шаг 3: Генерация кодов и Визуализация
     rprint(f"\n[bold blue]Шаг 3 ({algo_name}): Генерация кодов...[/bold blue]")
     generated_codes = {}
+    code_lengths = {}
     try:
-        rprint("[dim]...Генерируем коды из дерева...[/dim]")
-        generated_codes = algorithms.generate_codes_from_tree(tree_root)
+        start_time = time.perf_counter()
+        if is_tree_algorithm:
+            rprint("[dim]...Генерируем коды из дерева...[/dim]")
+            symbols, code_values, code_length_list = algorithms.generate_int_codes_from_tree(tree_root, N)
+        else:
+            rprint("[dim]...Генерируем коды (без дерева)...[/dim]")
+            symbols, code_values, code_length_list = algorithms.CODE_ENGINES[algo_name](probabilities)
+        code_lengths = dict(zip(symbols, code_length_list))
+        timings["codes"] = time.perf_counter() - start_time
         rprint("[green]...Коды успешно сгенерированы.[/green]")
         
-        _save_codes_to_file(generated_codes, output_path, algo_name)
+        previous_codes = _find_previous_codes_file(output_path, algo_name)
+        if previous_codes is not None:
+            # Дельта описывает КАНОНИЧЕСКИЙ словарь (он задается одними длинами),
+            # поэтому и полный словарь пишется каноническим - длины те же
+            canonical = bitstream.canonical_codebook(code_lengths)
+            code_values = [canonical[symbol][0] for symbol in symbols]
+            rprint("[dim]...Коды приведены к канонической форме (к словарю будет дельта)...[/dim]")
+        codes_path = _save_codes_to_file(symbols, code_values, code_length_list, output_path, algo_name)
+        artifacts.append(codes_path)
+        if previous_codes is not None and codes_path is not None:
+            artifacts.append(_save_codebook_delta(code_lengths, codes_path, previous_codes, output_path, algo_name))
         
         if not is_large_input:
-            rprint("[dim]...Запускаем генерацию изображений...[/dim]")
-            if algo_name == "Хаффман":
-                visualizer.generate_scheme_image(tree_root, algo_name, str(output_path))
-                visualizer.generate_classic_tree_image(tree_root, algo_name, str(output_path))
-            elif algo_name == "Шеннон-Фано":
-                visualizer.generate_classic_tree_image(tree_root, algo_name, str(output_path))
+            # Строки кодов нужны только для формул и таблиц
+            generated_codes = {
+                symbol: algorithms.int_code_to_str(value, length)
+                for symbol, value, length in zip(symbols, code_values, code_length_list)
+            }
+            if is_tree_algorithm:
+                rprint("[dim]...Запускаем генерацию изображений...[/dim]")
+            if algo_name in HUFFMAN_VARIANTS:
+                artifacts.append(visualizer.generate_scheme_image(tree_root, algo_name, str(output_path)))
+                artifacts.append(visualizer.generate_classic_tree_image(tree_root, algo_name, str(output_path)))
+            elif algo_name in ("Шеннон-Фано", "Алфавитный (Гарсиа-Уокс)"):
+                artifacts.append(visualizer.generate_classic_tree_image(tree_root, algo_name, str(output_path)))
         
     except Exception as e:
         rprint(f"[bold red]Критическая ошибка на Шаге 3: {e}[/bold red]")
@@ -150,15 +261,18 @@ def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output
 
     # Шаг 4: Расчет метрик ("Матан")
     rprint(f"\n[bold blue]Шаг 4 ({algo_name}): Расчет метрик...[/bold blue]")
+    start_time = time.perf_counter()
     try:
-        
-        # Считаем метрики в любом случае
-        h_result, h_gen, h_exp, h_sub = metrics.calculate_entropy(probabilities)
-        l_result, l_gen, l_exp, l_sub = metrics.calculate_average_length(probabilities, generated_codes)
-        r_result, r_gen, r_sub = metrics.calculate_redundancy(l_result, h_result)
-        k_result, k_gen, k_exp, k_sub = metrics.calculate_kraft_inequality(generated_codes)
+        # Один проход по длинам: цифры для "тихого" вывода, разброс длин и манифест
+        length_summary = metrics.calculate_length_metrics(probabilities, code_lengths)
 
         if not is_large_input:
+            # Метрики вместе со строками формул
+            h_result, h_gen, h_exp, h_sub = metrics.calculate_entropy(probabilities)
+            l_result, l_gen, l_exp, l_sub = metrics.calculate_average_length(probabilities, generated_codes)
+            r_result, r_gen, r_sub = metrics.calculate_redundancy(l_result, h_result)
+            k_result, k_gen, k_exp, k_sub = metrics.calculate_kraft_inequality(generated_codes)
+
             # "Раскошный" вывод
             console.print(Panel(f"[dim]{h_gen}[/dim]\n[dim]{h_exp}[/dim]\n{h_sub}\n\n[bold]H = {h_result:.{ROUND_DIGITS}f} бит[/bold] [dim]| (raw: {h_result})[/dim]", title=f"[bold yellow]H (Энтропия)[/bold yellow]", border_style="yellow", padding=(1, 2)))
             console.print(Panel(f"[dim]{l_gen}[/dim]\n[dim]{l_exp}[/dim]\n{l_sub}\n\n[bold]L_avg = {l_result:.{ROUND_DIGITS}f} бит/символ[/bold] [dim]| (raw: {l_result})[/dim]", title=f"[bold green]L_avg (Средняя длина)[/bold green]", border_style="green", padding=(1, 2)))
@@ -170,8 +284,13 @@ def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output
             else:
                 kraft_status = (f"[bold red]K = {k_result:.{ROUND_DIGITS}f} (> 1.0)[/bold red] {raw_k_str}\n[red]Ошибка! Код НЕ является однозначно декодируемым.[/red]")
             console.print(Panel(f"[dim]{k_gen}[/dim]\n[dim]{k_exp}[/dim]\n{k_sub}\n\n{kraft_status}", title=f"[bold magenta]K (Неравенство Крафта)[/bold magenta]", border_style="magenta", padding=(1, 2)))
+            _print_prefix_check(verification.verify_int_codes(symbols, code_values, code_length_list))
         
         else:
+            # Только цифры, сразу по длинам кодов
+            h_result, l_result = length_summary["H"], length_summary["L_avg"]
+            r_result, k_result = length_summary["r"], length_summary["K"]
+
             # "Тихий" вывод (только цифры)
             rprint(f"  [bold yellow]H (Энтропия):[/bold yellow] {h_result:.6f} бит")
             rprint(f"  [bold green]L_avg (Средняя длина):[/bold green] {l_result:.6f} бит/символ")
@@ -180,6 +299,12 @@ def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output
                  rprint(f"  [bold magenta]K (Крафт):[/bold magenta] {k_result:.20f} (≤ 1.0) [green]OK[/green]")
             else:
                  rprint(f"  [bold magenta]K (Крафт):[/bold magenta] {k_result:.20f} (> 1.0) [red]ERROR[/red]")
+            _print_prefix_check(verification.verify_int_codes(symbols, code_values, code_length_list))
+
+        # Разброс длин: от него зависят размер таблиц декодера и буферов
+        rprint(f"  [bold]max L (Максимальная длина):[/bold] {length_summary['max_length']} бит")
+        rprint(f"  [bold]Дисперсия длин:[/bold] {length_summary['length_variance']:.6f}")
+        timings["metrics"] = time.perf_counter() - start_time
 
     except Exception as e:
         rprint(f"[bold red]Критическая ошибка при расчете метрик ({algo_name}): {e}[/bold red]")
@@ -197,33 +322,109 @@ def run_calculation_flow(algo_name: str, probabilities: Dict[str, float], output
         table2 = _build_codes_table(probabilities, generated_codes, sorted_by_name, f"[bold]Коды ({algo_name}) (отсортировано по Z ↑)[/bold]")
         console.print(table2)
 
+    return {
+        "kind": "calculation",
+        "algorithms": [algo_name],
+        "metrics": {algo_name: length_summary},
+        "timings": timings,
+        "artifacts": [str(path) for path in artifacts if path],
+    }
+
+
+def run_comparison_flow(probabilities: Dict[str, float], output_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Режим "Сравнить все": строит коды всеми алгоритмами одновременно
+    и выводит одну сводную таблицу H / L_avg / r / K / max L / дисперсия длин / время.
+    Возвращает запись для манифеста запусков (или None при ошибке).
+    """
+    N = len(probabilities)
+    rprint(
+        Panel(
+            f"[bold white on blue] --- {COMPARE_ALL.upper()} --- [/bold white on blue]",
+            expand=False,
+            padding=(0, 10)
+        )
+    )
+    if N >= comparison.PARALLEL_THRESHOLD:
+        rprint(f"[dim]...N={N}: алгоритмы считаются в отдельных процессах (общая память)...[/dim]")
+
+    start_time = time.perf_counter()
+    try:
+        rows = comparison.compare_all(probabilities)
+    except Exception as e:
+        rprint(f"[bold red]Критическая ошибка при сравнении алгоритмов: {e}[/bold red]")
+        return
+    wall_time = time.perf_counter() - start_time
+
+    table = Table(title=f"[bold]Сравнение алгоритмов (N={N})[/bold]")
+    table.add_column("Алгоритм", style="cyan", no_wrap=True)
+    table.add_column("H", style="yellow", justify="right")
+    table.add_column("L_avg", style="green", justify="right")
+    table.add_column("r", style="cyan", justify="right")
+    table.add_column("K", style="magenta", justify="right")
+    table.add_column("max L", justify="right")
+    table.add_column("Дисп. длин", justify="right")
+    table.add_column("Время, с", justify="right")
+    for row in rows:
+        if "error" in row:
+            table.add_row(row["algorithm"], *["—"] * 6, f"[red]{row['error']}[/red]")
+            continue
+        table.add_row(
+            row["algorithm"],
+            f"{row['H']:.6f}",
+            f"{row['L_avg']:.6f}",
+            f"{row['r']:.6f}",
+            f"{row['K']:.6f}",
+            str(row["max_length"]),
+            f"{row['length_variance']:.6f}",
+            f"{row['build_time']:.3f}",
+        )
+    console.print(table)
+    rprint(f"[dim]Общее время: {wall_time:.3f} с[/dim]")
+
+    full_path = output_path / "comparison.json"
+    artifacts: List[str] = []
+    try:
+        with open(full_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=4, ensure_ascii=False)
+        rprint(f"[bold green]...Сравнение сохранено в: [cyan]{full_path}[/cyan][/bold green]")
+        artifacts.append(str(full_path))
+    except Exception as e:
+        rprint(f"[bold red]Не удалось сохранить сравнение: {e}[/bold red]")
+
+    succeeded = [row for row in rows if "error" not in row]
+    return {
+        "kind": "comparison",
+        "algorithms": [row["algorithm"] for row in succeeded],
+        "metrics": {row["algorithm"]: {key: value for key, value in row.items() if key not in ("algorithm", "build_time")}
+                    for row in succeeded},
+        "timings": {**{row["algorithm"]: row["build_time"] for row in succeeded}, "total": wall_time},
+        "artifacts": artifacts,
+    }
+
 
 def setup_output_directory(base_dir: str = "results") -> Path:
     """
     Создает (если нет) папку `results` и в ней
     уникальную папку `output_N` для этого запуска.
+    Номер выделяется атомарно (см. run_manifest.allocate_run_directory),
+    поэтому параллельные запуски не получат одну и ту же папку.
     """
-    base_path = Path(base_dir)
-    base_path.mkdir(exist_ok=True) 
-
-    existing_dirs = [d for d in base_path.iterdir() if d.is_dir() and d.name.startswith("output_")]
-    
-    max_n = 0
-    for d in existing_dirs:
-        try:
-            n = int(d.name.split('_')[-1])
-            if n > max_n:
-                max_n = n
-        except ValueError:
-            continue
-    
-    next_n = max_n + 1
-    new_dir_path = base_path / f"output_{next_n}"
-    new_dir_path.mkdir()
-    
+    _, new_dir_path = run_manifest.allocate_run_directory(base_dir)
     return new_dir_path
 
 
+def _record_run(output_dir: Path, probabilities: Dict[str, float], dist_hash: str,
+                record: Optional[Dict[str, Any]]):
+    """Дописывает результат расчета в манифест запусков (results/manifest.jsonl)."""
+    if record is None:
+        return
+    try:
+        run_manifest.append_record(output_dir, {"distribution_hash": dist_hash, "n": len(probabilities), **record})
+    except Exception as e:
+        rprint(f"[bold red]Не удалось дописать манифест запусков: {e}[/bold red]")
+
+
 def main():
     """
     Главная "оркестровая" функция программы.
@@ -242,10 +443,13 @@ def main():
     try:
         output_dir = setup_output_directory()
         console.print(f"[bold green]Создана директория для результатов: [cyan]{output_dir}[/cyan][/bold green]")
+        # Отпечаток распределения для манифеста - один раз на запуск
+        dist_hash = run_manifest.distribution_hash(probabilities)
     except Exception as e:
         rprint(f"[bold red]Не удалось создать папку для результатов: {e}[/bold red]")
         rprint("[red]Изображения/коды будут сохранены в корневой папке.[/red]")
         output_dir = Path(".") 
+        dist_hash = None
 
     # Главный цикл (Запуск алгоритмов)
     last_algo_run = None
@@ -255,10 +459,16 @@ def main():
         if algo_to_run is None:
             break
             
-        # Передаем 'output_dir'
-        run_calculation_flow(algo_to_run, probabilities, output_dir)
-        
-        last_algo_run = algo_to_run
+        if algo_to_run == COMPARE_ALL:
+            record = run_comparison_flow(probabilities, output_dir)
+        else:
+            # Передаем 'output_dir'
+            record = run_calculation_flow(algo_to_run, probabilities, output_dir)
+            last_algo_run = algo_to_run
+
+        # Без своей папки запуска (output_dir = ".") манифест не ведется
+        if dist_hash is not None:
+            _record_run(output_dir, probabilities, dist_hash, record)
 
     rprint("\n[bold green]Программа завершена. Удачной атты![/bold green]")
 
@@ -0,0 +1,206 @@
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# --- Импорты наших модулей ---
+import algorithms
+import data_structures
+import metrics
+from random_probs import generate_probabilities
+
+from rich.console import Console
+from rich.table import Table
+from rich import print as rprint
+
+console = Console()
+
+# Кадры самого tracemalloc и импорта не относятся к конвейеру.
+# Фильтруем уже готовую статистику: Snapshot.filter_traces на миллионах
+# трасс работает дольше, чем сам конвейер.
+_IGNORED_FILES = ("tracemalloc.py", "<frozen importlib._bootstrap>",
+                  "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+@dataclass
+class StageReport:
+    """
+    Память одного этапа конвейера.
+
+    Атрибуты:
+        name (str): Название этапа.
+        seconds (float): Время этапа (под tracemalloc - в разы медленнее обычного).
+        peak_bytes (int): Пик памяти во время этапа сверх уровня до него.
+        retained_bytes (int): Сколько осталось занято после этапа
+                              (результат этапа, который живет дальше).
+        top_sites (list): [(файл:строка, прирост в байтах), ...] -
+                          места, где этап выделил больше всего.
+    """
+    name: str
+    seconds: float
+    peak_bytes: int
+    retained_bytes: int
+    top_sites: List[Tuple[str, int]] = field(default_factory=list)
+
+
+LineSizes = Dict[Tuple[str, int], int]
+
+
+def _sizes_by_line() -> LineSizes:
+    """
+    Занятая память по строкам кода. Группировка снимка - самая дорогая
+    часть профилирования (O(число блоков)), поэтому каждый снимок
+    группируется один раз и служит "после" для одного этапа и "до" для следующего.
+    """
+    return {
+        (stat.traceback[0].filename, stat.traceback[0].lineno): stat.size
+        for stat in tracemalloc.take_snapshot().statistics("lineno")
+    }
+
+
+def _run_stage(name: str, func: Callable[[], Any], before: LineSizes,
+               top: int) -> Tuple[Any, StageReport, LineSizes]:
+    """Выполняет этап под tracemalloc и снимает пик и главные места выделений."""
+    current_before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    start_time = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start_time
+
+    current_after, peak = tracemalloc.get_traced_memory()
+    after = _sizes_by_line()
+    growth = sorted(
+        ((size - before.get(line, 0), line) for line, size in after.items()),
+        reverse=True,
+    )
+    top_sites: List[Tuple[str, int]] = []
+    for size_diff, (file_path, lineno) in growth:
+        if len(top_sites) == top or size_diff <= 0:
+            break
+        file_name = file_path.rsplit('/', 1)[-1]
+        if file_name not in _IGNORED_FILES:
+            top_sites.append((f"{file_name}:{lineno}", size_diff))
+    report = StageReport(name, seconds, peak - current_before, current_after - current_before, top_sites)
+    return result, report, after
+
+
+def profile_pipeline(n: int, algo_name: str = "Хаффман", node_class: str = "dataclass",
+                     method: str = "dirichlet", seed: int = 0, top: int = 5) -> List[StageReport]:
+    """
+    Прогоняет конвейер main.py для N случайных символов и измеряет
+    память каждого этапа: вероятности, дерево, коды (значение, длина),
+    метрики, строки кодов, rich-таблица кодов.
+
+    Результаты этапов не освобождаются до конца прогона - как и в main.py,
+    поэтому `retained_bytes` показывает, чем занята память на большом N.
+
+    Args:
+        n (int): Число символов.
+        algo_name (str): Алгоритм из algorithms.TREE_BUILDERS.
+        node_class (str): 'dataclass' (Node) или 'compact' (CompactNode).
+        method (str): Распределение для random_probs.generate_probabilities.
+        seed (int): Зерно numpy.random.
+        top (int): Сколько мест выделений показывать на этап.
+    """
+    previous_class = data_structures.set_node_class(node_class)
+    np.random.seed(seed)
+    tracemalloc.start()
+    try:
+        reports: List[StageReport] = []
+        alive: Dict[str, Any] = {}
+        line_sizes = _sizes_by_line()
+
+        def stage(name: str, func: Callable[[], Any]) -> Any:
+            nonlocal line_sizes
+            result, report, line_sizes = _run_stage(name, func, line_sizes, top)
+            alive[name] = result
+            reports.append(report)
+            return result
+
+        probabilities = stage("Вероятности", lambda: generate_probabilities(
+            n, method=method, decimals=9, min_prob=min(1e-10, 0.1 / n)))
+        tree_root = stage("Дерево", lambda: algorithms.TREE_BUILDERS[algo_name](probabilities))
+        symbols, code_values, code_lengths = stage(
+            "Коды (значение, длина)", lambda: algorithms.generate_int_codes_from_tree(tree_root, n))
+        stage("Метрики", lambda: metrics.calculate_length_metrics(
+            probabilities, dict(zip(symbols, code_lengths))))
+        codes = stage("Строки кодов", lambda: {
+            symbol: algorithms.int_code_to_str(value, length)
+            for symbol, value, length in zip(symbols, code_values, code_lengths)
+        })
+
+        def _rich_table() -> Table:
+            table = Table()
+            table.add_column("Символ")
+            table.add_column("P")
+            table.add_column("Код")
+            for symbol, code in codes.items():
+                table.add_row(symbol, str(probabilities[symbol]), code)
+            return table
+
+        stage("rich-таблица кодов", _rich_table)
+        return reports
+    finally:
+        tracemalloc.stop()
+        data_structures.set_node_class(previous_class)
+
+
+def profile_in_subprocess(n: int, algo_name: str = "Хаффман", node_class: str = "dataclass",
+                          method: str = "dirichlet", seed: int = 0, top: int = 5) -> List[StageReport]:
+    """
+    То же, что `profile_pipeline` (с теми же параметрами), но в свежем
+    процессе: мусор и кэши предыдущих прогонов не искажают измерения.
+    """
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(profile_pipeline, n, algo_name, node_class,
+                           method=method, seed=seed, top=top).result()
+
+
+def _mb(n_bytes: int) -> str:
+    return f"{n_bytes / 2 ** 20:.1f}"
+
+
+def build_report_table(title: str, reports: List[StageReport]) -> Table:
+    table = Table(title=f"[bold]{title}[/bold]")
+    table.add_column("Этап", style="cyan", no_wrap=True)
+    table.add_column("Время, с", justify="right")
+    table.add_column("Пик, МБ", style="magenta", justify="right")
+    table.add_column("Осталось, МБ", style="green", justify="right")
+    table.add_column("Главные места выделений", style="dim")
+    for report in reports:
+        sites = "\n".join(f"{site} +{_mb(size)} МБ" for site, size in report.top_sites)
+        table.add_row(report.name, f"{report.seconds:.2f}", _mb(report.peak_bytes),
+                      _mb(report.retained_bytes), sites)
+    return table
+
+
+def compare_node_classes(n: int, algo_name: str = "Хаффман", method: str = "dirichlet", seed: int = 0,
+                         top: int = 3) -> Dict[str, List[StageReport]]:
+    """Отчет "до/после": одинаковый конвейер (и то же распределение) с Node и с CompactNode."""
+    return {name: profile_in_subprocess(n, algo_name, name, method=method, seed=seed, top=top)
+            for name in data_structures.NODE_CLASSES}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Профиль памяти конвейера по этапам (tracemalloc)")
+    parser.add_argument("--n", type=int, nargs="+", default=[100_000, 1_000_000], help="Размеры алфавита")
+    parser.add_argument("--algorithm", default="Хаффман", choices=list(algorithms.TREE_BUILDERS))
+    parser.add_argument("--method", default="dirichlet",
+                        choices=["uniform", "exponential", "dirichlet", "loguniform"], help="Распределение")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=3, help="Мест выделений на этап")
+    args = parser.parse_args()
+
+    for n_symbols in args.n:
+        results = compare_node_classes(n_symbols, args.algorithm, args.method, args.seed, args.top)
+        for node_class, stage_reports in results.items():
+            console.print(build_report_table(f"N={n_symbols:,}, {args.algorithm}, узлы: {node_class}", stage_reports))
+        tree_before, tree_after = (reports_[1].retained_bytes for reports_ in results.values())
+        rprint(f"[bold]Дерево N={n_symbols:,}:[/bold] {_mb(tree_before)} МБ -> {_mb(tree_after)} МБ "
+               f"({tree_before / max(tree_after, 1):.1f}x)\n")
@@ -4,16 +4,20 @@ from typing import Dict, Tuple
 # Глобальный параметр, регулирующий округление в ВЫВОДИМЫХ строках
 ROUND_DIGITS = 3
 
-def calculate_entropy(probabilities: Dict[str, float]) -> Tuple[float, str, str, str]:
+def calculate_entropy(probabilities: Dict[str, float], base: int = 2) -> Tuple[float, str, str, str]:
     """
     Вычисляет энтропию H(Z) = -Σ p(i) * log2(p(i)).
+    Для D-ичных кодов (`base=D`) - в D-ичных единицах: -Σ p(i) * logD(p(i)).
     
     Возвращает кортеж с "сырым" float-результатом и строками
     для "раскошного" вывода:
     (result, formula_general, formula_expanded, formula_substituted).
     """
     
-    formula_general = "H(Z) = -Sum [ p(zi) * log2(p(zi)) ]"
+    log_name = f"log{base}"
+    log_func = math.log2 if base == 2 else (lambda x: math.log(x, base))
+    
+    formula_general = f"H(Z) = -Sum [ p(zi) * {log_name}(p(zi)) ]"
     formula_expanded_parts = []
     formula_substituted_parts = []
     
@@ -23,9 +27,9 @@ def calculate_entropy(probabilities: Dict[str, float]) -> Tuple[float, str, str,
     for symbol in sorted_symbols:
         prob = probabilities[symbol]
         if prob > 0: # Защита от log(0)
-            entropy += prob * math.log2(prob)
-            formula_expanded_parts.append(f"p({symbol})*log2(p({symbol}))")
-            formula_substituted_parts.append(f"{prob:.{ROUND_DIGITS}f}*log2({prob:.{ROUND_DIGITS}f})")
+            entropy += prob * log_func(prob)
+            formula_expanded_parts.append(f"p({symbol})*{log_name}(p({symbol}))")
+            formula_substituted_parts.append(f"{prob:.{ROUND_DIGITS}f}*{log_name}({prob:.{ROUND_DIGITS}f})")
         
     formula_expanded = "H(Z) = -[ " + " + ".join(formula_expanded_parts) + " ]"
     formula_substituted = "H(Z) = -[ " + " + ".join(formula_substituted_parts) + " ]"
@@ -67,16 +71,17 @@ def calculate_average_length(probabilities: Dict[str, float], codes: Dict[str, s
 
     return avg_length, formula_general, formula_expanded, formula_substituted
 
-def calculate_kraft_inequality(codes: Dict[str, str]) -> Tuple[float, str, str, str]:
+def calculate_kraft_inequality(codes: Dict[str, str], base: int = 2) -> Tuple[float, str, str, str]:
     """
     Вычисляет сумму ряда Крафта K = Σ 2^(-L(i)).
+    Для D-ичных кодов (`base=D`): K = Σ D^(-L(i)).
     
     Возвращает кортеж с "сырым" float-результатом и строками
     для "раскошного" вывода:
     (result, formula_general, formula_expanded, formula_substituted).
     """
     
-    formula_general = "K = Sum [ 2^(-L(zi)) ]"
+    formula_general = f"K = Sum [ {base}^(-L(zi)) ]"
     formula_expanded_parts = []
     formula_substituted_parts = []
     
@@ -87,10 +92,10 @@ def calculate_kraft_inequality(codes: Dict[str, str]) -> Tuple[float, str, str,
         code = codes[symbol]
         code_length = len(code)
         
-        kraft_sum += 2 ** (-code_length)
+        kraft_sum += base ** (-code_length)
         
-        formula_expanded_parts.append(f"2^(-L({symbol}))")
-        formula_substituted_parts.append(f"2^(-{code_length})")
+        formula_expanded_parts.append(f"{base}^(-L({symbol}))")
+        formula_substituted_parts.append(f"{base}^(-{code_length})")
         
     formula_expanded = "K = " + " + ".join(formula_expanded_parts)
     formula_substituted = "K = " + " + ".join(formula_substituted_parts)
@@ -110,4 +115,73 @@ def calculate_redundancy(avg_length: float, entropy: float) -> Tuple[float, str,
     result = avg_length - entropy
     formula_substituted = f"r = {avg_length:.{ROUND_DIGITS}f} - {entropy:.{ROUND_DIGITS}f}"
     
-    return result, formula_general, formula_substituted
\ No newline at end of file
+    return result, formula_general, formula_substituted
+
+def calculate_length_metrics(probabilities: Dict[str, float], code_lengths: Dict[str, int],
+                             base: int = 2) -> Dict[str, float]:
+    """
+    Быстрый расчет всех метрик за один проход только по ДЛИНАМ кодов
+    (без строк формул и без самих кодовых слов) - для больших N
+    и целочисленной формы кодов из `algorithms.generate_int_codes_from_tree`.
+
+    Returns:
+        dict: {'H': ..., 'L_avg': ..., 'r': ..., 'K': ..., 'max_length': ...,
+               'length_variance': ...}, где length_variance = Σ p(i) * (L(i) - L_avg)^2.
+    """
+    log_func = math.log2 if base == 2 else (lambda x: math.log(x, base))
+
+    entropy = 0.0
+    avg_length = 0.0
+    avg_square_length = 0.0
+    for symbol, prob in probabilities.items():
+        code_length = code_lengths.get(symbol)
+        if code_length is None:
+            raise ValueError(f"Ошибка: Нет сгенерированного кода для символа {symbol}")
+        if prob > 0: # Защита от log(0)
+            entropy -= prob * log_func(prob)
+        avg_length += prob * code_length
+        avg_square_length += prob * code_length * code_length
+
+    kraft_sum = sum(base ** (-code_length) for code_length in code_lengths.values())
+
+    return {
+        "H": entropy,
+        "L_avg": avg_length,
+        "r": calculate_redundancy(avg_length, entropy)[0],
+        "K": kraft_sum,
+        "max_length": max(code_lengths.values(), default=0),
+        "length_variance": max(0.0, avg_square_length - avg_length * avg_length),
+    }
+
+
+def calculate_conditional_entropy(transition_counts: Dict[str, Dict[str, int]], base: int = 2) -> float:
+    """
+    Условная энтропия H(Z|Z₋₁) = -Σ p(a, b) * log2(p(b | a)) по счетчикам
+    переходов {предыдущий символ a: {следующий символ b: число переходов}}.
+    Нижняя граница средней длины кода, если код выбирается по предыдущему символу.
+    """
+    log_func = math.log2 if base == 2 else (lambda x: math.log(x, base))
+
+    total = sum(sum(row.values()) for row in transition_counts.values())
+    if total == 0:
+        return 0.0
+    entropy = 0.0
+    for row in transition_counts.values():
+        row_total = sum(row.values())
+        for count in row.values():
+            if count > 0:
+                entropy -= (count / total) * log_func(count / row_total)
+    return entropy
+
+
+def calculate_summary(probabilities: Dict[str, float], codes: Dict[str, str], base: int = 2) -> Dict[str, float]:
+    """
+    Считает все метрики разом и возвращает только "сырые" числа
+    (без строк формул) - для машинного вывода (JSON, сравнения, сервер).
+    `base` - основание кода (2 для двоичных, D для D-ичных).
+
+    Returns:
+        dict: {'H': ..., 'L_avg': ..., 'r': ..., 'K': ..., 'max_length': ...,
+               'length_variance': ...}.
+    """
+    return calculate_length_metrics(probabilities, {symbol: len(code) for symbol, code in codes.items()}, base)
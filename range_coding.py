@@ -0,0 +1,291 @@
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# --- Импорты наших модулей ---
+import metrics
+
+from rich import print as rprint
+
+# Точность модели: частоты квантуются в целые числа с суммой 2^bits.
+DEFAULT_PRECISION_BITS = 16
+MAX_PRECISION_BITS = 32
+# До этой точности декодер ищет символ по прямой таблице (O(1)),
+# выше - бинарным поиском по кумулятивным частотам.
+LOOKUP_TABLE_MAX_BITS = 16
+
+# 64-битный "беспереносный" range coder (схема Субботина)
+_MASK = (1 << 64) - 1
+_TOP = 1 << 56
+_BOT = 1 << 48
+
+
+class FrequencyModel:
+    """
+    Статическая модель источника для range coder'а: целые частоты,
+    квантованные из вероятностей, и их кумулятивные суммы.
+
+    Атрибуты:
+        symbols (list): Символы в порядке входного словаря.
+        freqs (list): Целые частоты (каждая >= 1), сумма = total.
+        cumulative (list): cumulative[i] = freqs[0] + ... + freqs[i-1].
+        precision_bits (int): total = 2 ** precision_bits.
+    """
+
+    def __init__(self, probabilities: Dict[str, float], precision_bits: Optional[int] = None):
+        if not probabilities:
+            raise ValueError("Словарь вероятностей пуст")
+        n = len(probabilities)
+        if precision_bits is None:
+            # Запас в 2 бита, чтобы "минимум 1" не съедал точность у больших N
+            precision_bits = max(DEFAULT_PRECISION_BITS, math.ceil(math.log2(n)) + 2)
+        if not (1 <= precision_bits <= MAX_PRECISION_BITS) or n > (1 << precision_bits):
+            raise ValueError(f"Точность {precision_bits} бит недостаточна для N={n}")
+
+        self.symbols: List[str] = list(probabilities)
+        self.precision_bits = precision_bits
+        self.total = 1 << precision_bits
+        self.freqs = self._quantize(list(probabilities.values()), self.total)
+        self.cumulative = [0] + list(accumulate(self.freqs))
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self._lookup: Optional[List[int]] = None
+        if precision_bits <= LOOKUP_TABLE_MAX_BITS:
+            self._lookup = [0] * self.total
+            for i, (start, freq) in enumerate(zip(self.cumulative, self.freqs)):
+                self._lookup[start:start + freq] = [i] * freq
+
+    @staticmethod
+    def _quantize(probs: List[float], total: int) -> List[int]:
+        """
+        Каждому символу - гарантированная 1 (иначе символ не закодировать),
+        остаток total - N делится пропорционально p методом наибольших
+        остатков (как в random_probs), чтобы сумма была ТОЧНО total.
+        """
+        n = len(probs)
+        prob_sum = sum(probs)
+        spare = total - n
+        scaled = [p / prob_sum * spare for p in probs]
+        freqs = [1 + int(s) for s in scaled]
+        diff = total - sum(freqs)
+        if diff > 0:
+            by_remainder = sorted(range(n), key=lambda i: scaled[i] - int(scaled[i]), reverse=True)
+            for i in by_remainder[:diff]:
+                freqs[i] += 1
+        return freqs
+
+    def index_of(self, symbol: str) -> int:
+        index = self._index.get(symbol)
+        if index is None:
+            raise ValueError(f"Символ {symbol!r} отсутствует в модели")
+        return index
+
+    def index_for_value(self, value: int) -> int:
+        """Символ, в интервал которого попадает `value` (0 <= value < total)."""
+        if self._lookup is not None:
+            return self._lookup[value]
+        return bisect_right(self.cumulative, value) - 1
+
+    def model_length(self, probabilities: Dict[str, float]) -> float:
+        """
+        Ожидаемая длина кода, бит/символ: Σ p(i) * log2(total / freq(i)).
+        Отличается от H(Z) только потерями на квантование частот.
+        """
+        return sum(
+            prob * (self.precision_bits - math.log2(self.freqs[self._index[symbol]]))
+            for symbol, prob in probabilities.items() if prob > 0
+        )
+
+
+class RangeEncoder:
+    """Потоковый кодер: байты выдаются по мере того, как старшие разряды "устоялись"."""
+
+    def __init__(self, model: FrequencyModel):
+        self.model = model
+        self._low = 0
+        self._range = _MASK
+        self._out = bytearray()
+
+    def encode_symbol(self, symbol: str):
+        model = self.model
+        i = model.index_of(symbol)
+        r = self._range >> model.precision_bits
+        self._low = (self._low + model.cumulative[i] * r) & _MASK
+        self._range = r * model.freqs[i]
+        self._normalize()
+
+    def _normalize(self):
+        low, rng, out = self._low, self._range, self._out
+        while True:
+            if (low ^ (low + rng)) < _TOP:
+                pass
+            elif rng < _BOT:
+                rng = (-low) & (_BOT - 1)
+            else:
+                break
+            out.append(low >> 56)
+            low = (low << 8) & _MASK
+            rng = (rng << 8) & _MASK
+        self._low, self._range = low, rng
+
+    def flush(self) -> bytes:
+        """Забирает уже готовые байты (для потоковой передачи)."""
+        data = bytes(self._out)
+        self._out.clear()
+        return data
+
+    def finish(self) -> bytes:
+        """Дописывает хвост состояния и возвращает оставшиеся байты."""
+        for _ in range(8):
+            self._out.append(self._low >> 56)
+            self._low = (self._low << 8) & _MASK
+        return self.flush()
+
+
+class RangeDecoder:
+    """Потоковый декодер: читает байты из любого итерируемого источника."""
+
+    def __init__(self, model: FrequencyModel, data: Iterable[int]):
+        self.model = model
+        self._bytes = iter(data)
+        self._low = 0
+        self._range = _MASK
+        self._code = 0
+        for _ in range(8):
+            self._code = (self._code << 8) | next(self._bytes, 0)
+
+    def decode_symbol(self) -> str:
+        model = self.model
+        r = self._range >> model.precision_bits
+        value = min(((self._code - self._low) & _MASK) // r, model.total - 1)
+        i = model.index_for_value(value)
+
+        low = (self._low + model.cumulative[i] * r) & _MASK
+        rng = r * model.freqs[i]
+        code = self._code
+        while True:
+            if (low ^ (low + rng)) < _TOP:
+                pass
+            elif rng < _BOT:
+                rng = (-low) & (_BOT - 1)
+            else:
+                break
+            code = ((code << 8) | next(self._bytes, 0)) & _MASK
+            low = (low << 8) & _MASK
+            rng = (rng << 8) & _MASK
+        self._low, self._range, self._code = low, rng, code
+        return model.symbols[i]
+
+    def decode(self, n_symbols: int) -> Iterator[str]:
+        for _ in range(n_symbols):
+            yield self.decode_symbol()
+
+
+def encode(model: FrequencyModel, stream: Iterable[str]) -> bytes:
+    """Кодирует поток символов целиком."""
+    encoder = RangeEncoder(model)
+    for symbol in stream:
+        encoder.encode_symbol(symbol)
+    return encoder.finish()
+
+
+def decode(model: FrequencyModel, data: bytes, n_symbols: int) -> List[str]:
+    """Декодирует `n_symbols` символов (длина потока хранится снаружи)."""
+    return list(RangeDecoder(model, data).decode(n_symbols))
+
+
+def calculate_range_metrics(probabilities: Dict[str, float], model: FrequencyModel,
+                            encoded_bytes: int = 0, n_symbols: int = 0) -> Dict[str, float]:
+    """
+    Метрики range coder'а в тех же терминах, что и у деревьев:
+    L_avg (ожидаемая по модели и, если передан результат, фактическая)
+    и избыточность r = L_avg - H из `metrics`.
+    """
+    h_result = metrics.calculate_entropy(probabilities)[0]
+    l_model = model.model_length(probabilities)
+    result = {
+        "H": h_result,
+        "L_avg": l_model,
+        "r": metrics.calculate_redundancy(l_model, h_result)[0],
+    }
+    if n_symbols:
+        l_actual = 8 * encoded_bytes / n_symbols
+        result["L_actual"] = l_actual
+        result["r_actual"] = metrics.calculate_redundancy(l_actual, h_result)[0]
+    return result
+
+
+def benchmark_against_huffman(probabilities: Dict[str, float], stream: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Замер скорости кодирования/декодирования range coder'а
+    против табличного Хаффмана (словарь кодов + таблица декодирования).
+
+    Returns:
+        dict: {'range': {...}, 'huffman': {...}} с полями
+              bits_per_symbol, encode_sps, decode_sps (символов в секунду).
+    """
+    import time
+    import algorithms
+    import bitstream
+
+    n = len(stream)
+    report: Dict[str, Dict[str, float]] = {}
+
+    # --- Range coder ---
+    model = FrequencyModel(probabilities)
+    start_time = time.perf_counter()
+    data = encode(model, stream)
+    encode_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    decoded = decode(model, data, n)
+    decode_time = time.perf_counter() - start_time
+    if decoded != stream:
+        raise RuntimeError("Range coder: декодирование не совпало с исходным потоком")
+    report["range"] = {
+        "bits_per_symbol": 8 * len(data) / n,
+        "encode_sps": n / encode_time,
+        "decode_sps": n / decode_time,
+    }
+
+    # --- Хаффман (коды в целочисленной форме + таблица декодирования) ---
+    symbols, code_values, code_lengths = algorithms.generate_int_codes_from_tree(
+        algorithms.build_huffman_tree(probabilities), len(probabilities))
+    codebook = {symbol: (value, length) for symbol, value, length in zip(symbols, code_values, code_lengths)}
+    decode_table = bitstream.build_decode_table(codebook)
+    start_time = time.perf_counter()
+    data, bit_length = bitstream.encode_symbols(stream, codebook)
+    encode_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    decoded = bitstream.decode_symbols(data, n, decode_table)
+    decode_time = time.perf_counter() - start_time
+    if decoded != stream:
+        raise RuntimeError("Хаффман: декодирование не совпало с исходным потоком")
+    report["huffman"] = {
+        "bits_per_symbol": bit_length / n,
+        "encode_sps": n / encode_time,
+        "decode_sps": n / decode_time,
+    }
+    return report
+
+
+if __name__ == "__main__":
+    import random
+
+    # "Перекошенное" распределение: Хаффман теряет почти бит на символ
+    probabilities = {"z1": 0.95, "z2": 0.02, "z3": 0.015, "z4": 0.01, "z5": 0.005}
+    stream = random.choices(list(probabilities), weights=list(probabilities.values()), k=200_000)
+
+    model = FrequencyModel(probabilities)
+    data = encode(model, stream)
+    range_metrics = calculate_range_metrics(probabilities, model, len(data), len(stream))
+    rprint(f"[bold]Range coder, поток {len(stream):,} символов[/bold]")
+    rprint(f"  [yellow]H:[/yellow] {range_metrics['H']:.6f} бит")
+    rprint(f"  [green]L_avg (модель):[/green] {range_metrics['L_avg']:.6f}, "
+           f"[green]фактически:[/green] {range_metrics['L_actual']:.6f} бит/символ")
+    rprint(f"  [cyan]r (фактически):[/cyan] {range_metrics['r_actual']:.6f} бит")
+
+    report = benchmark_against_huffman(probabilities, stream)
+    for name, row in report.items():
+        rprint(f"  {name:<8} {row['bits_per_symbol']:.4f} бит/символ, "
+               f"encode {row['encode_sps'] / 1e6:.2f} M симв/с, decode {row['decode_sps'] / 1e6:.2f} M симв/с")
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+RUN_DIR_PREFIX = "output_"
+# Подсказка "с какого номера пробовать" для следующего запуска
+NEXT_RUN_FILE = ".next_run"
+MANIFEST_FILE = "manifest.jsonl"
+
+
+def _read_next_run_hint(base_path: Path) -> Optional[int]:
+    try:
+        return int((base_path / NEXT_RUN_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_next_run_hint(base_path: Path, next_n: int):
+    """Атомарная замена файла подсказки: читатель видит старое или новое число, но не обрывок."""
+    tmp_path = base_path / f"{NEXT_RUN_FILE}.{os.getpid()}"
+    tmp_path.write_text(str(next_n), encoding="utf-8")
+    os.replace(tmp_path, base_path / NEXT_RUN_FILE)
+
+
+def _scan_max_run(base_path: Path) -> int:
+    """Старый способ (обход всех папок) - только для results/ без файла подсказки."""
+    max_n = 0
+    for d in base_path.iterdir():
+        if d.is_dir() and d.name.startswith(RUN_DIR_PREFIX):
+            try:
+                max_n = max(max_n, int(d.name[len(RUN_DIR_PREFIX):]))
+            except ValueError:
+                continue
+    return max_n
+
+
+def allocate_run_directory(base_dir: str = "results") -> Tuple[int, Path]:
+    """
+    Выделяет новую папку `output_N` без гонок между параллельными запусками.
+
+    Номер занимает сам `mkdir` (он атомарен: из двух процессов папку
+    создаст ровно один, второй получит FileExistsError и возьмет N + 1).
+    Откуда начинать перебор, подсказывает файл `.next_run` - поэтому
+    папки results/ обходятся только один раз, при первом запуске.
+
+    Returns:
+        tuple: (номер запуска N, путь к папке).
+    """
+    base_path = Path(base_dir)
+    base_path.mkdir(exist_ok=True)
+
+    next_n = _read_next_run_hint(base_path)
+    if next_n is None:
+        next_n = _scan_max_run(base_path) + 1
+    while True:
+        run_path = base_path / f"{RUN_DIR_PREFIX}{next_n}"
+        try:
+            run_path.mkdir()
+            break
+        except FileExistsError:
+            next_n += 1
+    _write_next_run_hint(base_path, next_n + 1)
+    return next_n, run_path
+
+
+def distribution_hash(probabilities: Dict[str, float]) -> str:
+    """
+    Отпечаток распределения. Как и ключ кеша в server.py, учитывает
+    порядок символов: от него зависит разрешение "ничьих" в Хаффмане.
+    """
+    payload = json.dumps(list(probabilities.items()), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def append_record(run_path: Path, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Дописывает запись о расчете в `manifest.jsonl` рядом с папками запусков.
+
+    Строка пишется одним write() в файл, открытый с O_APPEND, - записи
+    параллельных запусков не перемешиваются. Номер запуска, время и пути
+    артефактов (относительно results/) добавляются автоматически.
+
+    Args:
+        run_path (Path): Папка запуска (из `allocate_run_directory`).
+        record (dict): {'kind', 'distribution_hash', 'n', 'algorithms', 'metrics', 'timings', ...}.
+    """
+    base_path = run_path.parent
+    full_record = {
+        "run_id": int(run_path.name[len(RUN_DIR_PREFIX):]),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **record,
+    }
+    full_record["artifacts"] = [os.path.relpath(artifact, base_path) for artifact in record.get("artifacts", [])]
+    line = (json.dumps(full_record, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(base_path / MANIFEST_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+    return full_record
+
+
+class RunManifest:
+    """
+    Чтение манифеста с индексами по отпечатку распределения, алгоритму
+    и номеру запуска. Файл только дописывается, поэтому `refresh`
+    дочитывает новые строки с прошлого смещения, не перечитывая все.
+    """
+
+    def __init__(self, base_dir: str = "results"):
+        self.path = Path(base_dir) / MANIFEST_FILE
+        self.records: List[Dict[str, Any]] = []
+        self._offset = 0
+        self._by_hash: Dict[str, List[int]] = {}
+        self._by_algorithm: Dict[str, List[int]] = {}
+        self._by_run: Dict[int, List[int]] = {}
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Дочитывает новые записи. Недописанная последняя строка пропускается до следующего раза."""
+        if not self.path.exists():
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+
+        added = 0
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = len(self.records)
+            self.records.append(record)
+            self._by_hash.setdefault(record.get("distribution_hash"), []).append(index)
+            for algo_name in record.get("algorithms", []):
+                self._by_algorithm.setdefault(algo_name, []).append(index)
+            self._by_run.setdefault(record.get("run_id"), []).append(index)
+            added += 1
+        return added
+
+    def find(self, distribution_hash: Optional[str] = None, algorithm: Optional[str] = None,
+             run_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Записи, подходящие под все заданные условия (в порядке записи)."""
+        candidates: Optional[set] = None
+        for index, key in ((self._by_hash, distribution_hash), (self._by_algorithm, algorithm),
+                           (self._by_run, run_id)):
+            if key is None:
+                continue
+            found = set(index.get(key, ()))
+            candidates = found if candidates is None else candidates & found
+        if candidates is None:
+            return list(self.records)
+        return [self.records[i] for i in sorted(candidates)]
+
+    def latest(self, distribution_hash: str, algorithm: str) -> Optional[Dict[str, Any]]:
+        """Последний расчет этого распределения этим алгоритмом (или None)."""
+        found = self.find(distribution_hash=distribution_hash, algorithm=algorithm)
+        return found[-1] if found else None
+
+
+def build_manifest_table(records: List[Dict[str, Any]]) -> Table:
+    table = Table(title=f"[bold]Манифест запусков ({len(records)} записей)[/bold]")
+    table.add_column("Запуск", justify="right")
+    table.add_column("Время", style="dim")
+    table.add_column("Тип")
+    table.add_column("Распределение", style="dim")
+    table.add_column("N", justify="right")
+    table.add_column("Алгоритмы", style="cyan")
+    table.add_column("L_avg", style="green", justify="right")
+    table.add_column("Артефакты", style="dim")
+    for record in records:
+        l_avg = ", ".join(f"{m['L_avg']:.4f}" for m in record.get("metrics", {}).values() if "L_avg" in m)
+        table.add_row(str(record["run_id"]), record["created"], record.get("kind", ""),
+                      str(record.get("distribution_hash", ""))[:12], str(record.get("n", "")),
+                      ", ".join(record.get("algorithms", [])), l_avg, "\n".join(record.get("artifacts", [])))
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Поиск по манифесту прошлых запусков")
+    parser.add_argument("--results", default="results", help="Папка с запусками")
+    parser.add_argument("--hash", help="Отпечаток распределения (можно начало)")
+    parser.add_argument("--algorithm", help="Алгоритм")
+    parser.add_argument("--run", type=int, help="Номер запуска")
+    args = parser.parse_args()
+
+    manifest = RunManifest(args.results)
+    records = manifest.find(algorithm=args.algorithm, run_id=args.run)
+    if args.hash:
+        records = [r for r in records if str(r.get("distribution_hash", "")).startswith(args.hash)]
+    Console().print(build_manifest_table(records))
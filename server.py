@@ -0,0 +1,428 @@
+import hashlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import metrics
+
+from rich import print as rprint
+
+# --- Константы ---
+# Сервер слушает ТОЛЬКО localhost: никакой сети наружу.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+
+# Пакетирование: мелкие запросы копятся в течение BATCH_WINDOW_SEC
+# (или до BATCH_MAX_SIZE штук) и уходят в пул ОДНОЙ задачей.
+BATCH_MAX_SIZE = 32
+BATCH_WINDOW_SEC = 0.005
+# Запросы с N больше порога в пакет не объединяются (и так дорогие).
+BATCH_SMALL_N = 1000
+
+CACHE_MAX_ENTRIES = 256
+REQUEST_TIMEOUT_SEC = 300
+
+# Короткие латинские имена для клиентов, которым неудобна кириллица
+ALGORITHM_ALIASES = {
+    "huffman": "Хаффман",
+    "huffman-min-variance": "Хаффман (мин. дисперсия)",
+    "huffman-grouped": "Хаффман (группы весов)",
+    "shannon-fano": "Шеннон-Фано",
+    "shannon": "Шеннон",
+    "shannon-fano-elias": "Шеннон-Фано-Элиас",
+    "alphabetic": "Алфавитный (Гарсиа-Уокс)",
+}
+
+
+def _resolve_algorithm(algo_name: str) -> str:
+    """Приводит имя алгоритма к ключу `algorithms.ALL_ALGORITHMS`."""
+    resolved = ALGORITHM_ALIASES.get(algo_name.lower(), algo_name)
+    if resolved not in algorithms.ALL_ALGORITHMS:
+        known = ", ".join(algorithms.ALL_ALGORITHMS + list(ALGORITHM_ALIASES))
+        raise ValueError(f"Неизвестный алгоритм '{algo_name}'. Доступны: {known}")
+    return resolved
+
+
+def _build_one(algo_name: str, probabilities: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Строит коды и метрики для одного запроса.
+    Выполняется внутри процесса пула.
+    """
+    start_time = time.perf_counter()
+    if not probabilities:
+        raise ValueError("Не удалось построить коды (пустой ввод?)")
+    symbols, code_values, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+    build_time = time.perf_counter() - start_time
+
+    return {
+        "algorithm": algo_name,
+        # Строки кодов - только для JSON-ответа
+        "codes": {
+            symbol: algorithms.int_code_to_str(value, length)
+            for symbol, value, length in zip(symbols, code_values, code_lengths)
+        },
+        "metrics": metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths))),
+        "build_time": build_time,
+    }
+
+
+def _build_batch(jobs: List[Tuple[str, Dict[str, float]]]) -> List[Tuple[bool, Any]]:
+    """
+    Обрабатывает пакет запросов в одном процессе пула.
+    Ошибка одного запроса не роняет весь пакет.
+
+    Returns:
+        list: [(True, результат) | (False, текст ошибки), ...] в порядке `jobs`.
+    """
+    results: List[Tuple[bool, Any]] = []
+    for algo_name, probabilities in jobs:
+        try:
+            results.append((True, _build_one(algo_name, probabilities)))
+        except Exception as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _cache_key(algo_name: str, probabilities: Dict[str, float]) -> str:
+    """
+    Ключ кеша. Порядок символов важен: от него зависит разрешение
+    "ничьих" в Хаффмане, поэтому словарь НЕ сортируется.
+    """
+    payload = json.dumps([algo_name, list(probabilities.items())], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ServiceStats:
+    """
+    Потокобезопасные счетчики сервиса: запросы, попадания в кеш,
+    пакеты, задержки и пропускная способность.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        # Запросы, дождавшиеся такого же запроса "в полете" (не попадания в кеш)
+        self.joined_inflight = 0
+        self.builds = 0
+        self.batches = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def add(self, **increments: int):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            uptime = time.monotonic() - self.started_at
+            return {
+                "uptime_sec": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "cache_hits": self.cache_hits,
+                "joined_inflight": self.joined_inflight,
+                "builds": self.builds,
+                "batches": self.batches,
+                "avg_batch_size": self.builds / self.batches if self.batches else 0.0,
+                "latency_avg_ms": 1000 * self.latency_total / self.requests if self.requests else 0.0,
+                "latency_max_ms": 1000 * self.latency_max,
+                "throughput_rps": self.requests / uptime if uptime > 0 else 0.0,
+            }
+
+
+class _Job:
+    """Один ожидающий запрос в очереди пакетировщика."""
+    __slots__ = ("key", "algo_name", "probabilities", "future")
+
+    def __init__(self, key: str, algo_name: str, probabilities: Dict[str, float]):
+        self.key = key
+        self.algo_name = algo_name
+        self.probabilities = probabilities
+        self.future: Future = Future()
+
+
+class BuildBatcher:
+    """
+    Принимает запросы на построение кодов, отдает готовое из LRU-кеша,
+    склеивает одинаковые запросы "в полете" и пакетами отправляет
+    остальное в пул процессов.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, stats: Optional[ServiceStats] = None):
+        self.stats = stats if stats is not None else ServiceStats()
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, algo_name: str, probabilities: Dict[str, float]) -> Tuple[Future, bool]:
+        """
+        Ставит запрос в очередь.
+
+        Попадания в кеш и присоединения к запросу "в полете" считаются
+        в stats по отдельности (cache_hits и joined_inflight).
+
+        Returns:
+            tuple: (Future с результатом, True если новое построение не нужно:
+                    ответ из кеша или из уже идущего построения).
+        """
+        algo_name = _resolve_algorithm(algo_name)
+        key = _cache_key(algo_name, probabilities)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                done: Future = Future()
+                done.set_result(cached)
+                self.stats.add(cache_hits=1)
+                return done, True
+
+            # Такой же запрос уже считается - ждем его результат
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.stats.add(joined_inflight=1)
+                return pending, True
+
+            job = _Job(key, algo_name, probabilities)
+            self._in_flight[key] = job.future
+
+        self._queue.put(job)
+        return job.future, False
+
+    def shutdown(self):
+        """Останавливает диспетчер и пул процессов."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=True)
+
+    def _dispatch_loop(self):
+        """Фоновый поток: собирает пакеты и отправляет их в пул."""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            if len(first.probabilities) <= BATCH_SMALL_N:
+                deadline = time.monotonic() + BATCH_WINDOW_SEC
+                while len(batch) < BATCH_MAX_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        job = self._queue.get(timeout=remaining)
+                    except Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    if len(job.probabilities) > BATCH_SMALL_N:
+                        # Большой запрос уходит отдельной задачей
+                        self._send([job])
+                        continue
+                    batch.append(job)
+
+            self._send(batch)
+
+    def _send(self, batch: List[_Job]):
+        self.stats.add(batches=1, builds=len(batch))
+        try:
+            pool_future = self._pool.submit(
+                _build_batch, [(job.algo_name, job.probabilities) for job in batch]
+            )
+        except RuntimeError as e:
+            # Пул уже остановлен
+            self._finish(batch, [(False, str(e))] * len(batch))
+            return
+        pool_future.add_done_callback(lambda f: self._on_batch_done(batch, f))
+
+    def _on_batch_done(self, batch: List[_Job], pool_future: Future):
+        try:
+            results = pool_future.result()
+        except Exception as e:
+            results = [(False, f"{type(e).__name__}: {e}")] * len(batch)
+        self._finish(batch, results)
+
+    def _finish(self, batch: List[_Job], results: List[Tuple[bool, Any]]):
+        with self._lock:
+            for job, (ok, payload) in zip(batch, results):
+                self._in_flight.pop(job.key, None)
+                if ok:
+                    self._cache[job.key] = payload
+                    self._cache.move_to_end(job.key)
+                    while len(self._cache) > CACHE_MAX_ENTRIES:
+                        self._cache.popitem(last=False)
+
+        for job, (ok, payload) in zip(batch, results):
+            if ok:
+                job.future.set_result(payload)
+            else:
+                job.future.set_exception(RuntimeError(payload))
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP-эндпоинты:
+        POST /build  {"algorithm": "huffman", "probabilities": {"z1": 0.5, ...}}
+        GET  /stats  счетчики сервиса
+        GET  /health проверка, что сервер жив
+    """
+
+    # Ссылку на BuildBatcher выставляет `create_server`
+    server: "ThreadingHTTPServer"
+
+    def log_message(self, format: str, *args):
+        # Не засоряем консоль логом каждого запроса
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        batcher: BuildBatcher = self.server.batcher
+        if self.path == "/stats":
+            self._send_json(200, batcher.stats.snapshot())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Неизвестный путь {self.path}"})
+
+    def do_POST(self):
+        batcher: BuildBatcher = self.server.batcher
+        if self.path != "/build":
+            self._send_json(404, {"error": f"Неизвестный путь {self.path}"})
+            return
+
+        start_time = time.perf_counter()
+        batcher.stats.add(requests=1)
+        status, payload = 200, {}
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            probabilities = request.get("probabilities")
+            if not isinstance(probabilities, dict) or not probabilities:
+                raise ValueError("Поле 'probabilities' должно быть непустым словарем")
+            probabilities = {str(k): float(v) for k, v in probabilities.items()}
+
+            future, cached = batcher.submit(str(request.get("algorithm", "huffman")), probabilities)
+            try:
+                payload = dict(future.result(timeout=REQUEST_TIMEOUT_SEC))
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            payload["cached"] = cached
+        except (ValueError, TypeError, AttributeError) as e:
+            status, payload = 400, {"error": str(e)}
+
+        if status != 200:
+            batcher.stats.add(errors=1)
+        batcher.stats.record_latency(time.perf_counter() - start_time)
+        self._send_json(status, payload)
+
+
+def create_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  workers: int = DEFAULT_WORKERS) -> ThreadingHTTPServer:
+    """
+    Создает (но не запускает) HTTP-сервер с пулом процессов.
+    `port=0` - взять любой свободный порт (удобно для тестов),
+    реальный порт: `server.server_address[1]`.
+    """
+    server = ThreadingHTTPServer((host, port), _RequestHandler)
+    server.daemon_threads = True
+    server.batcher = BuildBatcher(workers=workers)
+    return server
+
+
+def start_background_server(host: str = DEFAULT_HOST, port: int = 0,
+                            workers: int = DEFAULT_WORKERS) -> ThreadingHTTPServer:
+    """Запускает сервер в фоновом потоке. Остановка: `stop_server(server)`."""
+    server = create_server(host, port, workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server: ThreadingHTTPServer):
+    """Останавливает сервер, запущенный через `start_background_server`."""
+    server.shutdown()
+    server.server_close()
+    server.batcher.shutdown()
+
+
+# --- Локальный клиент ---
+
+def _http_json(url: str, payload: Optional[Dict[str, Any]] = None,
+               timeout: float = REQUEST_TIMEOUT_SEC) -> Dict[str, Any]:
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        error = json.loads(e.read() or b"{}").get("error", str(e))
+        raise RuntimeError(f"Сервер вернул {e.code}: {error}") from None
+
+
+def request_build(algo_name: str, probabilities: Dict[str, float],
+                  host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Dict[str, Any]:
+    """
+    Клиент: просит сервер построить коды.
+
+    Returns:
+        dict: {'algorithm', 'codes', 'metrics', 'build_time', 'cached'}.
+    """
+    return _http_json(f"http://{host}:{port}/build",
+                      {"algorithm": algo_name, "probabilities": probabilities})
+
+
+def request_stats(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Dict[str, Any]:
+    """Клиент: счетчики задержек и пропускной способности сервера."""
+    return _http_json(f"http://{host}:{port}/stats")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Локальный сервис построения кодов Хаффмана/Шеннона-Фано")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers)
+    rprint(f"[bold green]Сервис слушает [cyan]http://{args.host}:{server.server_address[1]}[/cyan] "
+           f"(воркеров: {args.workers}). Ctrl+C - выход.[/bold green]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        rprint("\n[yellow]Остановка сервиса...[/yellow]")
+    finally:
+        server.server_close()
+        server.batcher.shutdown()
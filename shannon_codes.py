@@ -0,0 +1,188 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Кумулятивные вероятности считаются в фиксированной точке: p -> ⌊p * 2^62⌋.
+# Сумма целых точна (в отличие от np.cumsum по float), поэтому код
+# гарантированно префиксный. Отсюда и предел длины кода.
+_FIXED_POINT_BITS = 62
+MAX_CODE_LENGTH = _FIXED_POINT_BITS
+# Допустимое отклонение Σ p от 1 (округление при вводе); остаток убирает нормировка
+PROBABILITY_SUM_TOLERANCE = 1e-6
+# Точность float64: после нормировки Σ p * 2^62 отличается от 2^62 на единицы
+# младшего разряда, т.е. не больше чем на ~N * 2^(62 - 52) в фиксированной точке
+_FLOAT_MANTISSA_BITS = 52
+
+
+def _probability_array(probabilities: Dict[str, float]) -> Tuple[List[str], np.ndarray]:
+    if not probabilities:
+        raise ValueError("Словарь вероятностей пуст")
+    symbols = list(probabilities)
+    p = np.fromiter(probabilities.values(), dtype=np.float64, count=len(symbols))
+    if not np.all(p > 0):
+        raise ValueError("Все вероятности должны быть > 0")
+    total = float(p.sum())
+    if abs(total - 1.0) > PROBABILITY_SUM_TOLERANCE:
+        raise ValueError(f"Сумма вероятностей {total} не равна 1 (допуск {PROBABILITY_SUM_TOLERANCE})")
+    return symbols, p / total
+
+
+def _fixed_point(p: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Вероятности в фиксированной точке q(i) = ⌊p(i) * 2^62⌋ и их
+    ИСКЛЮЧАЮЩИЕ кумулятивные суммы F(i) = Σ_{j<i} q(j).
+
+    Если из-за округления float Σ p чуть больше 1, излишек (единицы
+    младшего разряда) снимается с самой большой q - иначе F последнего
+    символа могла бы "вылезти" за 1. Вход должен быть уже нормирован
+    (`_probability_array`): большой излишек - ошибка, а не округление.
+    """
+    quantized = np.floor(np.ldexp(p, _FIXED_POINT_BITS)).astype(np.uint64)
+    if not np.all(quantized > 0):
+        raise ValueError(f"Вероятность меньше 2^-{_FIXED_POINT_BITS}: длина кода больше {MAX_CODE_LENGTH}")
+    excess = int(quantized.sum(dtype=np.uint64)) - (1 << _FIXED_POINT_BITS)
+    if excess > 0:
+        largest = int(np.argmax(quantized))
+        max_rounding = (len(p) + 1) << (_FIXED_POINT_BITS - _FLOAT_MANTISSA_BITS)
+        if excess > max_rounding or excess >= int(quantized[largest]):
+            raise ValueError(f"Σ p больше 1 не из-за округления (излишек {excess} / 2^{_FIXED_POINT_BITS})")
+        quantized[largest] -= np.uint64(excess)
+
+    cumulative = np.empty_like(quantized)
+    cumulative[0] = 0
+    np.cumsum(quantized[:-1], out=cumulative[1:])
+    return quantized, cumulative
+
+
+def _self_information_lengths(quantized: np.ndarray) -> np.ndarray:
+    """
+    L(i) = ⌈-log2 p(i)⌉ - наименьшее L с 2^-L <= p(i), считается ТОЧНО
+    по целому q(i): L = 62 - ⌊log2 q(i)⌋.
+
+    ⌊log2⌋ берется через float и поправляется сдвигами: при переводе
+    uint64 -> float64 число вида 2^k - 1 округляется до 2^k.
+    """
+    exponents = np.floor(np.log2(quantized.astype(np.float64))).astype(np.int64)
+    exponents -= (quantized >> exponents.astype(np.uint64)) == 0
+    exponents += (quantized >> (exponents + 1).astype(np.uint64)) != 0
+    return _FIXED_POINT_BITS - exponents
+
+
+def _check_lengths(lengths: np.ndarray):
+    max_length = int(lengths.max())
+    if max_length > MAX_CODE_LENGTH:
+        raise ValueError(f"Длина кода {max_length} > {MAX_CODE_LENGTH}: слишком малая вероятность")
+
+
+def shannon_code_arrays(probabilities: Dict[str, float]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Код Шеннона без дерева: символы по убыванию p, L(i) = ⌈-log2 p(i)⌉,
+    кодовое слово - первые L(i) бит двоичной записи F(i) = Σ_{j<i} p(j).
+
+    Returns:
+        tuple: (символы во входном порядке, значения кодов uint64, длины int64).
+    """
+    symbols, p = _probability_array(probabilities)
+    order = np.argsort(-p, kind="stable")
+    sorted_p = p[order]
+
+    quantized, cumulative = _fixed_point(sorted_p)
+    lengths = np.maximum(_self_information_lengths(quantized), 1)  # p = 1: код '0', а не пустой
+    # "Извлечение бит": первые L бит дроби F = F_fixed >> (62 - L)
+    values = cumulative >> (_FIXED_POINT_BITS - lengths).astype(np.uint64)
+
+    code_values = np.empty_like(values)
+    code_lengths = np.empty_like(lengths)
+    code_values[order] = values
+    code_lengths[order] = lengths
+    return symbols, code_values, code_lengths
+
+
+def shannon_fano_elias_code_arrays(probabilities: Dict[str, float]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Код Шеннона-Фано-Элиаса: сортировка не нужна. F̄(i) = Σ_{j<i} p(j) + p(i)/2,
+    L(i) = ⌈-log2 p(i)⌉ + 1, кодовое слово - первые L(i) бит F̄(i).
+
+    Returns:
+        tuple: (символы во входном порядке, значения кодов uint64, длины int64).
+    """
+    symbols, p = _probability_array(probabilities)
+    quantized, cumulative = _fixed_point(p)
+    lengths = _self_information_lengths(quantized) + 1
+    _check_lengths(lengths)
+    midpoints = cumulative + (quantized >> np.uint64(1))
+    values = midpoints >> (_FIXED_POINT_BITS - lengths).astype(np.uint64)
+    return symbols, values, lengths
+
+
+def generate_shannon_int_codes(probabilities: Dict[str, float]) -> Tuple[List[str], List[int], List[int]]:
+    """Код Шеннона в форме `algorithms.generate_int_codes_from_tree` (списки Python int)."""
+    symbols, values, lengths = shannon_code_arrays(probabilities)
+    return symbols, values.tolist(), lengths.tolist()
+
+
+def generate_shannon_fano_elias_int_codes(probabilities: Dict[str, float]) -> Tuple[List[str], List[int], List[int]]:
+    """Код Шеннона-Фано-Элиаса в форме `algorithms.generate_int_codes_from_tree`."""
+    symbols, values, lengths = shannon_fano_elias_code_arrays(probabilities)
+    return symbols, values.tolist(), lengths.tolist()
+
+
+def calculate_length_metrics_vectorized(probabilities: Dict[str, float], code_lengths: np.ndarray) -> Dict[str, float]:
+    """
+    То же, что `metrics.calculate_length_metrics`, но на массивах NumPy
+    (длины - в порядке входного словаря, как их возвращают *_code_arrays).
+    """
+    _, p = _probability_array(probabilities)
+    h_result = float(-np.sum(p * np.log2(p)))
+    l_result = float(np.sum(p * code_lengths))
+    return {
+        "H": h_result,
+        "L_avg": l_result,
+        "r": l_result - h_result,
+        "K": float(np.sum(np.ldexp(1.0, -code_lengths))),
+        "max_length": int(code_lengths.max()),
+        "length_variance": float(np.sum(p * (code_lengths - l_result) ** 2)),
+    }
+
+
+if __name__ == "__main__":
+    import time
+    from random_probs import generate_probabilities
+
+    import algorithms
+    import metrics
+    import verification
+
+    from rich.console import Console
+    from rich.table import Table
+
+    n_symbols = 1_000_000
+    np.random.seed(0)
+    probabilities = generate_probabilities(n_symbols, method='dirichlet', decimals=12, min_prob=1e-12)
+
+    table = Table(title=f"[bold]Коды без дерева против деревьев, N={n_symbols:,}[/bold]")
+    table.add_column("Алгоритм", style="cyan")
+    table.add_column("Время, с", justify="right")
+    table.add_column("L_avg", style="green", justify="right")
+    table.add_column("r", style="cyan", justify="right")
+    table.add_column("max L", justify="right")
+    table.add_column("Префиксный", justify="right")
+
+    for algo_name in algorithms.ALL_ALGORITHMS:
+        start_time = time.perf_counter()
+        symbols, code_values, code_lengths = algorithms.generate_int_codes(algo_name, probabilities)
+        build_time = time.perf_counter() - start_time
+        summary = metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths)))
+        check = verification.verify_int_codes(symbols, code_values, code_lengths)
+        table.add_row(algo_name, f"{build_time:.3f}", f"{summary['L_avg']:.6f}", f"{summary['r']:.6f}",
+                      str(summary["max_length"]), "да" if check.is_valid else "[red]НЕТ[/red]")
+
+    # Чистая векторная часть (без перевода в списки Python)
+    for algo_name, engine in (("Шеннон", shannon_code_arrays), ("Шеннон-Фано-Элиас", shannon_fano_elias_code_arrays)):
+        start_time = time.perf_counter()
+        _, _, lengths = engine(probabilities)
+        summary = calculate_length_metrics_vectorized(probabilities, lengths)
+        table.add_row(f"{algo_name} (только NumPy + метрики)", f"{time.perf_counter() - start_time:.3f}",
+                      f"{summary['L_avg']:.6f}", f"{summary['r']:.6f}", str(summary["max_length"]), "—")
+
+    Console().print(table)
@@ -0,0 +1,222 @@
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# --- Импорты наших модулей ---
+import algorithms
+import metrics
+
+from rich import print as rprint
+
+IntCode = Tuple[int, int]
+
+
+class SpaceSavingSketch:
+    """
+    Приблизительные частоты с ограниченной памятью (алгоритм Space-Saving,
+    Metwally и др.): хранится не больше `capacity` счетчиков.
+
+    Новый символ при полной таблице вытесняет символ с минимальным
+    счетчиком и наследует его значение (+1). Поэтому:
+        * сумма всех счетчиков ТОЧНО равна длине потока;
+        * count(s) завышен не больше, чем на error(s) <= total / capacity;
+        * любой символ с частотой > total / capacity гарантированно в таблице.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity должна быть >= 1")
+        self.capacity = capacity
+        self.total = 0
+        self.evictions = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # Min-куча (счетчик, символ); записи обновляются лениво - при извлечении
+        self._heap: List[Tuple[int, str]] = []
+
+    def update(self, symbol: str, count: int = 1):
+        self.total += count
+        counts = self._counts
+        if symbol in counts:
+            counts[symbol] += count
+            return
+        if len(counts) < self.capacity:
+            counts[symbol] = count
+            self._errors[symbol] = 0
+            heapq.heappush(self._heap, (count, symbol))
+            return
+
+        # Ищем настоящий минимум: устаревшие записи кучи обновляем и кладем обратно
+        heap = self._heap
+        while True:
+            min_count, victim = heap[0]
+            if counts[victim] == min_count:
+                break
+            heapq.heapreplace(heap, (counts[victim], victim))
+        del counts[victim]
+        del self._errors[victim]
+        counts[symbol] = min_count + count
+        self._errors[symbol] = min_count
+        heapq.heapreplace(heap, (min_count + count, symbol))
+        self.evictions += 1
+
+    def update_many(self, stream: Iterable[str]):
+        update = self.update
+        for symbol in stream:
+            update(symbol)
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """K самых частых: [(символ, оценка частоты, максимальная ошибка), ...]."""
+        best = heapq.nlargest(k, self._counts.items(), key=lambda item: item[1])
+        return [(symbol, count, self._errors[symbol]) for symbol, count in best]
+
+
+@dataclass
+class TopKCode:
+    """
+    Код Хаффмана для K частых символов + один escape-код для всех остальных.
+    После escape символ передается "как есть" (literal_bits бит).
+
+    Атрибуты:
+        codes (dict): {символ: (значение кода, длина)} для K частых символов.
+        escape (tuple, optional): (значение, длина) escape-кода; None, если
+                                  вне K символов ничего не встречалось.
+        escape_probability (float): Оценка доли потока, ушедшей в escape.
+        literal_bits (int): Цена передачи символа после escape.
+    """
+    codes: Dict[str, IntCode]
+    escape: Optional[IntCode]
+    escape_probability: float
+    literal_bits: int
+
+    def code_length(self, symbol: str) -> int:
+        """Длина кода символа (для редкого - escape + literal)."""
+        code = self.codes.get(symbol)
+        if code is not None:
+            return code[1]
+        if self.escape is None:
+            raise ValueError(f"Символ {symbol!r} не входит в код, а escape-кода нет")
+        return self.escape[1] + self.literal_bits
+
+    def expected_length(self, probabilities: Dict[str, float]) -> float:
+        """L_avg на ИСТИННОМ распределении (с учетом цены escape)."""
+        return sum(prob * self.code_length(symbol) for symbol, prob in probabilities.items())
+
+
+def build_topk_code(top_counts: List[Tuple[str, int]], total: int, literal_bits: int,
+                    force_escape: bool = False) -> TopKCode:
+    """
+    Строит код Хаффмана по K парам (символ, частота) и остатку потока.
+
+    Args:
+        top_counts (list): [(символ, частота), ...] - например, SpaceSavingSketch.top(K).
+        total (int): Длина потока (частота escape = total - Σ частот).
+        literal_bits (int): Сколько бит стоит символ после escape.
+        force_escape (bool): Строить escape-код, даже если его частота 0
+                             (известно, что вне K символов что-то было).
+    """
+    if not top_counts:
+        raise ValueError("Нужен хотя бы один частый символ")
+    if total <= 0:
+        raise ValueError("Длина потока должна быть > 0")
+    kept_total = sum(count for _, count in top_counts)
+    escape_count = max(0, total - kept_total)
+
+    # Имена вида 'zN' - этого ждут функции из metrics
+    named_probs = {f"z{i + 1}": count / total for i, (_, count) in enumerate(top_counts)}
+    escape_name = None
+    if escape_count or force_escape:
+        escape_name = f"z{len(top_counts) + 1}"
+        named_probs[escape_name] = escape_count / total
+
+    names, code_values, code_lengths = algorithms.generate_int_codes("Хаффман", named_probs)
+    named_codes = {name: (value, length) for name, value, length in zip(names, code_values, code_lengths)}
+    return TopKCode(
+        codes={symbol: named_codes[f"z{i + 1}"] for i, (symbol, _) in enumerate(top_counts)},
+        escape=named_codes[escape_name] if escape_name else None,
+        escape_probability=escape_count / total,
+        literal_bits=literal_bits,
+    )
+
+
+def build_topk_code_from_stream(stream: Iterable[str], k: int, capacity: int,
+                                literal_bits: int) -> Tuple[TopKCode, SpaceSavingSketch]:
+    """Один проход по потоку через скетч (память O(capacity)), затем код для top-K."""
+    if capacity < k:
+        raise ValueError("capacity скетча должна быть >= K")
+    sketch = SpaceSavingSketch(capacity)
+    sketch.update_many(stream)
+    top_counts = [(symbol, count) for symbol, count, _ in sketch.top(k)]
+    # При capacity == K счетчики top-K в сумме дают весь поток, и частота
+    # escape равна 0 даже после вытеснений. Вытесненные символы или символы
+    # вне top-K все равно должны кодироваться - escape нужен всегда
+    has_rest = sketch.evictions > 0 or len(sketch._counts) > k
+    return build_topk_code(top_counts, sketch.total, literal_bits, force_escape=has_rest), sketch
+
+
+def topk_report(stream: List[str], k_values: Iterable[int], capacity_factor: int = 4) -> List[Dict[str, float]]:
+    """
+    Цена приближения на потоке, где точное построение еще возможно.
+
+    Для каждого K: скетч на capacity = K * capacity_factor счетчиков,
+    код top-K + escape, его L_avg на ТОЧНОМ распределении потока
+    и разница с точным Хаффманом по всему алфавиту.
+    """
+    exact_counts = Counter(stream)
+    total = len(stream)
+    symbols = list(exact_counts)
+    names = {symbol: f"z{i + 1}" for i, symbol in enumerate(symbols)}
+    probabilities = {symbol: count / total for symbol, count in exact_counts.items()}
+    named_probs = {names[symbol]: prob for symbol, prob in probabilities.items()}
+
+    entropy = metrics.calculate_entropy(named_probs)[0]
+    named, _, lengths = algorithms.generate_int_codes("Хаффман", named_probs)
+    l_exact = metrics.calculate_length_metrics(named_probs, dict(zip(named, lengths)))["L_avg"]
+    # Literal после escape - номер символа в полном алфавите
+    literal_bits = max(1, math.ceil(math.log2(len(symbols))))
+    true_top = [symbol for symbol, _ in exact_counts.most_common()]
+
+    rows: List[Dict[str, float]] = []
+    for k in k_values:
+        code, sketch = build_topk_code_from_stream(stream, k, k * capacity_factor, literal_bits)
+        l_topk = code.expected_length(probabilities)
+        rows.append({
+            "K": k,
+            "capacity": sketch.capacity,
+            "alphabet": len(symbols),
+            "H": entropy,
+            "L_exact": l_exact,
+            "L_topk": l_topk,
+            "penalty": l_topk - l_exact,
+            "escape_probability": sum(p for s, p in probabilities.items() if s not in code.codes),
+            "top_recall": len(set(code.codes) & set(true_top[:k])) / min(k, len(true_top)),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import time
+    import numpy as np
+    from rich.console import Console
+    from rich.table import Table
+
+    # Поток "токенов" с распределением Ципфа: много редких символов
+    np.random.seed(0)
+    n_tokens = 2_000_000
+    stream = [f"t{token}" for token in np.random.zipf(1.3, size=n_tokens)]
+
+    start_time = time.perf_counter()
+    rows = topk_report(stream, k_values=(16, 256, 4096, 16384))
+    rprint(f"[dim]Отчет за {time.perf_counter() - start_time:.1f} с[/dim]")
+
+    table = Table(title=f"[bold]Top-K Хаффман + escape, поток {n_tokens:,} токенов, "
+                        f"алфавит {rows[0]['alphabet']:,}[/bold]")
+    for column in ("K", "Счетчиков", "P(escape)", "Top-K найдено", "L_avg (точный)", "L_avg (top-K)", "Потеря, бит"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(f"{row['K']:,}", f"{row['capacity']:,}", f"{row['escape_probability']:.4f}",
+                      f"{row['top_recall']:.1%}", f"{row['L_exact']:.4f}", f"{row['L_topk']:.4f}",
+                      f"{row['penalty']:+.4f}")
+    Console().print(table)
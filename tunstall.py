@@ -0,0 +1,237 @@
+import heapq
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Dict, Iterable, List, Tuple
+
+# --- Импорты наших модулей ---
+import metrics
+
+# Больше 2^20 слов словарь (кортежи символов) занимает слишком много памяти
+MAX_WORD_BITS = 20
+
+Word = Tuple[str, ...]
+
+
+@dataclass
+class TunstallCode:
+    """
+    Словарь Тунстолла: код "переменная длина -> фиксированная длина".
+    Источник режется на слова словаря, каждое слово - b-битный номер.
+
+    Атрибуты:
+        b (int): Ширина кодового слова, бит.
+        symbols (list): Алфавит (индекс символа = номер ветки в дереве разбора).
+        words (list): Слова словаря; номер слова = его код.
+        expected_word_length (float): Средняя длина слова в символах источника.
+        _table (list): Плоская таблица переходов дерева разбора:
+            _table[узел * N + символ] = следующий внутренний узел (>= 0)
+            или -(номер слова + 1), если дошли до листа.
+    """
+    b: int
+    symbols: List[str]
+    words: List[Word]
+    expected_word_length: float
+    _table: List[int] = field(repr=False)
+    _padding: List[int] = field(repr=False)
+
+    @property
+    def bits_per_symbol(self) -> float:
+        """Ожидаемая длина кода на символ источника: b / E[длина слова]."""
+        return self.b / self.expected_word_length
+
+    def parse(self, stream: Iterable[str]) -> List[int]:
+        """
+        Жадный разбор потока на слова словаря (номера слов).
+        Незаконченное слово в конце дополняется до любого листа -
+        лишние символы декодер отрежет по n_symbols.
+        """
+        index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        table, n = self._table, len(self.symbols)
+        result: List[int] = []
+        append = result.append
+        node = 0
+        for symbol in stream:
+            step = table[node * n + index[symbol]]
+            if step < 0:
+                append(-step - 1)
+                node = 0
+            else:
+                node = step
+        if node:
+            append(self._padding[node])
+        return result
+
+    def encode(self, stream: Iterable[str]) -> bytes:
+        """
+        Кодирует поток: номера слов по b бит. Упаковка группами по 8 слов -
+        ровно b байт, поэтому декодер читает группу одной операцией.
+        """
+        b = self.b
+        out = bytearray()
+        word_indices = self.parse(stream)
+        for start in range(0, len(word_indices), 8):
+            group = word_indices[start:start + 8]
+            accumulator = 0
+            for word_index in group:
+                accumulator = (accumulator << b) | word_index
+            accumulator <<= b * (8 - len(group))
+            out += accumulator.to_bytes(b, "big")
+        return bytes(out)
+
+    def decode(self, data: bytes, n_symbols: int) -> List[str]:
+        """Декодирует `n_symbols` символов: номер слова -> слово, без обхода дерева."""
+        b, words = self.b, self.words
+        mask = (1 << b) - 1
+        shifts = [b * (7 - i) for i in range(8)]
+        word_indices: List[int] = []
+        extend = word_indices.extend
+        for start in range(0, len(data), b):
+            chunk = int.from_bytes(data[start:start + b], "big")
+            extend([(chunk >> shift) & mask for shift in shifts])
+
+        result = list(chain.from_iterable(map(words.__getitem__, word_indices)))
+        if len(result) < n_symbols:
+            raise ValueError("Данные закончились раньше, чем было декодировано n_symbols символов")
+        del result[n_symbols:]
+        return result
+
+
+def build_tunstall_code(probabilities: Dict[str, float], b: int) -> TunstallCode:
+    """
+    Строит словарь Тунстолла на 2^b слов (не больше).
+
+    Начинаем с N однобуквенных слов; на каждом шаге самое вероятное
+    слово (лист дерева разбора) заменяется N продолжениями. Листьев
+    становится на N - 1 больше, пока их число не превысило бы 2^b.
+
+    Args:
+        probabilities (dict): Словарь {'z1': p1, ...} - как у build_huffman_tree.
+        b (int): Ширина кодового слова, бит (2^b >= N).
+    """
+    if not probabilities:
+        raise ValueError("Словарь вероятностей пуст")
+    symbols = list(probabilities)
+    probs = list(probabilities.values())
+    n = len(symbols)
+    if not (1 <= b <= MAX_WORD_BITS):
+        raise ValueError(f"Ширина слова b должна быть от 1 до {MAX_WORD_BITS}")
+    if n > (1 << b):
+        raise ValueError(f"2^b = {1 << b} меньше размера алфавита N = {n}")
+    if n == 1:
+        # Единственное слово: расширять нечего
+        return TunstallCode(b, symbols, [(symbols[0],)], 1.0, [-1], [0])
+
+    # Узел дерева разбора: (вероятность, слово). Корень 0 - внутренний.
+    # heapq - min-heap, поэтому храним -p; счетчик - для детерминированных ничьих.
+    heap: List[Tuple[float, int, Word]] = [(-p, i, (s,)) for i, (s, p) in enumerate(zip(symbols, probs))]
+    heapq.heapify(heap)
+    counter = n
+    internal_words: List[Word] = [()]
+    expected_length = 1.0  # E[длина] = Σ вероятностей внутренних узлов (корень = 1)
+
+    while len(heap) + n - 1 <= (1 << b):
+        neg_prob, _, word = heapq.heappop(heap)
+        internal_words.append(word)
+        expected_length += -neg_prob
+        for s, p in zip(symbols, probs):
+            heapq.heappush(heap, (neg_prob * p, counter, word + (s,)))
+            counter += 1
+
+    # Номера слов: по убыванию вероятности (порядок не важен для длины кода)
+    leaves = sorted(heap)
+    words = [word for _, _, word in leaves]
+
+    # Плоская таблица переходов для жадного разбора
+    internal_index = {word: i for i, word in enumerate(internal_words)}
+    word_index = {word: i for i, word in enumerate(words)}
+    table = [0] * (len(internal_words) * n)
+    for node, word in enumerate(internal_words):
+        for i, s in enumerate(symbols):
+            child = word + (s,)
+            child_node = internal_index.get(child)
+            table[node * n + i] = child_node if child_node is not None else -(word_index[child] + 1)
+
+    # Для каждого внутреннего узла - какое-нибудь слово из его поддерева (хвост потока)
+    padding = [0] * len(internal_words)
+    for node in range(len(internal_words) - 1, -1, -1):
+        step = table[node * n]
+        padding[node] = -step - 1 if step < 0 else padding[step]
+
+    return TunstallCode(b, symbols, words, expected_length, table, padding)
+
+
+def tunstall_report(probabilities: Dict[str, float], b_values: Iterable[int],
+                    stream: List[str]) -> List[Dict[str, float]]:
+    """
+    Сравнение Тунстолла (для каждого b) с Хаффманом на одном потоке.
+
+    Returns:
+        list: Строки {'name', 'words', 'bits_per_symbol' (ожидаемая),
+              'actual_bits_per_symbol', 'encode_sps', 'decode_sps'}.
+              Первая строка - Хаффман (его L_avg и скорость bitstream).
+    """
+    import time
+    import algorithms
+    import bitstream
+
+    n = len(stream)
+    rows: List[Dict[str, float]] = []
+
+    symbols, code_values, code_lengths = algorithms.generate_int_codes("Хаффман", probabilities)
+    codebook = {symbol: (value, length) for symbol, value, length in zip(symbols, code_values, code_lengths)}
+    decode_table = bitstream.build_decode_table(codebook)
+    start_time = time.perf_counter()
+    data, bit_length = bitstream.encode_symbols(stream, codebook)
+    encode_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    decoded = bitstream.decode_symbols(data, n, decode_table)
+    decode_time = time.perf_counter() - start_time
+    if decoded != stream:
+        raise RuntimeError("Хаффман: декодирование не совпало с исходным потоком")
+    rows.append({
+        "name": "Хаффман",
+        "words": len(codebook),
+        "bits_per_symbol": metrics.calculate_length_metrics(probabilities, dict(zip(symbols, code_lengths)))["L_avg"],
+        "actual_bits_per_symbol": bit_length / n,
+        "encode_sps": n / encode_time,
+        "decode_sps": n / decode_time,
+    })
+
+    for b in b_values:
+        code = build_tunstall_code(probabilities, b)
+        start_time = time.perf_counter()
+        data = code.encode(stream)
+        encode_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        decoded = code.decode(data, n)
+        decode_time = time.perf_counter() - start_time
+        if decoded != stream:
+            raise RuntimeError(f"Тунстолл (b={b}): декодирование не совпало с исходным потоком")
+        rows.append({
+            "name": f"Тунстолл, b={b}",
+            "words": len(code.words),
+            "bits_per_symbol": code.bits_per_symbol,
+            "actual_bits_per_symbol": 8 * len(data) / n,
+            "encode_sps": n / encode_time,
+            "decode_sps": n / decode_time,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import random
+    from rich.console import Console
+    from rich.table import Table
+
+    probabilities = {"z1": 0.7, "z2": 0.15, "z3": 0.1, "z4": 0.05}
+    stream = random.choices(list(probabilities), weights=list(probabilities.values()), k=500_000)
+    entropy = metrics.calculate_entropy(probabilities)[0]
+
+    table = Table(title=f"[bold]Тунстолл против Хаффмана (H = {entropy:.4f} бит/символ)[/bold]")
+    for column in ("Код", "Слов", "Бит/символ (ожид.)", "Бит/символ (факт.)", "Encode, M симв/с", "Decode, M симв/с"):
+        table.add_column(column, justify="left" if column == "Код" else "right")
+    for row in tunstall_report(probabilities, (4, 8, 12, 16), stream):
+        table.add_row(row["name"], f"{row['words']:,}", f"{row['bits_per_symbol']:.4f}",
+                      f"{row['actual_bits_per_symbol']:.4f}", f"{row['encode_sps'] / 1e6:.2f}",
+                      f"{row['decode_sps'] / 1e6:.2f}")
+    Console().print(table)
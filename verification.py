@@ -0,0 +1,188 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from rich import print as rprint
+
+# Сколько конфликтующих пар максимум хранить в отчете
+MAX_REPORTED_CONFLICTS = 100
+
+
+@dataclass
+class PrefixCheckResult:
+    """
+    Результат проверки кодовой книги.
+
+    Атрибуты:
+        is_prefix_free (bool): Ни один код не является префиксом другого
+                               (и нет одинаковых кодов).
+        is_complete (bool): Сумма Крафта РОВНО 1 (считается в целых числах).
+        kraft_numerator (int), kraft_denominator (int):
+            K = kraft_numerator / kraft_denominator без ошибок округления.
+        conflicts (list): Пары символов (префикс, символ с этим префиксом),
+                          не больше MAX_REPORTED_CONFLICTS.
+        conflict_count (int): Полное число конфликтующих пар.
+        invalid_symbols (list): Символы с пустым кодом или не из '0'/'1'.
+    """
+    is_prefix_free: bool
+    is_complete: bool
+    kraft_numerator: int
+    kraft_denominator: int
+    conflicts: List[Tuple[str, str]] = field(default_factory=list)
+    conflict_count: int = 0
+    invalid_symbols: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        """Код однозначно декодируем "на лету" (префиксный, без мусора)."""
+        return self.is_prefix_free and not self.invalid_symbols
+
+
+def _exact_kraft(lengths: List[int]) -> Tuple[int, int]:
+    """
+    Точная сумма Крафта: K * 2^maxL = Σ count(L) * 2^(maxL - L).
+    Считаем по гистограмме длин - различных длин немного.
+    """
+    if not lengths:
+        return 0, 1
+    max_length = max(lengths)
+    numerator = sum(count << (max_length - length) for length, count in Counter(lengths).items())
+    return numerator, 1 << max_length
+
+
+def _scan_sorted(entries: List[Tuple[str, int, int]]) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    Ищет ВСЕ пары "префикс - код" за один проход по кодам,
+    отсортированным лексикографически.
+
+    Если a - префикс c, то любой код b между ними тоже начинается с a,
+    поэтому достаточно держать стек "открытых" префиксов текущей ветки.
+
+    Args:
+        entries (list): [(символ, значение кода, длина кода), ...]
+                        в лексикографическом порядке кодов.
+    """
+    conflicts: List[Tuple[str, str]] = []
+    conflict_count = 0
+    stack: List[Tuple[str, int, int]] = []
+
+    for symbol, value, length in entries:
+        # Снимаем со стека то, что не является префиксом текущего кода
+        while stack:
+            _, top_value, top_length = stack[-1]
+            if top_length <= length and (value >> (length - top_length)) == top_value:
+                break
+            stack.pop()
+        for prefix_symbol, _, _ in stack:
+            conflict_count += 1
+            if len(conflicts) < MAX_REPORTED_CONFLICTS:
+                conflicts.append((prefix_symbol, symbol))
+        stack.append((symbol, value, length))
+
+    return conflicts, conflict_count
+
+
+def verify_int_codes(symbols: List[str], code_values: List[int], code_lengths: List[int]) -> PrefixCheckResult:
+    """
+    Проверка кодов в целочисленной форме (см. `algorithms.generate_int_codes_from_tree`).
+    O(N log N) сравнений целых + O(N) на проход по стеку.
+    """
+    invalid = [symbol for symbol, value, length in zip(symbols, code_values, code_lengths)
+               if length <= 0 or value < 0 or value >> length]
+    entries = list(zip(symbols, code_values, code_lengths))
+    if invalid:
+        invalid_set = set(invalid)
+        entries = [entry for entry in entries if entry[0] not in invalid_set]
+    max_length = max((length for _, _, length in entries), default=0)
+    # Лексикографический порядок = код, выровненный влево до maxL бит, затем длина
+    entries.sort(key=lambda entry: (entry[1] << (max_length - entry[2]), entry[2]))
+
+    conflicts, conflict_count = _scan_sorted(entries)
+    numerator, denominator = _exact_kraft([length for _, _, length in entries])
+
+    return PrefixCheckResult(
+        is_prefix_free=(conflict_count == 0),
+        is_complete=(numerator == denominator),
+        kraft_numerator=numerator,
+        kraft_denominator=denominator,
+        conflicts=conflicts,
+        conflict_count=conflict_count,
+        invalid_symbols=invalid,
+    )
+
+
+def verify_prefix_code(codes: Dict[str, str]) -> PrefixCheckResult:
+    """
+    Проверяет словарь кодов {'z1': '01', ...}: префиксность
+    (с перечислением конфликтующих пар) и полноту K == 1.
+
+    Неравенство Крафта (`metrics.calculate_kraft_inequality`) этого
+    не ловит: K <= 1 может выполняться и для НЕпрефиксного словаря.
+    """
+    symbols: List[str] = []
+    code_values: List[int] = []
+    code_lengths: List[int] = []
+    invalid: List[str] = []
+
+    for symbol, code in codes.items():
+        if not code or code.strip("01"):
+            invalid.append(symbol)
+            continue
+        symbols.append(symbol)
+        code_values.append(int(code, 2))
+        code_lengths.append(len(code))
+
+    result = verify_int_codes(symbols, code_values, code_lengths)
+    result.invalid_symbols = invalid + result.invalid_symbols
+    return result
+
+
+def load_verified_codes(path: Path) -> Dict[str, str]:
+    """
+    Загружает `*_codes.json` (см. main._save_codes_to_file) и сразу
+    проверяет его. Непрефиксный или испорченный словарь не возвращается.
+
+    Raises:
+        ValueError: Если словарь не является корректным префиксным кодом.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        codes = json.load(f)
+
+    result = verify_prefix_code(codes)
+    if result.invalid_symbols:
+        raise ValueError(f"Некорректные коды у символов: {result.invalid_symbols[:10]}")
+    if not result.is_prefix_free:
+        raise ValueError(
+            f"Код не префиксный: {result.conflict_count} конфликт(ов), например {result.conflicts[:5]}"
+        )
+    return codes
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from random_probs import generate_probabilities
+
+    import d_ary
+
+    n_symbols = 1_000_000
+    probabilities = generate_probabilities(n_symbols, method='dirichlet', decimals=9, min_prob=1e-10)
+
+    # Код Хаффмана для 1e6 символов строим быстро - через D-ичный движок с D=2
+    dary_codes = d_ary.generate_dary_codes_from_tree(d_ary.build_dary_huffman_tree(probabilities, 2))
+    codes = {symbol: "".join(map(str, code)) for symbol, code in dary_codes.items()}
+
+    start_time = time.perf_counter()
+    result = verify_prefix_code(codes)
+    check_time = time.perf_counter() - start_time
+    rprint(f"[bold]Проверка {n_symbols:,} кодов:[/bold] {check_time:.3f} с, "
+           f"префиксный: {result.is_prefix_free}, полный (K == 1): {result.is_complete}")
+
+    # Портим словарь: код одного символа делаем префиксом другого
+    victim, donor = random.sample(list(codes), 2)
+    codes[victim] = codes[donor][:-1] or "0"
+    result = verify_prefix_code(codes)
+    rprint(f"[bold]После порчи:[/bold] префиксный: {result.is_prefix_free}, "
+           f"конфликтов: {result.conflict_count}, примеры: {result.conflicts[:3]}")
@@ -53,7 +53,7 @@ def _build_gv_tree(dot: graphviz.Digraph, node: Optional[Node]):
         _build_gv_tree(dot, node.right_child)
         dot.edge(node_id, right_id, label="1")
 
-def generate_scheme_image(root_node: Node, algo_name: str, output_path: str):
+def generate_scheme_image(root_node: Node, algo_name: str, output_path: str) -> Optional[str]:
     """
     (Корень внизу, листья вверху, отсортированы по P)
     
@@ -61,6 +61,9 @@ def generate_scheme_image(root_node: Node, algo_name: str, output_path: str):
         root_node (Node): Корень дерева.
         algo_name (str): Имя алгоритма (для имени файла).
         output_path (str): Путь к папке (напр. "results/output_1").
+
+    Returns:
+        str | None: Путь к PNG или None, если Graphviz не отработал.
     """
     filename = f"{algo_name.replace(' ', '_')}_Tree_Scheme"
     
@@ -87,11 +90,13 @@ def generate_scheme_image(root_node: Node, algo_name: str, output_path: str):
         
         full_path = os.path.join(output_path, f"{filename}.png")
         rprint(f"[bold green]...Изображение (Схема) сохранено: [cyan]{full_path}[/cyan][/bold green]")
+        return full_path
 
     except Exception as e:
         _handle_gv_error(e)
+        return None
 
-def generate_classic_tree_image(root_node: Node, algo_name: str, output_path: str):
+def generate_classic_tree_image(root_node: Node, algo_name: str, output_path: str) -> Optional[str]:
     """
     Генерирует PNG
     (Корень вверху, листья внизу, авто-раскладка)
@@ -100,6 +105,9 @@ def generate_classic_tree_image(root_node: Node, algo_name: str, output_path: st
         root_node (Node): Корень дерева.
         algo_name (str): Имя алгоритма (для имени файла).
         output_path (str): Путь к папке (напр. "results/output_1").
+
+    Returns:
+        str | None: Путь к PNG или None, если Graphviz не отработал.
     """
     filename = f"{algo_name.replace(' ', '_')}_Tree_Classic"
     
@@ -114,9 +122,11 @@ def generate_classic_tree_image(root_node: Node, algo_name: str, output_path: st
         
         full_path = os.path.join(output_path, f"{filename}.png")
         rprint(f"[bold green]...Изображение (Дерево) сохранено: [cyan]{full_path}[/cyan][/bold green]")
+        return full_path
 
     except Exception as e:
         _handle_gv_error(e)
+        return None
 
 def _handle_gv_error(e: Exception):
     """Обрабатывает ошибки Graphviz"""